@@ -0,0 +1,39 @@
+"""Add dashboard summary table
+
+Revision ID: 3c9a1f7d2b64
+Revises: ea0be61f2816
+Create Date: 2026-10-18 09:12:40.218344
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a1f7d2b64'
+down_revision: Union[str, None] = 'ea0be61f2816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('dashboard_summary',
+    sa.Column('summary_id', sa.Integer(), nullable=False),
+    sa.Column('total_employees', sa.Integer(), nullable=False),
+    sa.Column('total_departments', sa.Integer(), nullable=False),
+    sa.Column('active_projects', sa.Integer(), nullable=False),
+    sa.Column('total_projects', sa.Integer(), nullable=False),
+    sa.Column('total_materials', sa.Integer(), nullable=False),
+    sa.Column('low_stock_materials', sa.Integer(), nullable=False),
+    sa.Column('pending_leave_requests', sa.Integer(), nullable=False),
+    sa.Column('available_tools', sa.Integer(), nullable=False),
+    sa.Column('total_tools', sa.Integer(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('summary_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('dashboard_summary')
@@ -0,0 +1,76 @@
+"""Add SME filter and sort indexes
+
+Revision ID: 8d41e6b0c7a3
+Revises: b57e2c9a4f10
+Create Date: 2026-10-18 10:05:11.604127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41e6b0c7a3'
+down_revision: Union[str, None] = 'b57e2c9a4f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Each index leads with a list endpoint filter and ends with its (sort, primary key)
+# ordering, so filtered pages are read in order without a sort step.
+SME_INDEXES = [
+    ('ix_departments_name', 'departments', ['department_name', 'department_id']),
+    ('ix_employees_department_code', 'employees', ['department_id', 'employee_code', 'employee_id']),
+    ('ix_employees_active_code', 'employees', ['is_active', 'employee_code', 'employee_id']),
+    ('ix_customers_active_code', 'customers', ['is_active', 'customer_code', 'customer_id']),
+    ('ix_projects_status_code', 'projects', ['status', 'project_code', 'project_id']),
+    ('ix_projects_customer_code', 'projects', ['customer_id', 'project_code', 'project_id']),
+    ('ix_materials_category_code', 'materials', ['category', 'material_code', 'material_id']),
+    ('ix_time_entries_date', 'time_entries', ['entry_date', 'entry_id']),
+    ('ix_time_entries_employee_date', 'time_entries', ['employee_id', 'entry_date', 'entry_id']),
+    ('ix_time_entries_project_date', 'time_entries', ['project_id', 'entry_date', 'entry_id']),
+    ('ix_leave_requests_start', 'leave_requests', ['start_date', 'request_id']),
+    ('ix_leave_requests_employee_start', 'leave_requests', ['employee_id', 'start_date', 'request_id']),
+    ('ix_leave_requests_status_start', 'leave_requests', ['status', 'start_date', 'request_id']),
+    ('ix_leave_requests_type_start', 'leave_requests', ['leave_type', 'start_date', 'request_id']),
+    ('ix_tools_category_code', 'tools', ['category', 'tool_code', 'tool_id']),
+    ('ix_tools_available_code', 'tools', ['is_available', 'tool_code', 'tool_id']),
+    ('ix_tools_condition_code', 'tools', ['condition', 'tool_code', 'tool_id']),
+]
+
+
+def _present_indexes():
+    """SME tables are created from the models, not by this migration chain - skip any that do not exist yet"""
+    inspector = sa.inspect(op.get_bind())
+    return [index for index in SME_INDEXES if inspector.has_table(index[1])]
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    indexes = _present_indexes()
+    # if_not_exists: databases bootstrapped from the models already have these
+    if _is_postgresql():
+        # CONCURRENTLY does not block writes to the (large) tables while the index builds,
+        # but cannot run inside the migration transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in indexes:
+                op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, columns in indexes:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    indexes = list(reversed(_present_indexes()))
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            for name, table, _ in indexes:
+                op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, _ in indexes:
+            op.drop_index(name, table_name=table, if_exists=True)
@@ -1,13 +1,19 @@
 from datetime import datetime, timedelta
 from typing import Optional
 import jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from .database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import get_async_db
 from .models import User
+from .password_hasher import password_hasher
+from .user_cache import get_cached_user, cache_user, cache_version
+from .cache import TTLCache
+from .metrics import auth_failures
 from dotenv import load_dotenv
+import hashlib
+import time
 import os
 
 load_dotenv()
@@ -48,10 +54,14 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
 print(f"Auth config - Algorithm: {ALGORITHM}, Token expire: {ACCESS_TOKEN_EXPIRE_MINUTES} minutes")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+# Verified-token cache: sha256(token) -> decoded claims, never kept past the token's exp
+JWT_CACHE_MAXSIZE = int(os.getenv("JWT_CACHE_MAXSIZE", 10000))
+JWT_CACHE_TTL_SECONDS = float(os.getenv("JWT_CACHE_TTL_SECONDS", 300))
+token_cache = TTLCache(maxsize=JWT_CACHE_MAXSIZE, ttl=JWT_CACHE_TTL_SECONDS)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     import logging
     logger = logging.getLogger(__name__)
     
@@ -67,17 +77,20 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         else:
             logger.warning(f"⚠️ DEBUG: Hash format doesn't look like bcrypt: {hashed_password[:20] if hashed_password else 'None'}")
         
-        result = pwd_context.verify(plain_password, hashed_password)
-        logger.info(f"🔍 DEBUG: pwd_context.verify result: {result}")
+        result = await password_hasher.verify(plain_password, hashed_password)
+        logger.info(f"🔍 DEBUG: password_hasher.verify result: {result}")
         
         return result
+    except HTTPException:
+        # Hashing pool saturated - surface the 503 instead of a failed login
+        raise
     except Exception as e:
         logger.error(f"🚨 DEBUG: Password verification error: {str(e)}")
         logger.error(f"🚨 DEBUG: Exception type: {type(e).__name__}")
         return False
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    return await password_hasher.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     try:
@@ -104,7 +117,22 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
             detail=f"Authentication error: {str(e)}"
         )
 
+def _cache_claims(token_key: bytes, payload: dict):
+    """Cache verified claims until the token expires (or the cache TTL, whichever is sooner)"""
+    ttl = JWT_CACHE_TTL_SECONDS
+    exp = payload.get("exp")
+    if exp is not None:
+        ttl = min(ttl, float(exp) - time.time())
+    if ttl > 0:
+        token_cache.set(token_key, payload, ttl=ttl)
+
 def verify_token(token: str):
+    # Tokens are presented many times in their lifetime - skip signature checks for ones already verified
+    token_key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(token_key)
+    if payload is not None:
+        return payload["sub"]
+    
     try:
         # Ensure SECRET_KEY is string before decoding
         secret_key = str(SECRET_KEY) if SECRET_KEY else None
@@ -119,9 +147,11 @@ def verify_token(token: str):
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        _cache_claims(token_key, payload)
         return username
     except jwt.InvalidTokenError as e:
         print(f"JWT decode error: {str(e)}")
+        auth_failures.inc("invalid_token")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -134,18 +164,25 @@ def verify_token(token: str):
             detail=f"Authentication error: {str(e)}"
         )
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)):
     from .models import User
     
     token = credentials.credentials
     username = verify_token(token)
     
-    user = db.query(User).filter(User.username == username).first()
+    principal = get_cached_user(username)
+    if principal is not None:
+        return principal
+    
+    version = cache_version()
+    result = await db.execute(select(User).where(User.username == username))
+    user = result.scalars().first()
     if user is None:
+        auth_failures.inc("unknown_user")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return user
+    return cache_user(user, version)
 
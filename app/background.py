@@ -0,0 +1,54 @@
+"""
+Periodic background tasks started from the application lifespan
+"""
+import asyncio
+import inspect
+from typing import Awaitable, Callable, List, Optional, Union
+
+from app.logging_config import get_logger
+
+logger = get_logger("background")
+
+_tasks: List[asyncio.Task] = []
+
+async def _wait(interval_seconds: float, wakeup: Optional[asyncio.Event]):
+    if wakeup is None:
+        await asyncio.sleep(interval_seconds)
+        return
+    try:
+        await asyncio.wait_for(wakeup.wait(), timeout=interval_seconds)
+    except asyncio.TimeoutError:
+        pass
+    wakeup.clear()
+
+async def _run_periodic(name: str, interval_seconds: float, func: Callable[[], Union[None, Awaitable[None]]], wakeup: Optional[asyncio.Event]):
+    while True:
+        await _wait(interval_seconds, wakeup)
+        try:
+            result = func()
+            if inspect.isawaitable(result):
+                await result
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Keep the loop alive - a failed run is retried on the next tick
+            logger.error("Background task failed", task=name, error=str(e), exc_info=True)
+
+def start_periodic_task(
+    name: str,
+    interval_seconds: float,
+    func: Callable[[], Union[None, Awaitable[None]]],
+    wakeup: Optional[asyncio.Event] = None
+) -> asyncio.Task:
+    """Run func (sync or async) every interval_seconds until shutdown; setting wakeup runs it early"""
+    task = asyncio.create_task(_run_periodic(name, interval_seconds, func, wakeup), name=name)
+    _tasks.append(task)
+    logger.info("Background task started", task=name, interval_seconds=interval_seconds)
+    return task
+
+async def stop_background_tasks():
+    """Cancel every task started with start_periodic_task and wait for them to finish"""
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
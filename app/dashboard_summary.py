@@ -0,0 +1,110 @@
+"""
+Materialized dashboard counters refreshed on a schedule
+"""
+import os
+from datetime import datetime
+from typing import Dict, Tuple
+
+from sqlalchemy import select, func, case, true
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.logging_config import get_logger
+from models.sme_models import (
+    Employee, Department, Project, Material, LeaveRequest, Tool,
+    ProjectStatus, LeaveStatus, DashboardSummary
+)
+
+logger = get_logger("dashboard_summary")
+
+# How often the summary row is recomputed; 0 disables the refresh task
+DASHBOARD_SUMMARY_REFRESH_SECONDS = float(os.getenv("DASHBOARD_SUMMARY_REFRESH_SECONDS", 60))
+# Older summaries are ignored and the counters are computed live instead
+DASHBOARD_SUMMARY_MAX_STALENESS_SECONDS = float(os.getenv("DASHBOARD_SUMMARY_MAX_STALENESS_SECONDS", 300))
+
+SUMMARY_ID = 1
+
+COUNTER_FIELDS = (
+    "total_employees", "total_departments", "active_projects", "total_projects",
+    "total_materials", "low_stock_materials", "pending_leave_requests",
+    "available_tools", "total_tools",
+)
+
+def dashboard_counts_query():
+    """
+    All dashboard counters in a single statement: one aggregate subquery per table
+    (with CASE-based conditional counts), cross-joined into one row
+    """
+    employees = select(
+        func.count().label("active")
+    ).select_from(Employee).where(Employee.is_active == True).subquery()
+    departments = select(
+        func.count().label("active")
+    ).select_from(Department).where(Department.is_active == True).subquery()
+    projects = select(
+        func.count().label("total"),
+        func.count(case((Project.status == ProjectStatus.ACTIVE, 1))).label("active")
+    ).select_from(Project).subquery()
+    materials = select(
+        func.count().label("active"),
+        func.count(case((Material.current_stock <= Material.minimum_stock, 1))).label("low_stock")
+    ).select_from(Material).where(Material.is_active == True).subquery()
+    leave_requests = select(
+        func.count().label("pending")
+    ).select_from(LeaveRequest).where(LeaveRequest.status == LeaveStatus.PENDING).subquery()
+    tools = select(
+        func.count().label("total"),
+        func.count(case((Tool.is_available == True, 1))).label("available")
+    ).select_from(Tool).subquery()
+
+    return select(
+        employees.c.active.label("total_employees"),
+        departments.c.active.label("total_departments"),
+        projects.c.active.label("active_projects"),
+        projects.c.total.label("total_projects"),
+        materials.c.active.label("total_materials"),
+        materials.c.low_stock.label("low_stock_materials"),
+        leave_requests.c.pending.label("pending_leave_requests"),
+        tools.c.available.label("available_tools"),
+        tools.c.total.label("total_tools")
+    ).select_from(
+        employees
+        .join(departments, true())
+        .join(projects, true())
+        .join(materials, true())
+        .join(leave_requests, true())
+        .join(tools, true())
+    )
+
+async def compute_dashboard_counts(db: AsyncSession) -> Dict[str, int]:
+    """Compute the counters from the base tables"""
+    row = (await db.execute(dashboard_counts_query())).one()
+    return {field: getattr(row, field) for field in COUNTER_FIELDS}
+
+async def refresh_dashboard_summary():
+    """Recompute the counters and overwrite the summary row"""
+    async with AsyncSessionLocal() as db:
+        counts = await compute_dashboard_counts(db)
+        await db.merge(DashboardSummary(summary_id=SUMMARY_ID, refreshed_at=datetime.utcnow(), **counts))
+        await db.commit()
+    logger.debug("Dashboard summary refreshed", **counts)
+
+async def get_dashboard_counts(db: AsyncSession) -> Tuple[Dict[str, int], datetime]:
+    """
+    Counters and the time they were computed. Served from the summary row while it is
+    within DASHBOARD_SUMMARY_MAX_STALENESS_SECONDS, otherwise computed live.
+    """
+    try:
+        summary = await db.get(DashboardSummary, SUMMARY_ID)
+    except SQLAlchemyError as e:
+        # Table not migrated yet - keep serving live numbers
+        await db.rollback()
+        logger.warning("Dashboard summary unavailable", error=str(e))
+        summary = None
+
+    now = datetime.utcnow()
+    if summary is not None and (now - summary.refreshed_at).total_seconds() <= DASHBOARD_SUMMARY_MAX_STALENESS_SECONDS:
+        return {field: getattr(summary, field) for field in COUNTER_FIELDS}, summary.refreshed_at
+
+    return await compute_dashboard_counts(db), now
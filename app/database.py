@@ -1,14 +1,17 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+from app.db_pool import get_engine_options, instrument_engine
+from app.query_stats import instrument_queries
 
 load_dotenv()
 
 # Get database URL with fallback options
 DATABASE_URL = (
-    os.getenv("DATABASE_URL") or 
+    os.getenv("DATABASE_URL") or
     os.getenv("DATABASE_PUBLIC_URL") or
     os.getenv("DATABASE_PRIVATE_URL")
 )
@@ -18,27 +21,62 @@ if not DATABASE_URL:
         "No database URL found. Please set DATABASE_URL, DATABASE_PUBLIC_URL, or DATABASE_PRIVATE_URL"
     )
 
+# Async drivers used for each sync URL scheme
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(url: str) -> str:
+    """Derive the async driver URL (asyncpg / aiosqlite) from a sync database URL"""
+    scheme, separator, rest = url.partition("://")
+    if not separator:
+        return url
+    async_scheme = ASYNC_DRIVERS.get(scheme, scheme)
+    if async_scheme == "postgresql+asyncpg":
+        # asyncpg takes "ssl" rather than libpq's "sslmode"
+        rest = rest.replace("sslmode=", "ssl=")
+    return f"{async_scheme}://{rest}"
+
+# Explicit ASYNC_DATABASE_URL wins, otherwise derive it from DATABASE_URL
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or get_async_database_url(DATABASE_URL)
+
 print(f"Connecting to database: {DATABASE_URL[:50]}...")
 
 try:
     # Create engine with connection pooling and error handling
     engine = create_engine(
         DATABASE_URL,
-        pool_pre_ping=True,
-        pool_recycle=300,
-        echo=False  # Set to True for SQL debugging
+        echo=False,  # Set to True for SQL debugging
+        **get_engine_options(DATABASE_URL)
     )
-    
+    instrument_engine(engine, "sync")
+    instrument_queries(engine)
+
     # Test connection
     with engine.connect() as conn:
-        conn.execute("SELECT 1")
+        conn.execute(text("SELECT 1"))
     print("✅ Database connection successful")
-    
+
 except Exception as e:
     print(f"❌ Database connection failed: {str(e)}")
     raise
 
+# Async engine used by the request path; connections are opened lazily
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    **get_engine_options(ASYNC_DATABASE_URL, is_async=True)
+)
+instrument_engine(async_engine.sync_engine, "async")
+instrument_queries(async_engine.sync_engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False so committed objects can still be read without an implicit (sync) refresh
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 def get_db():
@@ -46,4 +84,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
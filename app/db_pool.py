@@ -0,0 +1,191 @@
+"""
+Database connection pool configuration and telemetry
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.logging_config import get_logger
+from app.metrics import db_pool_checkout_wait, db_pool_checkout_timeouts
+
+logger = get_logger("db_pool")
+
+# Pool sizing - applies per engine, per worker process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 300))
+DB_POOL_USE_LIFO = os.getenv("DB_POOL_USE_LIFO", "false").lower() == "true"
+
+# Pre-ping: "always" pings on every checkout, "idle" only after the connection
+# sat in the pool longer than DB_POOL_PRE_PING_IDLE_SECONDS, "never" disables it
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "always").lower()
+DB_POOL_PRE_PING_IDLE_SECONDS = float(os.getenv("DB_POOL_PRE_PING_IDLE_SECONDS", 30))
+
+# Telemetry
+DB_POOL_SLOW_CHECKOUT_SECONDS = float(os.getenv("DB_POOL_SLOW_CHECKOUT_SECONDS", 1.0))
+DB_POOL_STATS_LOG_INTERVAL = int(os.getenv("DB_POOL_STATS_LOG_INTERVAL", 0))  # seconds, 0 disables
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+
+if DB_POOL_PRE_PING not in ("always", "idle", "never"):
+    raise ValueError(f"DB_POOL_PRE_PING must be always, idle or never, got {DB_POOL_PRE_PING!r}")
+
+class PoolStats:
+    """Checkout counters and wait-time histogram for one pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.pings = 0
+        self.stale_connections = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def observe_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            for index, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.buckets[index] += 1
+                    break
+            else:
+                self.buckets[-1] += 1
+
+        if timed_out:
+            db_pool_checkout_timeouts.inc(self.name)
+        else:
+            db_pool_checkout_wait.observe(seconds, self.name)
+
+        if timed_out:
+            logger.error("Database pool checkout timed out", pool=self.name, wait_seconds=round(seconds, 4))
+        elif seconds >= DB_POOL_SLOW_CHECKOUT_SECONDS:
+            logger.warning("Slow database pool checkout", pool=self.name, wait_seconds=round(seconds, 4))
+
+    def observe_ping(self, stale: bool):
+        with self._lock:
+            self.pings += 1
+            if stale:
+                self.stale_connections += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            histogram = {f"le_{bound}": count for bound, count in zip(WAIT_BUCKETS, self.buckets)}
+            histogram["le_inf"] = self.buckets[-1]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "pings": self.pings,
+                "stale_connections": self.stale_connections,
+                "avg_wait_seconds": round(self.total_wait / attempts, 6) if attempts else 0.0,
+                "max_wait_seconds": round(self.max_wait, 6),
+                "wait_histogram": histogram,
+            }
+
+class _InstrumentedPoolMixin:
+    """Times every checkout, including the time spent queueing for a free connection"""
+
+    stats: Optional[PoolStats] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.observe_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.stats is not None:
+            self.stats.observe_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool - keep accumulating into the same stats
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def get_engine_options(database_url: str, is_async: bool = False) -> Dict[str, Any]:
+    """Pool keyword arguments for create_engine / create_async_engine"""
+    if database_url.startswith("sqlite") and ":memory:" in database_url:
+        # In-memory SQLite needs its default single-connection pool
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_use_lifo": DB_POOL_USE_LIFO,
+        "pool_pre_ping": DB_POOL_PRE_PING == "always",
+    }
+
+def instrument_engine(engine: Engine, name: str) -> PoolStats:
+    """Attach stats and the idle-only pre-ping to a (sync) engine's pool"""
+    stats = PoolStats(name)
+    engine.pool.stats = stats
+
+    if DB_POOL_PRE_PING == "idle":
+        @event.listens_for(engine, "checkin")
+        def _record_checkin(dbapi_connection, connection_record):
+            connection_record.info["last_checkin"] = time.monotonic()
+
+        @event.listens_for(engine, "checkout")
+        def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+            last_checkin = connection_record.info.get("last_checkin")
+            if last_checkin is None or time.monotonic() - last_checkin < DB_POOL_PRE_PING_IDLE_SECONDS:
+                return
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            except Exception:
+                stats.observe_ping(stale=True)
+                # Tells the pool to discard this connection and retry with a fresh one
+                raise exc.DisconnectionError()
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+            stats.observe_ping(stale=False)
+
+    return stats
+
+def get_pool_status(engine: Engine) -> Dict[str, Any]:
+    """Live occupancy plus accumulated stats for an engine's pool"""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__, "pid": os.getpid()}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+        })
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
@@ -0,0 +1,161 @@
+"""
+Durable outbound mail queue delivered by a background sender
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Row, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.email_service import email_service
+from app.logging_config import get_logger
+from app.models import EmailOutbox
+
+logger = get_logger("email_outbox")
+
+# Fallback poll interval; enqueuing wakes the sender immediately
+EMAIL_OUTBOX_POLL_SECONDS = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", 30))
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", 20))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+# Retry delay doubles after each failed attempt, up to the max
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", 30))
+EMAIL_RETRY_MAX_SECONDS = float(os.getenv("EMAIL_RETRY_MAX_SECONDS", 3600))
+# A claimed batch is handed to another worker if not settled within this long; keep it above batch size x SMTP_TIMEOUT
+EMAIL_OUTBOX_LEASE_SECONDS = float(os.getenv("EMAIL_OUTBOX_LEASE_SECONDS", 900))
+
+# Set after a commit that queued mail so the sender does not wait for the next poll
+outbox_wakeup = asyncio.Event()
+
+def enqueue_email(db: AsyncSession, recipient: str, subject: str, text_body: str, html_body: Optional[str] = None) -> EmailOutbox:
+    """Add a message to the outbox in the caller's transaction; call notify_outbox() after commit"""
+    message = EmailOutbox(
+        recipient=recipient,
+        subject=subject,
+        text_body=text_body,
+        html_body=html_body,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    )
+    db.add(message)
+    return message
+
+def notify_outbox():
+    outbox_wakeup.set()
+
+def queue_password_reset_email(
+    db: AsyncSession,
+    email: str,
+    username: str,
+    reset_token: str,
+    expiry_minutes: int,
+    locale: Optional[str] = None
+) -> bool:
+    """
+    Queue the password reset email. Returns False (and logs the link for development)
+    when SMTP is not configured.
+    """
+    if not email_service.is_configured:
+        logger.error("Cannot send email - SMTP not configured")
+        reset_link = f"{email_service.frontend_url}/reset-password?token={reset_token}"
+        logger.info(f"Password reset link for {email}: {reset_link}")
+        return False
+
+    rendered = email_service.render_reset_email(username, reset_token, locale, expiry_minutes)
+    enqueue_email(db, email, rendered.subject, rendered.text, rendered.html)
+    return True
+
+def retry_delay(attempts: int) -> float:
+    return min(EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), EMAIL_RETRY_MAX_SECONDS)
+
+def _failure_values(message, error: Exception) -> dict:
+    values = {"last_error": str(error)[:1000]}
+    if message.attempts >= EMAIL_MAX_ATTEMPTS:
+        values["status"] = "failed"
+        logger.error("Email delivery failed permanently", outbox_id=message.id, attempts=message.attempts, error=str(error))
+    else:
+        delay = retry_delay(message.attempts)
+        values["status"] = "pending"
+        values["next_attempt_at"] = datetime.utcnow() + timedelta(seconds=delay)
+        logger.warning("Email delivery failed, will retry", outbox_id=message.id, attempts=message.attempts, retry_in_seconds=delay, error=str(error))
+    return values
+
+async def claim_due_emails() -> List[Row]:
+    """
+    Lease up to EMAIL_OUTBOX_BATCH_SIZE due messages in one short transaction. Claimed rows are
+    "sending" with next_attempt_at as the lease expiry, so a worker that dies mid-send only
+    delays them; the single UPDATE keeps two workers from claiming the same row, SQLite included.
+    """
+    now = datetime.utcnow()
+    due = (
+        select(EmailOutbox.id)
+        .where(EmailOutbox.status.in_(("pending", "sending")), EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(EMAIL_OUTBOX_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(due.scalar_subquery()))
+            .values(
+                status="sending",
+                attempts=EmailOutbox.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=EMAIL_OUTBOX_LEASE_SECONDS)
+            )
+            .returning(
+                EmailOutbox.id, EmailOutbox.recipient, EmailOutbox.subject,
+                EmailOutbox.text_body, EmailOutbox.html_body, EmailOutbox.attempts
+            )
+            .execution_options(synchronize_session=False)
+        )
+        claimed = result.all()
+        await db.commit()
+    return claimed
+
+async def _record_results(messages: Sequence[Row], errors: Sequence[Optional[Exception]]) -> int:
+    sent_ids = [message.id for message, error in zip(messages, errors) if error is None]
+    async with AsyncSessionLocal() as db:
+        if sent_ids:
+            # The bodies carry live reset links - keep only the delivery record
+            await db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(sent_ids))
+                .values(status="sent", sent_at=datetime.utcnow(), last_error=None, text_body="", html_body=None)
+                .execution_options(synchronize_session=False)
+            )
+        for message, error in zip(messages, errors):
+            if error is not None:
+                await db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id == message.id)
+                    .values(**_failure_values(message, error))
+                    .execution_options(synchronize_session=False)
+                )
+        await db.commit()
+    return len(sent_ids)
+
+async def deliver_pending_emails() -> int:
+    """Send up to EMAIL_OUTBOX_BATCH_SIZE due messages over shared SMTP sessions; returns the number sent"""
+    if not email_service.is_configured:
+        return 0
+
+    messages = await claim_due_emails()
+    if not messages:
+        return 0
+
+    # No transaction or pooled connection is held during the SMTP round trips
+    errors = await asyncio.to_thread(
+        email_service.deliver_many,
+        [(m.recipient, m.subject, m.text_body, m.html_body) for m in messages]
+    )
+    sent = await _record_results(messages, errors)
+
+    logger.info("Email batch delivered", sent=sent, failed=len(messages) - sent)
+    if len(messages) >= EMAIL_OUTBOX_BATCH_SIZE:
+        # More may be due - run again straight away
+        notify_outbox()
+    return sent
@@ -0,0 +1,452 @@
+"""
+Email templates compiled once at import and rendered by filling only their variable slots
+"""
+import html
+import os
+from string import Formatter
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+EMAIL_DEFAULT_LOCALE = os.getenv("EMAIL_DEFAULT_LOCALE", "en")
+
+class CompiledTemplate:
+    """
+    str.format-style source split once into static chunks and named slots.
+    chunks always has exactly one more entry than slots.
+    """
+
+    __slots__ = ("chunks", "slots", "escape")
+
+    def __init__(self, source: str = "", escape: bool = False):
+        chunks: List[str] = []
+        slots: List[str] = []
+        literal = ""
+        for text, field, _, _ in Formatter().parse(source):
+            literal += text
+            if field is None:
+                continue
+            if not field.isidentifier():
+                raise ValueError(f"Unsupported template field: {field!r}")
+            chunks.append(literal)
+            slots.append(field)
+            literal = ""
+        chunks.append(literal)
+        self.chunks = tuple(chunks)
+        self.slots = tuple(slots)
+        self.escape = escape
+
+    @classmethod
+    def _from_parts(cls, chunks: List[str], slots: List[str], escape: bool) -> "CompiledTemplate":
+        template = cls.__new__(cls)
+        template.chunks = tuple(chunks)
+        template.slots = tuple(slots)
+        template.escape = escape
+        return template
+
+    def bind(self, **values: Union[str, "CompiledTemplate"]) -> "CompiledTemplate":
+        """
+        Bake static values into the chunks (trusted, not escaped). A CompiledTemplate value is
+        inlined with its own slots left open. Unbound slots stay open for render().
+        """
+        chunks = [self.chunks[0]]
+        slots: List[str] = []
+        for slot, chunk in zip(self.slots, self.chunks[1:]):
+            value = values.get(slot)
+            if value is None:
+                slots.append(slot)
+                chunks.append(chunk)
+            elif isinstance(value, CompiledTemplate):
+                chunks[-1] += value.chunks[0]
+                for inner_slot, inner_chunk in zip(value.slots, value.chunks[1:]):
+                    slots.append(inner_slot)
+                    chunks.append(inner_chunk)
+                chunks[-1] += chunk
+            else:
+                chunks[-1] += value + chunk
+        return CompiledTemplate._from_parts(chunks, slots, self.escape)
+
+    def render(self, values: Dict[str, object]) -> str:
+        """Join the static chunks with the slot values, HTML-escaped when the template is"""
+        parts = [self.chunks[0]]
+        for slot, chunk in zip(self.slots, self.chunks[1:]):
+            value = str(values[slot])
+            parts.append(html.escape(value) if self.escape else value)
+            parts.append(chunk)
+        return "".join(parts)
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    text: str
+    html: str
+
+class EmailTemplate(NamedTuple):
+    subject: CompiledTemplate
+    text: CompiledTemplate
+    html: CompiledTemplate
+
+    def render(self, values: Dict[str, object]) -> RenderedEmail:
+        return RenderedEmail(self.subject.render(values), self.text.render(values), self.html.render(values))
+
+# Shared HTML layout; CSS braces are doubled because this is a format-style source
+HTML_LAYOUT = CompiledTemplate("""<!DOCTYPE html>
+<html lang="{lang}">
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>
+        body {{
+            font-family: Arial, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 600px;
+            margin: 0 auto;
+            padding: 20px;
+        }}
+        .header {{
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 30px;
+            text-align: center;
+            border-radius: 10px 10px 0 0;
+        }}
+        .content {{
+            background: #f9f9f9;
+            padding: 30px;
+            border-radius: 0 0 10px 10px;
+        }}
+        .button {{
+            display: inline-block;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 15px 30px;
+            text-decoration: none;
+            border-radius: 5px;
+            margin: 20px 0;
+            font-weight: bold;
+        }}
+        .button:hover {{
+            opacity: 0.9;
+        }}
+        .footer {{
+            margin-top: 30px;
+            padding-top: 20px;
+            border-top: 1px solid #ddd;
+            font-size: 12px;
+            color: #666;
+        }}
+        .warning {{
+            background: #fff3cd;
+            border: 1px solid #ffeaa7;
+            color: #856404;
+            padding: 15px;
+            border-radius: 5px;
+            margin: 20px 0;
+        }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>{heading}</h1>
+        <p>Auth System</p>
+    </div>
+
+    <div class="content">
+{content}
+    </div>
+
+    <div class="footer">
+{footer}
+        <p>© 2025 Auth System. All rights reserved.</p>
+    </div>
+</body>
+</html>
+""", escape=True)
+
+_TEMPLATES: Dict[Tuple[str, str], EmailTemplate] = {}
+
+def register_template(name: str, locale: str, subject: str, heading: str, html_content: str, footer: str, text: str):
+    """Compile a template once; the layout and all static text are merged into its chunks"""
+    subject_template = CompiledTemplate(subject)
+    _TEMPLATES[(name, locale)] = EmailTemplate(
+        subject=subject_template,
+        text=CompiledTemplate(text.strip()),
+        html=HTML_LAYOUT.bind(
+            lang=locale,
+            title=subject_template,
+            heading=heading,
+            content=CompiledTemplate(html_content.strip("\n")),
+            footer=footer.strip("\n")
+        )
+    )
+
+def get_template(name: str, locale: Optional[str] = None) -> EmailTemplate:
+    """Template for locale, falling back to EMAIL_DEFAULT_LOCALE and then English"""
+    for candidate in (locale, EMAIL_DEFAULT_LOCALE, "en"):
+        template = _TEMPLATES.get((name, candidate))
+        if template is not None:
+            return template
+    raise KeyError(f"Unknown email template: {name}")
+
+def render_email(name: str, locale: Optional[str] = None, **values: object) -> RenderedEmail:
+    return get_template(name, locale).render(values)
+
+# Password reset
+register_template(
+    "password_reset", "en",
+    subject="Reset Your Password - Auth System",
+    heading="🔐 Reset Your Password",
+    html_content="""
+        <h2>Hi {username},</h2>
+
+        <p>You requested to reset your password for your Auth System account. Click the button below to reset your password:</p>
+
+        <div style="text-align: center;">
+            <a href="{reset_link}" class="button">Reset Password</a>
+        </div>
+
+        <p>Or copy and paste this link into your browser:</p>
+        <p style="word-break: break-all; background: #f0f0f0; padding: 10px; border-radius: 5px;">
+            {reset_link}
+        </p>
+
+        <div class="warning">
+            <strong>⚠️ Important:</strong>
+            <ul>
+                <li>This link will expire in <strong>{expiry_minutes} minutes</strong></li>
+                <li>You can only use this link once</li>
+                <li>If you didn't request this, please ignore this email</li>
+            </ul>
+        </div>
+
+        <p>If you're having trouble clicking the button, copy and paste the URL above into your web browser.</p>
+
+        <p>Best regards,<br>
+        <strong>Auth System Team</strong></p>
+""",
+    footer="""
+        <p>This email was sent to you because a password reset was requested for your account.</p>
+        <p>If you did not request this password reset, please ignore this email or contact support if you have concerns.</p>
+""",
+    text="""
+Reset Your Password - Auth System
+
+Hi {username},
+
+You requested to reset your password for your Auth System account.
+
+Click the link below to reset your password:
+{reset_link}
+
+IMPORTANT:
+- This link will expire in {expiry_minutes} minutes
+- You can only use this link once
+- If you didn't request this, please ignore this email
+
+If you're having trouble with the link, copy and paste it into your web browser.
+
+Best regards,
+Auth System Team
+
+---
+This email was sent because a password reset was requested for your account.
+If you did not request this, please ignore this email or contact support.
+
+© 2025 Auth System. All rights reserved.
+"""
+)
+
+register_template(
+    "password_reset", "th",
+    subject="รีเซ็ตรหัสผ่านของคุณ - Auth System",
+    heading="🔐 รีเซ็ตรหัสผ่านของคุณ",
+    html_content="""
+        <h2>สวัสดีคุณ {username},</h2>
+
+        <p>เราได้รับคำขอรีเซ็ตรหัสผ่านสำหรับบัญชี Auth System ของคุณ คลิกปุ่มด้านล่างเพื่อตั้งรหัสผ่านใหม่:</p>
+
+        <div style="text-align: center;">
+            <a href="{reset_link}" class="button">รีเซ็ตรหัสผ่าน</a>
+        </div>
+
+        <p>หรือคัดลอกลิงก์นี้ไปวางในเบราว์เซอร์ของคุณ:</p>
+        <p style="word-break: break-all; background: #f0f0f0; padding: 10px; border-radius: 5px;">
+            {reset_link}
+        </p>
+
+        <div class="warning">
+            <strong>⚠️ สำคัญ:</strong>
+            <ul>
+                <li>ลิงก์นี้จะหมดอายุภายใน <strong>{expiry_minutes} นาที</strong></li>
+                <li>ลิงก์นี้ใช้ได้เพียงครั้งเดียว</li>
+                <li>หากคุณไม่ได้ส่งคำขอนี้ โปรดเพิกเฉยต่ออีเมลฉบับนี้</li>
+            </ul>
+        </div>
+
+        <p>ขอแสดงความนับถือ<br>
+        <strong>ทีมงาน Auth System</strong></p>
+""",
+    footer="""
+        <p>อีเมลนี้ถูกส่งถึงคุณเนื่องจากมีการขอรีเซ็ตรหัสผ่านสำหรับบัญชีของคุณ</p>
+        <p>หากคุณไม่ได้ส่งคำขอนี้ โปรดเพิกเฉยต่ออีเมลฉบับนี้หรือติดต่อฝ่ายสนับสนุน</p>
+""",
+    text="""
+รีเซ็ตรหัสผ่านของคุณ - Auth System
+
+สวัสดีคุณ {username},
+
+เราได้รับคำขอรีเซ็ตรหัสผ่านสำหรับบัญชี Auth System ของคุณ
+
+คลิกลิงก์ด้านล่างเพื่อตั้งรหัสผ่านใหม่:
+{reset_link}
+
+สำคัญ:
+- ลิงก์นี้จะหมดอายุภายใน {expiry_minutes} นาที
+- ลิงก์นี้ใช้ได้เพียงครั้งเดียว
+- หากคุณไม่ได้ส่งคำขอนี้ โปรดเพิกเฉยต่ออีเมลฉบับนี้
+
+ขอแสดงความนับถือ
+ทีมงาน Auth System
+
+© 2025 Auth System. All rights reserved.
+"""
+)
+
+# Welcome
+register_template(
+    "welcome", "en",
+    subject="Welcome to Auth System",
+    heading="👋 Welcome",
+    html_content="""
+        <h2>Hi {username},</h2>
+
+        <p>Your Auth System account has been created. You can sign in with your username <strong>{username}</strong>.</p>
+
+        <div style="text-align: center;">
+            <a href="{login_link}" class="button">Sign In</a>
+        </div>
+
+        <p>Best regards,<br>
+        <strong>Auth System Team</strong></p>
+""",
+    footer="""
+        <p>This email was sent to you because an account was created with this address.</p>
+""",
+    text="""
+Welcome to Auth System
+
+Hi {username},
+
+Your Auth System account has been created. You can sign in with your username {username}:
+{login_link}
+
+Best regards,
+Auth System Team
+
+© 2025 Auth System. All rights reserved.
+"""
+)
+
+register_template(
+    "welcome", "th",
+    subject="ยินดีต้อนรับสู่ Auth System",
+    heading="👋 ยินดีต้อนรับ",
+    html_content="""
+        <h2>สวัสดีคุณ {username},</h2>
+
+        <p>บัญชี Auth System ของคุณถูกสร้างเรียบร้อยแล้ว คุณสามารถเข้าสู่ระบบด้วยชื่อผู้ใช้ <strong>{username}</strong></p>
+
+        <div style="text-align: center;">
+            <a href="{login_link}" class="button">เข้าสู่ระบบ</a>
+        </div>
+
+        <p>ขอแสดงความนับถือ<br>
+        <strong>ทีมงาน Auth System</strong></p>
+""",
+    footer="""
+        <p>อีเมลนี้ถูกส่งถึงคุณเนื่องจากมีการสร้างบัญชีด้วยที่อยู่อีเมลนี้</p>
+""",
+    text="""
+ยินดีต้อนรับสู่ Auth System
+
+สวัสดีคุณ {username},
+
+บัญชี Auth System ของคุณถูกสร้างเรียบร้อยแล้ว คุณสามารถเข้าสู่ระบบด้วยชื่อผู้ใช้ {username}:
+{login_link}
+
+ขอแสดงความนับถือ
+ทีมงาน Auth System
+
+© 2025 Auth System. All rights reserved.
+"""
+)
+
+# Account disabled
+register_template(
+    "account_disabled", "en",
+    subject="Your Account Has Been Disabled - Auth System",
+    heading="⛔ Account Disabled",
+    html_content="""
+        <h2>Hi {username},</h2>
+
+        <p>Your Auth System account has been disabled by an administrator. You will not be able to sign in until it is re-enabled.</p>
+
+        <div class="warning">
+            If you believe this is a mistake, please contact support.
+        </div>
+
+        <p>Best regards,<br>
+        <strong>Auth System Team</strong></p>
+""",
+    footer="""
+        <p>This email was sent to you because the status of your account changed.</p>
+""",
+    text="""
+Your Account Has Been Disabled - Auth System
+
+Hi {username},
+
+Your Auth System account has been disabled by an administrator. You will not be able to sign in until it is re-enabled.
+
+If you believe this is a mistake, please contact support.
+
+Best regards,
+Auth System Team
+
+© 2025 Auth System. All rights reserved.
+"""
+)
+
+register_template(
+    "account_disabled", "th",
+    subject="บัญชีของคุณถูกระงับการใช้งาน - Auth System",
+    heading="⛔ บัญชีถูกระงับการใช้งาน",
+    html_content="""
+        <h2>สวัสดีคุณ {username},</h2>
+
+        <p>บัญชี Auth System ของคุณถูกระงับการใช้งานโดยผู้ดูแลระบบ คุณจะไม่สามารถเข้าสู่ระบบได้จนกว่าบัญชีจะถูกเปิดใช้งานอีกครั้ง</p>
+
+        <div class="warning">
+            หากคุณคิดว่าเป็นความผิดพลาด โปรดติดต่อฝ่ายสนับสนุน
+        </div>
+
+        <p>ขอแสดงความนับถือ<br>
+        <strong>ทีมงาน Auth System</strong></p>
+""",
+    footer="""
+        <p>อีเมลนี้ถูกส่งถึงคุณเนื่องจากสถานะบัญชีของคุณมีการเปลี่ยนแปลง</p>
+""",
+    text="""
+บัญชีของคุณถูกระงับการใช้งาน - Auth System
+
+สวัสดีคุณ {username},
+
+บัญชี Auth System ของคุณถูกระงับการใช้งานโดยผู้ดูแลระบบ คุณจะไม่สามารถเข้าสู่ระบบได้จนกว่าบัญชีจะถูกเปิดใช้งานอีกครั้ง
+
+หากคุณคิดว่าเป็นความผิดพลาด โปรดติดต่อฝ่ายสนับสนุน
+
+ขอแสดงความนับถือ
+ทีมงาน Auth System
+
+© 2025 Auth System. All rights reserved.
+"""
+)
@@ -0,0 +1,75 @@
+"""
+Streaming NDJSON/CSV exports of SME tables read through server-side cursors
+"""
+import csv
+import io
+import os
+from datetime import date
+from typing import AsyncIterator, Type
+
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+
+from app.database import AsyncSessionLocal
+from app.logging_config import get_logger
+from app.sme_schemas import RowModel, list_adapter
+
+logger = get_logger("exports")
+
+# Rows fetched per round trip and encoded per chunk; memory use is bounded by this, not the table size
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+EXPORT_FORMAT_PATTERN = "^(ndjson|csv)$"
+
+async def _export_chunks(query: Select, model: Type[RowModel], export_format: str) -> AsyncIterator[bytes]:
+    adapter = list_adapter(model)
+    columns = list(model.model_fields)
+    rows_written = 0
+    # Own session: the connection is held exactly as long as the stream, independent of request teardown
+    async with AsyncSessionLocal() as db:
+        try:
+            result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            if export_format == "csv":
+                yield _csv_chunk([columns])
+            async for partition in result.partitions():
+                keys = partition[0]._fields
+                items = adapter.dump_python(
+                    adapter.validate_python([dict(zip(keys, row)) for row in partition]), mode="json"
+                )
+                if export_format == "csv":
+                    yield _csv_chunk([[_csv_value(item[column]) for column in columns] for item in items])
+                else:
+                    yield b"".join(orjson.dumps(item) + b"\n" for item in items)
+                rows_written += len(items)
+        except Exception:
+            # Headers are already sent; the client sees a truncated body
+            logger.exception("Export failed", model=model.__name__, rows_written=rows_written)
+            raise
+    logger.info("Export completed", model=model.__name__, format=export_format, rows=rows_written)
+
+def _csv_value(value):
+    # Same spelling as the NDJSON lines; None is already written as an empty field
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    return value
+
+def _csv_chunk(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+def export_response(query: Select, model: Type[RowModel], export_format: str, name: str) -> StreamingResponse:
+    """Stream every row of `query` as `model` records, one NDJSON line or CSV row each"""
+    filename = f"{name}-{date.today().isoformat()}.{export_format}"
+    return StreamingResponse(
+        _export_chunks(query, model, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
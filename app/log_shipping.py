@@ -0,0 +1,197 @@
+"""
+Queue-based log shipping: records are handed to a bounded queue and written by a background thread
+"""
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+LOG_QUEUE_ENABLED = os.getenv("LOG_QUEUE_ENABLED", "true").lower() == "true"
+# Records waiting to be written; beyond this new records are dropped (see LOG_QUEUE_BLOCK_SECONDS)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+# Records written per batch; handlers are flushed once per batch instead of once per record
+LOG_QUEUE_BATCH_SIZE = int(os.getenv("LOG_QUEUE_BATCH_SIZE", 256))
+# ERROR and above wait this long for queue space before being dropped; 0 drops them like the rest
+LOG_QUEUE_BLOCK_SECONDS = float(os.getenv("LOG_QUEUE_BLOCK_SECONDS", 0.05))
+
+class BatchFlushMixin:
+    """Handler whose flush() is skipped while the shipper is writing a batch"""
+
+    deferring = False
+
+    def flush(self):
+        if not self.deferring:
+            super().flush()
+
+class BatchingStreamHandler(BatchFlushMixin, logging.StreamHandler):
+    pass
+
+class BatchingRotatingFileHandler(BatchFlushMixin, logging.handlers.RotatingFileHandler):
+    pass
+
+class ShippingHandler(logging.Handler):
+    """Stands in for a logger's real handlers and queues records for them"""
+
+    def __init__(self, shipper: "LogShipper", targets: Tuple[logging.Handler, ...]):
+        super().__init__(level=min((h.level for h in targets), default=logging.NOTSET))
+        self.shipper = shipper
+        self.targets = targets
+
+    def emit(self, record: logging.LogRecord):
+        # Render %-style arguments now; they may be mutated before the writer thread sees them
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        self.shipper.enqueue(record, self.targets)
+
+class LogShipper:
+    """Bounded queue of (record, handlers) drained in batches by one writer thread"""
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        maxsize: int = LOG_QUEUE_SIZE,
+        batch_size: int = LOG_QUEUE_BATCH_SIZE,
+        block_seconds: float = LOG_QUEUE_BLOCK_SECONDS
+    ):
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize)
+        self.batch_size = batch_size
+        self.block_seconds = block_seconds
+        self._thread: Optional[threading.Thread] = None
+        self._handlers: List[logging.Handler] = []
+        self._installed: Dict[str, List[logging.Handler]] = {}
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.max_depth = 0
+        self._reported_dropped = 0
+
+    def install(self, logger_names: Iterable[str]):
+        """Route each named logger's configured handlers through the queue"""
+        for name in logger_names:
+            target = logging.getLogger(name or None)
+            if not target.handlers:
+                continue
+            handlers = tuple(target.handlers)
+            for handler in handlers:
+                if handler not in self._handlers:
+                    self._handlers.append(handler)
+            self._installed[name] = target.handlers
+            target.handlers = [ShippingHandler(self, handlers)]
+
+    def enqueue(self, record: logging.LogRecord, targets: Tuple[logging.Handler, ...]):
+        try:
+            self.queue.put_nowait((record, targets))
+        except queue.Full:
+            if record.levelno < logging.ERROR or self.block_seconds <= 0:
+                self.dropped += 1
+                return
+            try:
+                self.queue.put((record, targets), timeout=self.block_seconds)
+            except queue.Full:
+                self.dropped += 1
+                return
+        self.enqueued += 1
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="log-shipper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Write everything still queued, stop the writer thread and give the loggers their
+        handlers back, so records logged after shutdown are written directly
+        """
+        if self._thread is None:
+            return
+        self.queue.put(self._STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        for name, handlers in self._installed.items():
+            logging.getLogger(name or None).handlers = handlers
+        self._installed = {}
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = any(item is self._STOP for item in batch)
+            self._write([item for item in batch if item is not self._STOP])
+            if stopping:
+                return
+
+    def _write(self, batch: List[Tuple[logging.LogRecord, Tuple[logging.Handler, ...]]]):
+        if not batch:
+            return
+        if self.dropped > self._reported_dropped:
+            # Reported through the same handlers as the record that follows the gap
+            lost = self.dropped - self._reported_dropped
+            self._reported_dropped = self.dropped
+            warning = logging.makeLogRecord({
+                "name": "log_shipping",
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Log queue full, dropped {lost} records",
+            })
+            batch.insert(0, (warning, batch[0][1]))
+
+        batching = [h for h in self._handlers if isinstance(h, BatchFlushMixin)]
+        for handler in batching:
+            handler.deferring = True
+        try:
+            for record, targets in batch:
+                for handler in targets:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+        finally:
+            for handler in batching:
+                handler.deferring = False
+                try:
+                    handler.flush()
+                except Exception:
+                    handler.handleError(batch[-1][0])
+        self.written += len(batch)
+        self.batches += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+        }
+
+# Active shipper, replaced on every setup_logging() call
+log_shipper: Optional[LogShipper] = None
+
+def start_log_shipping(logger_names: Iterable[str]) -> Optional[LogShipper]:
+    global log_shipper
+    stop_log_shipping()
+    if not LOG_QUEUE_ENABLED:
+        return None
+    log_shipper = LogShipper()
+    log_shipper.install(logger_names)
+    log_shipper.start()
+    return log_shipper
+
+def stop_log_shipping():
+    """Flush queued records; called from the application lifespan on shutdown"""
+    if log_shipper is not None:
+        log_shipper.stop()
+
+def log_shipping_stats() -> Optional[Dict[str, Any]]:
+    return log_shipper.stats() if log_shipper is not None else None
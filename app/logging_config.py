@@ -9,6 +9,8 @@ from datetime import datetime
 from typing import Any, Dict
 import os
 
+from app.log_shipping import start_log_shipping
+
 def setup_logging():
     """Configure structured logging for the application"""
     
@@ -32,13 +34,13 @@ def setup_logging():
         },
         'handlers': {
             'console': {
-                'class': 'logging.StreamHandler',
+                'class': 'app.log_shipping.BatchingStreamHandler',
                 'level': log_level,
                 'formatter': 'standard',
                 'stream': sys.stdout
             },
             'file': {
-                'class': 'logging.handlers.RotatingFileHandler',
+                'class': 'app.log_shipping.BatchingRotatingFileHandler',
                 'level': log_level,
                 'formatter': 'json' if environment == 'production' else 'standard',
                 'filename': 'logs/app.log',
@@ -46,7 +48,7 @@ def setup_logging():
                 'backupCount': 5
             },
             'error_file': {
-                'class': 'logging.handlers.RotatingFileHandler',
+                'class': 'app.log_shipping.BatchingRotatingFileHandler',
                 'level': 'ERROR',
                 'formatter': 'json' if environment == 'production' else 'standard',
                 'filename': 'logs/error.log',
@@ -88,6 +90,9 @@ def setup_logging():
     
     # Apply logging configuration
     logging.config.dictConfig(logging_config)
+
+    # Handlers run on a background writer thread; callers only enqueue the record
+    start_log_shipping(logging_config['loggers'])
     
     # Configure structlog
     structlog.configure(
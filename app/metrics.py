@@ -0,0 +1,237 @@
+"""
+In-process metrics registry with Prometheus text exposition
+"""
+import json
+import os
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+# With several uvicorn workers, each writes its samples here and /metrics merges all files.
+# Empty the directory when the service (not a single worker) starts.
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_SNAPSHOT_SECONDS = float(os.getenv("METRICS_SNAPSHOT_SECONDS", 15))
+# Scrapers must send "Authorization: Bearer <token>"; required when metrics are enabled
+METRICS_BEARER_TOKEN = os.getenv("METRICS_BEARER_TOKEN", "")
+
+if METRICS_ENABLED and not METRICS_BEARER_TOKEN:
+    raise ValueError("METRICS_BEARER_TOKEN is required when METRICS_ENABLED is true")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+class _Metric:
+    """
+    Samples are kept in one shard per thread, so updates need no lock and never contend;
+    shards are summed when the metrics are collected
+    """
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[LabelValues, Any]] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[LabelValues, Any]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: Dict[LabelValues, Any] = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _merge(self, total: Any, value: Any) -> Any:
+        return total + value
+
+    def collect(self) -> Dict[LabelValues, Any]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        merged: Dict[LabelValues, Any] = {}
+        for shard in shards:
+            for labels, value in list(shard.items()):
+                merged[labels] = self._merge(merged[labels], value) if labels in merged else self._copy(value)
+        return merged
+
+    def _copy(self, value: Any) -> Any:
+        return value
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        if not METRICS_ENABLED:
+            return
+        shard = self._shard()
+        shard[labelvalues] = shard.get(labelvalues, 0) + amount
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; each sample is [bucket counts..., +Inf count, sum]"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues: str):
+        if not METRICS_ENABLED:
+            return
+        shard = self._shard()
+        cell = shard.get(labelvalues)
+        if cell is None:
+            cell = shard[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def _merge(self, total: List[float], value: List[float]) -> List[float]:
+        for index, amount in enumerate(value):
+            total[index] += amount
+        return total
+
+    def _copy(self, value: List[float]) -> List[float]:
+        return list(value)
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """This process's samples in a JSON-serializable form"""
+        return {
+            metric.name: {
+                "type": metric.type_name,
+                "help": metric.documentation,
+                "labelnames": list(metric.labelnames),
+                "buckets": list(getattr(metric, "buckets", ())),
+                "samples": [[list(labels), value] for labels, value in metric.collect().items()],
+            }
+            for metric in self._metrics.values()
+        }
+
+    # Multiprocess support
+    def _snapshot_path(self) -> str:
+        return os.path.join(METRICS_MULTIPROC_DIR, f"metrics_{os.getpid()}.json")
+
+    def write_snapshot(self):
+        """Publish this worker's samples for the other workers' /metrics (atomic replace)"""
+        if not METRICS_MULTIPROC_DIR:
+            return
+        os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+        path = self._snapshot_path()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def _snapshots(self) -> Iterable[Dict[str, Dict[str, Any]]]:
+        if not METRICS_MULTIPROC_DIR:
+            yield self.snapshot()
+            return
+        self.write_snapshot()
+        for filename in sorted(os.listdir(METRICS_MULTIPROC_DIR)):
+            if not (filename.startswith("metrics_") and filename.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(METRICS_MULTIPROC_DIR, filename)) as f:
+                    yield json.load(f)
+            except (OSError, ValueError):
+                # Being replaced by its worker right now - picked up on the next scrape
+                continue
+
+    def render(self) -> str:
+        """All workers' samples, summed, in the Prometheus text format (version 0.0.4)"""
+        families: Dict[str, Dict[str, Any]] = {}
+        for snapshot in self._snapshots():
+            for name, family in snapshot.items():
+                merged = families.setdefault(name, {**family, "samples": {}})
+                for labels, value in family["samples"]:
+                    key = tuple(labels)
+                    if key not in merged["samples"]:
+                        merged["samples"][key] = list(value) if isinstance(value, list) else value
+                    elif isinstance(value, list):
+                        merged["samples"][key] = [a + b for a, b in zip(merged["samples"][key], value)]
+                    else:
+                        merged["samples"][key] += value
+
+        lines: List[str] = []
+        for name, family in families.items():
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            labelnames = family["labelnames"]
+            for labels, value in sorted(family["samples"].items()):
+                if family["type"] == "histogram":
+                    cumulative = 0
+                    for bound, count in zip([*family["buckets"], "+Inf"], value[:-1]):
+                        cumulative += count
+                        le = bound if bound == "+Inf" else _format_value(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labelnames, labels, le)} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(value[-1])}")
+                    lines.append(f"{name}_count{_format_labels(labelnames, labels)} {cumulative}")
+                else:
+                    lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def remove_snapshot(self):
+        """Drop this worker's file on shutdown; its counters disappear like a process restart"""
+        if METRICS_MULTIPROC_DIR:
+            try:
+                os.remove(self._snapshot_path())
+            except FileNotFoundError:
+                pass
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labelnames: Sequence[str], labels: Sequence[str], le: Optional[str] = None) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(labelnames, labels)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+# Global registry and application metrics
+metrics_registry = MetricsRegistry()
+
+http_request_duration = metrics_registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and status",
+    ("method", "route", "status")
+)
+auth_failures = metrics_registry.counter(
+    "auth_failures_total", "Rejected logins and bearer tokens", ("reason",)
+)
+rate_limit_rejections = metrics_registry.counter(
+    "rate_limit_rejections_total", "Requests rejected by a rate limiter", ("limiter",)
+)
+db_pool_checkout_wait = metrics_registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection", ("pool",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+)
+db_pool_checkout_timeouts = metrics_registry.counter(
+    "db_pool_checkout_timeouts_total", "Database pool checkouts that timed out", ("pool",)
+)
+password_hash_duration = metrics_registry.histogram(
+    "password_hash_duration_seconds", "bcrypt hash/verify time in the worker pool", ("operation",),
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+)
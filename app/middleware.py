@@ -0,0 +1,210 @@
+"""
+Single ASGI middleware for per-request work: request ID, timing, security headers and access logging
+"""
+import os
+import random
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.logging_config import get_logger
+from app.metrics import http_request_duration
+from app.query_stats import begin_request, end_request
+from app.security import SecurityHeadersMiddleware
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+# "full" logs every request start and completion; "sampled" logs errors, slow requests and a
+# sample of the rest, and reports per-route aggregates every REQUEST_STATS_INTERVAL_SECONDS
+REQUEST_LOG_MODE = os.getenv("REQUEST_LOG_MODE", "full").lower()
+REQUEST_LOG_SAMPLE_RATE = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", 0.01))
+REQUEST_LOG_SLOW_SECONDS = float(os.getenv("REQUEST_LOG_SLOW_SECONDS", 1.0))
+REQUEST_STATS_INTERVAL_SECONDS = float(os.getenv("REQUEST_STATS_INTERVAL_SECONDS", 60))
+# Durations kept per route and interval for the percentiles (reservoir sample beyond this)
+REQUEST_STATS_RESERVOIR_SIZE = int(os.getenv("REQUEST_STATS_RESERVOIR_SIZE", 1024))
+
+def route_template(scope) -> str:
+    """Path template of the matched route (/employees/{employee_id}), keeping route keys bounded"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+class _RouteStats:
+    __slots__ = ("count", "errors", "max", "seen", "durations")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.max = 0.0
+        self.seen = 0
+        self.durations: List[float] = []
+
+class RequestStats:
+    """Per-route request counters and latency percentiles, reset each time they are reported"""
+
+    def __init__(self, reservoir_size: int = REQUEST_STATS_RESERVOIR_SIZE):
+        self.reservoir_size = reservoir_size
+        self.logger = get_logger("request_stats")
+        self._routes: Dict[Tuple[str, str], _RouteStats] = {}
+        self._lock = threading.Lock()
+        self._since = time.monotonic()
+
+    def record(self, method: str, route: str, status_code: int, duration: float):
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = _RouteStats()
+            stats.count += 1
+            if status_code >= 500:
+                stats.errors += 1
+            if duration > stats.max:
+                stats.max = duration
+            stats.seen += 1
+            if len(stats.durations) < self.reservoir_size:
+                stats.durations.append(duration)
+            else:
+                slot = random.randrange(stats.seen)
+                if slot < self.reservoir_size:
+                    stats.durations[slot] = duration
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Log one line per route for the interval since the previous report, then reset"""
+        with self._lock:
+            routes, self._routes = self._routes, {}
+            since, self._since = self._since, time.monotonic()
+        interval = round(self._since - since, 1)
+        summary = []
+        for (method, route), stats in sorted(routes.items(), key=lambda item: item[1].count, reverse=True):
+            durations = sorted(stats.durations)
+            line = {
+                "method": method,
+                "route": route,
+                "count": stats.count,
+                "errors": stats.errors,
+                "p50_seconds": round(_percentile(durations, 0.50), 6),
+                "p95_seconds": round(_percentile(durations, 0.95), 6),
+                "p99_seconds": round(_percentile(durations, 0.99), 6),
+                "max_seconds": round(stats.max, 6),
+            }
+            self.logger.info("Request stats", interval_seconds=interval, **line)
+            summary.append(line)
+        return summary
+
+request_stats = RequestStats()
+
+def client_ip_from_scope(scope) -> str:
+    """Client IP from X-Forwarded-For / X-Real-IP, falling back to the socket peer"""
+    for header_name, header_value in scope.get("headers", []):
+        if header_name == b"x-forwarded-for":
+            return header_value.decode("latin-1").split(",")[0].strip()
+        if header_name == b"x-real-ip":
+            return header_value.decode("latin-1")
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+class RequestContextMiddleware(SecurityHeadersMiddleware):
+    """
+    Replaces the add_request_id / RequestLoggingMiddleware / SecurityHeadersMiddleware stack with
+    one wrapper per request. The request ID is stored in scope["state"] (request.state.request_id)
+    so exception handlers can report it, and is sent back as X-Request-ID.
+    """
+
+    def __init__(self, app, headers=None, route_headers=None, log_mode: str = REQUEST_LOG_MODE):
+        super().__init__(app, headers=headers, route_headers=route_headers)
+        self.logger = get_logger("request")
+        self.sampled = log_mode == "sampled"
+        # Headers this middleware owns; copies set by the application are replaced
+        self.owned_header_names = self.header_names | {REQUEST_ID_HEADER}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        request_id = str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        method = scope.get("method", "")
+        path = scope.get("path", "")
+        client_ip = client_ip_from_scope(scope)
+        if not self.sampled:
+            self.logger.info(
+                "Request started",
+                method=method,
+                path=path,
+                query_string=scope.get("query_string", b"").decode("latin-1"),
+                client_ip=client_ip,
+                request_id=request_id
+            )
+
+        block = self.block_for(path) + ((REQUEST_ID_HEADER, request_id.encode("latin-1")),)
+        owned_header_names = self.owned_header_names
+        status_code: Optional[int] = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = message.get("headers")
+                if headers is None:
+                    message["headers"] = list(block)
+                else:
+                    if any(name in owned_header_names for name, _ in headers):
+                        headers = [header for header in headers if header[0] not in owned_header_names]
+                    elif not isinstance(headers, list):
+                        headers = list(headers)
+                    headers.extend(block)
+                    message["headers"] = headers
+            await send(message)
+
+        query_stats_token = begin_request(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            self.logger.error(
+                "Request failed with exception",
+                method=method,
+                path=path,
+                client_ip=client_ip,
+                request_id=request_id,
+                error=str(e),
+                exc_info=True
+            )
+            raise
+        finally:
+            # No response started means the exception escaped to the server error handler
+            final_status = 500 if status_code is None else status_code
+            duration = time.perf_counter() - start_time
+            query_stats = end_request(query_stats_token, method, path)
+            route = route_template(scope)
+            http_request_duration.observe(duration, method, route, str(final_status))
+            if self.sampled:
+                request_stats.record(method, route, final_status, duration)
+            if final_status >= 500:
+                log = self.logger.error
+            elif final_status >= 400:
+                log = self.logger.warning
+            elif not self.sampled:
+                log = self.logger.info
+            elif duration >= REQUEST_LOG_SLOW_SECONDS:
+                log = self.logger.warning
+            elif random.random() < REQUEST_LOG_SAMPLE_RATE:
+                log = self.logger.info
+            else:
+                log = None
+            if log is not None:
+                log(
+                    "Request completed",
+                    method=method,
+                    path=path,
+                    status_code=final_status,
+                    duration_seconds=round(duration, 6),
+                    db_statements=query_stats.statements,
+                    db_seconds=round(query_stats.db_seconds, 6),
+                    client_ip=client_ip,
+                    request_id=request_id
+                )
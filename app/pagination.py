@@ -0,0 +1,82 @@
+"""
+Keyset (cursor) pagination for list endpoints
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_
+from sqlalchemy.sql import Select
+
+# Response header carrying the opaque cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def _from_json(value: Any, column) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return value
+
+def encode_cursor(sort_value: Any, pk_value: Any) -> str:
+    """Opaque token for the position after (sort_value, pk_value)"""
+    raw = json.dumps([_to_json(sort_value), _to_json(pk_value)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_column, pk_column) -> Tuple[Any, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, pk_value = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return _from_json(sort_value, sort_column), _from_json(pk_value, pk_column)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def paginate(query: Select, sort_column, pk_column, skip: int, limit: int, cursor: Optional[str]) -> Select:
+    """
+    Order by (sort_column, pk_column) and page either by cursor (keyset) or by skip (offset).
+    Fetches one extra row so finish_page can tell whether another page exists.
+    """
+    query = query.order_by(sort_column, pk_column)
+    if cursor:
+        if skip:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use either cursor or skip, not both"
+            )
+        sort_value, pk_value = decode_cursor(cursor, sort_column, pk_column)
+        query = query.where(or_(
+            sort_column > sort_value,
+            and_(sort_column == sort_value, pk_column > pk_value)
+        ))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+def finish_page(rows: Sequence, limit: int, response: Response, sort_column, pk_column) -> List:
+    """Trim the look-ahead row and publish the next cursor header when there is more data"""
+    rows = list(rows)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            getattr(last, sort_column.key), getattr(last, pk_column.key)
+        )
+    return rows
@@ -0,0 +1,146 @@
+"""
+Password hashing service - runs bcrypt in a bounded worker pool off the event loop
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.logging_config import get_logger
+from app.metrics import password_hash_duration
+
+logger = get_logger("password_hasher")
+
+# Configuration
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")  # thread | process
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 32))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Worker functions live at module level so they can be pickled for a process pool
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    except (ValueError, TypeError):
+        # Malformed or unknown hash format
+        return False
+
+def _timed(func: Callable, *args) -> Tuple[Any, float]:
+    """Run func in the worker and report how long bcrypt itself took"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+class PasswordHasher:
+    """Bounded bcrypt worker pool with backpressure and latency metrics"""
+
+    def __init__(self, executor_type: str = "thread", max_workers: int = 4, queue_size: int = 32):
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"Unsupported password hash executor: {executor_type}")
+        self.executor_type = executor_type
+        self.max_workers = max(1, max_workers)
+        self.queue_size = max(0, queue_size)
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        self._metrics: Dict[str, Dict[str, float]] = {
+            op: {"calls": 0, "rejected": 0, "total_seconds": 0.0, "max_seconds": 0.0, "wait_seconds": 0.0}
+            for op in ("hash", "verify")
+        }
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of calls running or queued at once"""
+        return self.max_workers + self.queue_size
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def _run(self, op: str, func: Callable, *args):
+        metrics = self._metrics[op]
+        if self._in_flight >= self.capacity:
+            metrics["rejected"] += 1
+            logger.warning(
+                "Password hashing pool saturated",
+                operation=op,
+                in_flight=self._in_flight,
+                capacity=self.capacity
+            )
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, run_seconds = await loop.run_in_executor(self._get_executor(), _timed, func, *args)
+        finally:
+            self._in_flight -= 1
+
+        elapsed = time.perf_counter() - started
+        metrics["calls"] += 1
+        metrics["total_seconds"] += elapsed
+        metrics["wait_seconds"] += max(0.0, elapsed - run_seconds)
+        metrics["max_seconds"] = max(metrics["max_seconds"], elapsed)
+        password_hash_duration.observe(run_seconds, op)
+        return result
+
+    async def hash(self, password: str) -> str:
+        """Hash a password without blocking the event loop"""
+        return await self._run("hash", _hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password without blocking the event loop"""
+        if not hashed_password:
+            return False
+        return await self._run("verify", _verify, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool occupancy and per-operation latency"""
+        operations = {}
+        for op, metrics in self._metrics.items():
+            calls = metrics["calls"]
+            operations[op] = {
+                "calls": int(calls),
+                "rejected": int(metrics["rejected"]),
+                "avg_seconds": round(metrics["total_seconds"] / calls, 6) if calls else 0.0,
+                "avg_wait_seconds": round(metrics["wait_seconds"] / calls, 6) if calls else 0.0,
+                "max_seconds": round(metrics["max_seconds"], 6),
+            }
+        return {
+            "executor": self.executor_type,
+            "workers": self.max_workers,
+            "queue_size": self.queue_size,
+            "in_flight": self._in_flight,
+            "operations": operations,
+        }
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# Global password hasher instance
+password_hasher = PasswordHasher(
+    executor_type=PASSWORD_HASH_EXECUTOR,
+    max_workers=PASSWORD_HASH_WORKERS,
+    queue_size=PASSWORD_HASH_QUEUE_SIZE,
+)
@@ -0,0 +1,109 @@
+"""
+Per-request SQL statement accounting and slow-query logging via SQLAlchemy engine events
+"""
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.logging_config import get_logger
+
+logger = get_logger("query_stats")
+
+# Attaching cursor events costs roughly 20us per statement; false leaves the engines untouched
+DB_QUERY_STATS_ENABLED = os.getenv("DB_QUERY_STATS_ENABLED", "true").lower() == "true"
+DB_SLOW_QUERY_SECONDS = float(os.getenv("DB_SLOW_QUERY_SECONDS", 0.5))
+# A request running the same statement at least this many times is reported as a likely N+1
+DB_REPEATED_STATEMENT_THRESHOLD = int(os.getenv("DB_REPEATED_STATEMENT_THRESHOLD", 10))
+# Statements are truncated to this many characters in log lines
+DB_LOG_STATEMENT_CHARS = int(os.getenv("DB_LOG_STATEMENT_CHARS", 500))
+
+class RequestQueryStats:
+    """Statements and database time of one request"""
+
+    __slots__ = ("request_id", "statements", "db_seconds", "by_statement")
+
+    def __init__(self, request_id: Optional[str]):
+        self.request_id = request_id
+        self.statements = 0
+        self.db_seconds = 0.0
+        # Parameterised SQL text -> executions, so repeats with different values are grouped
+        self.by_statement: Counter = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.statements += 1
+        self.db_seconds += seconds
+        self.by_statement[statement] += 1
+
+    def repeated_statements(self, threshold: Optional[int] = None):
+        threshold = threshold or DB_REPEATED_STATEMENT_THRESHOLD
+        return [(statement, count) for statement, count in self.by_statement.most_common() if count >= threshold]
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+def begin_request(request_id: Optional[str]) -> Token:
+    """Start counting statements issued from this context (the request task)"""
+    return _current.set(RequestQueryStats(request_id))
+
+def end_request(token: Token, method: str, path: str) -> RequestQueryStats:
+    """Stop counting; logs statements repeated often enough to suggest an N+1 pattern"""
+    stats = _current.get()
+    _current.reset(token)
+    for statement, count in stats.repeated_statements():
+        logger.warning(
+            "Repeated SQL statement in one request (possible N+1)",
+            request_id=stats.request_id,
+            method=method,
+            path=path,
+            executions=count,
+            statement=_truncate(statement)
+        )
+    return stats
+
+def _truncate(statement: str) -> str:
+    statement = " ".join(statement.split())
+    if len(statement) > DB_LOG_STATEMENT_CHARS:
+        return statement[:DB_LOG_STATEMENT_CHARS] + "..."
+    return statement
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """Parameter shape without values: names for dicts, positions for sequences"""
+    if executemany and isinstance(parameters, (list, tuple)):
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: "?" for key in parameters}
+    if isinstance(parameters, (list, tuple)):
+        return ["?"] * len(parameters)
+    return "?"
+
+def instrument_queries(engine: Engine):
+    """Time every statement on a (sync) engine; use async_engine.sync_engine for async engines"""
+    if not DB_QUERY_STATS_ENABLED:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_started", None)
+        if started is None:
+            return
+        seconds = time.perf_counter() - started
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+        if seconds >= DB_SLOW_QUERY_SECONDS:
+            logger.warning(
+                "Slow SQL statement",
+                request_id=stats.request_id if stats is not None else None,
+                duration_seconds=round(seconds, 6),
+                statement=_truncate(statement),
+                parameters=redact_parameters(parameters, executemany)
+            )
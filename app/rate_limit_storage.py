@@ -0,0 +1,142 @@
+"""
+SQLite rate limit storage shared by every worker process on one host
+"""
+import os
+import sqlite3
+import threading
+import time
+from math import floor
+from typing import Optional, Tuple
+
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport, TimestampedSlidingWindow
+
+# Expired counters are deleted at most this often (per process)
+RATE_LIMIT_SQLITE_PURGE_SECONDS = float(os.getenv("RATE_LIMIT_SQLITE_PURGE_SECONDS", 60))
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """
+    Counter storage in a SQLite file (``sqlite:///path/to/limits.db``) for the fixed-window and
+    sliding-window-counter strategies. Each key is one row holding a counter and its expiry, and
+    the sliding window uses two keys per limit, so memory per client stays constant. Every update
+    is a single atomic upsert; WAL mode lets worker processes read and write concurrently.
+    Requires SQLite 3.35+ (RETURNING).
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        # Same convention as SQLAlchemy: sqlite:///relative.db, sqlite:////absolute/path.db
+        self.path = (uri or "sqlite:///rate_limits.db").split("://", 1)[1][1:] or "rate_limits.db"
+        self.timeout = float(options.get("timeout", 5))
+        self._local = threading.local()
+        self._last_purge = 0.0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            "key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_rate_limits_expires_at ON rate_limits (expires_at)")
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _purge_expired(self, now: float):
+        if now - self._last_purge < RATE_LIMIT_SQLITE_PURGE_SECONDS:
+            return
+        self._last_purge = now
+        self._connection().execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+
+    def incr(self, key: str, expiry: float, amount: int = 1) -> int:
+        """Add amount to key, restarting it (with a fresh expiry) if it has expired"""
+        now = time.time()
+        self._purge_expired(now)
+        row = self._connection().execute(
+            "INSERT INTO rate_limits (key, value, expires_at) VALUES (:key, :amount, :expires_at) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "value = CASE WHEN expires_at <= :now THEN :amount ELSE value + :amount END, "
+            "expires_at = CASE WHEN expires_at <= :now THEN :expires_at ELSE expires_at END "
+            "RETURNING value",
+            {"key": key, "amount": amount, "expires_at": now + expiry, "now": now}
+        ).fetchone()
+        return row[0]
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        row = self._connection().execute(
+            "UPDATE rate_limits SET value = MAX(value - ?, 0) WHERE key = ? AND expires_at > ? RETURNING value",
+            (amount, key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get(self, key: str) -> int:
+        row = self._connection().execute(
+            "SELECT value FROM rate_limits WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT expires_at FROM rate_limits WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    def check(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        return self._connection().execute("DELETE FROM rate_limits").rowcount
+
+    def clear(self, key: str) -> None:
+        self._connection().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    # Sliding window counter: same weighting as limits' MemoryStorage, over two timestamped keys
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count, previous_ttl, current_count, _ = self._sliding_window_info(previous_key, current_key, expiry, now)
+        if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+            return False
+        # The current window's row must outlive the next window, where it becomes "previous"
+        current_count = self.incr(current_key, 2 * expiry, amount=amount)
+        if floor(previous_count * previous_ttl / expiry + current_count) > limit:
+            # Lost a race with another worker - give the slot back
+            self.decr(current_key, amount)
+            return False
+        return True
+
+    def _sliding_window_info(self, previous_key: str, current_key: str, expiry: int, now: float) -> Tuple[int, float, int, float]:
+        previous_count = self.get(previous_key)
+        current_count = self.get(current_key)
+        previous_ttl = 0.0 if previous_count == 0 else (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        return self._sliding_window_info(previous_key, current_key, expiry, now)
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
@@ -6,46 +6,186 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
+import os
 import re
 import logging
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Registers the sqlite:// scheme with limits
+from app.rate_limit_storage import SQLiteStorage
+from app.metrics import rate_limit_rejections
 
 # Rate limiter setup
-limiter = Limiter(key_func=get_remote_address)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+# memory:// keeps separate counters per worker; use sqlite:////path/limits.db to share them
+# between workers on one host, or redis://host:6379 across hosts (needs the redis package)
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+# sliding-window-counter keeps two counters per client; fixed-window also works with every storage,
+# moving-window only with memory:// and redis:// (it keeps a timestamp per request)
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "sliding-window-counter")
+
+if RATE_LIMIT_STRATEGY == "moving-window" and RATE_LIMIT_STORAGE_URI.split("://", 1)[0] in SQLiteStorage.STORAGE_SCHEME:
+    raise ValueError(
+        "RATE_LIMIT_STRATEGY=moving-window is not supported by the sqlite:// rate limit storage; "
+        "use sliding-window-counter or fixed-window"
+    )
+
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    strategy=RATE_LIMIT_STRATEGY,
+    enabled=RATE_LIMIT_ENABLED
+)
+
+# Upper bound on keys tracked by each TokenBucketLimiter
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 10000))
+
+class TokenBucketLimiter:
+    """
+    In-process token buckets per key (IP, email, ...). Buckets refill continuously; the least
+    recently used key is evicted once max_keys is reached, so memory stays bounded. An evicted
+    key starts again from a full bucket, which idle keys have refilled to anyway.
+    """
+
+    def __init__(self, name: str, capacity: float, refill_per_second: float, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.name = name
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _tokens(self, key: str, now: float) -> float:
+        tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated_at) * self.refill_per_second)
+
+    def hit(self, key: str, cost: float = 1.0) -> bool:
+        """Take cost tokens from key's bucket; False (and nothing taken) when not enough are left"""
+        if not RATE_LIMIT_ENABLED:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._tokens(key, now)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        if not allowed:
+            rate_limit_rejections.inc(self.name)
+        return allowed
+
+    def refund(self, key: str, cost: float = 1.0):
+        """Give back tokens taken by hit() for a request that another limit then rejected"""
+        now = time.monotonic()
+        with self._lock:
+            if key in self._buckets:
+                self._buckets[key] = (min(self.capacity, self._tokens(key, now) + cost), now)
+
+    def retry_after(self, key: str, cost: float = 1.0) -> float:
+        """Seconds until key's bucket holds cost tokens again"""
+        with self._lock:
+            missing = cost - self._tokens(key, time.monotonic())
+        return max(0.0, missing / self.refill_per_second)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
 
 # Security headers middleware
+HSTS_MAX_AGE = int(os.getenv("HSTS_MAX_AGE", 31536000))
+CSP_POLICY = os.getenv("CSP_POLICY", "default-src 'self'")
+FRAME_OPTIONS = os.getenv("FRAME_OPTIONS", "DENY")
+# Swagger UI and ReDoc load their bundles from a CDN and bootstrap with an inline script
+DOCS_CSP_POLICY = os.getenv(
+    "DOCS_CSP_POLICY",
+    "default-src 'self'; script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+    "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://fonts.googleapis.com; "
+    "font-src 'self' https://fonts.gstatic.com; img-src 'self' data: https://fastapi.tiangolo.com; "
+    "worker-src 'self' blob:"
+)
+
+SECURITY_HEADERS: Dict[str, str] = {
+    "x-content-type-options": "nosniff",
+    "x-frame-options": FRAME_OPTIONS,
+    "x-xss-protection": "1; mode=block",
+    "strict-transport-security": f"max-age={HSTS_MAX_AGE}; includeSubDomains",
+    "content-security-policy": CSP_POLICY,
+    "referrer-policy": "strict-origin-when-cross-origin",
+    "permissions-policy": "geolocation=(), microphone=(), camera=()"
+}
+
+# Path prefix -> header overrides, merged over SECURITY_HEADERS
+ROUTE_SECURITY_HEADERS: Dict[str, Dict[str, str]] = {
+    "/docs": {"content-security-policy": DOCS_CSP_POLICY},
+    "/redoc": {"content-security-policy": DOCS_CSP_POLICY},
+}
+
+HeaderBlock = Tuple[Tuple[bytes, bytes], ...]
+
+def _header_block(headers: Dict[str, str]) -> HeaderBlock:
+    return tuple((name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items())
+
 class SecurityHeadersMiddleware:
-    def __init__(self, app):
+    """
+    Appends a precomputed block of security headers to every HTTP response. Headers the
+    application already set are kept as they are, duplicates (e.g. several Set-Cookie) included,
+    except that a header also in the block is replaced by the block's value. The block is chosen
+    once per request by longest matching path prefix in route_headers.
+    """
+
+    def __init__(
+        self,
+        app,
+        headers: Optional[Dict[str, str]] = None,
+        route_headers: Optional[Dict[str, Dict[str, str]]] = None
+    ):
         self.app = app
+        base = SECURITY_HEADERS if headers is None else headers
+        routes = ROUTE_SECURITY_HEADERS if route_headers is None else route_headers
+        self.default_block = _header_block(base)
+        # Longest prefix first so /docs/oauth2-redirect can differ from /docs
+        self.route_blocks: List[Tuple[str, HeaderBlock]] = [
+            (prefix, _header_block({**base, **overrides}))
+            for prefix, overrides in sorted(routes.items(), key=lambda item: len(item[0]), reverse=True)
+        ]
+        self.header_names = frozenset(
+            name for block in [self.default_block, *(b for _, b in self.route_blocks)] for name, _ in block
+        )
+
+    def block_for(self, path: str) -> HeaderBlock:
+        for prefix, block in self.route_blocks:
+            if path.startswith(prefix):
+                return block
+        return self.default_block
 
     async def __call__(self, scope, receive, send):
-        if scope["type"] == "http":
-            async def send_wrapper(message):
-                if message["type"] == "http.response.start":
-                    headers = dict(message.get("headers", []))
-                    
-                    # Add security headers
-                    security_headers = {
-                        b"x-content-type-options": b"nosniff",
-                        b"x-frame-options": b"DENY",
-                        b"x-xss-protection": b"1; mode=block",
-                        b"strict-transport-security": b"max-age=31536000; includeSubDomains",
-                        b"content-security-policy": b"default-src 'self'",
-                        b"referrer-policy": b"strict-origin-when-cross-origin",
-                        b"permissions-policy": b"geolocation=(), microphone=(), camera=()"
-                    }
-                    
-                    # Update headers
-                    for key, value in security_headers.items():
-                        headers[key] = value
-                    
-                    message["headers"] = list(headers.items())
-                
-                await send(message)
-            
-            await self.app(scope, receive, send_wrapper)
-        else:
+        if scope["type"] != "http":
             await self.app(scope, receive, send)
+            return
+
+        block = self.block_for(scope["path"])
+        header_names = self.header_names
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = message.get("headers")
+                if headers is None:
+                    message["headers"] = list(block)
+                else:
+                    if any(name in header_names for name, _ in headers):
+                        headers = [header for header in headers if header[0] not in header_names]
+                    elif not isinstance(headers, list):
+                        headers = list(headers)
+                    headers.extend(block)
+                    message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
 
 # Input validation utilities
 class InputValidator:
@@ -102,6 +242,11 @@ def validate_request_size(request: Request, max_size: int = 1024 * 1024):  # 1MB
             detail="Request too large"
         )
 
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    """slowapi's 429 response, counted per limiter"""
+    rate_limit_rejections.inc("slowapi")
+    return _rate_limit_exceeded_handler(request, exc)
+
 # Rate limiting decorators
 def rate_limit_auth(request: Request):
     """Rate limit for authentication endpoints"""
@@ -0,0 +1,201 @@
+"""
+Request and response models for the SME management endpoints
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Annotated, Any, List, Optional, Sequence, Type
+
+from fastapi import Response
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, model_validator
+
+from models.sme_models import EmploymentType, LeaveStatus, LeaveType, MaterialCategory, ProjectStatus
+
+class RowModel(BaseModel):
+    """Built straight from ORM objects or column-projection rows; enums serialize as their values"""
+    model_config = ConfigDict(from_attributes=True)
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[RowModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+def rows_response(model: Type[RowModel], rows: Sequence, response: Response) -> Response:
+    """
+    JSON array of `model` from column-projection rows, validated and encoded in one pydantic-core pass.
+    Returning the rows would make FastAPI validate each Row through getattr (~15us a row) and encode
+    the result a second time; the route's response_model still documents the schema.
+    """
+    keys = rows[0]._fields if rows else ()
+    adapter = list_adapter(model)
+    body = adapter.dump_json(adapter.validate_python([dict(zip(keys, row)) for row in rows]))
+    result = Response(body, media_type="application/json")
+    # Headers set on the injected response (X-Next-Cursor) are otherwise dropped with it
+    result.headers.raw.extend(response.headers.raw)
+    return result
+
+class EmployeeListItem(RowModel):
+    employee_id: str
+    employee_code: str
+    first_name: str
+    last_name: str
+    email: Optional[str] = None
+    department_id: Optional[str] = None
+    position_id: Optional[str] = None
+    employment_type: Optional[EmploymentType] = None
+    hire_date: Optional[date] = None
+    is_active: Optional[bool] = None
+
+class EmployeeDetail(EmployeeListItem):
+    phone: Optional[str] = None
+    address: Optional[str] = None
+    national_id: Optional[str] = None
+    base_salary: Optional[float] = None
+    annual_leave_balance: Optional[int] = None
+    sick_leave_balance: Optional[int] = None
+    personal_leave_balance: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+class DepartmentListItem(RowModel):
+    department_id: str
+    department_name: str
+    description: Optional[str] = None
+    manager_id: Optional[str] = None
+    budget_allocation: Optional[float] = None
+    is_active: Optional[bool] = None
+    employee_count: int = 0
+
+class ProjectListItem(RowModel):
+    project_id: str
+    project_code: str
+    project_name: str
+    description: Optional[str] = None
+    customer_id: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    contract_value: Optional[float] = None
+    estimated_cost: Optional[float] = None
+    actual_cost: Optional[float] = None
+    status: Optional[ProjectStatus] = None
+    progress_percentage: Optional[float] = None
+    project_manager_id: Optional[str] = None
+
+class ProjectDetail(ProjectListItem):
+    estimated_duration: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class CustomerListItem(RowModel):
+    customer_id: str
+    customer_code: str
+    customer_name: str
+    contact_person: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    business_type: Optional[str] = None
+    credit_limit: Optional[float] = None
+    payment_terms: Optional[int] = None
+    is_active: Optional[bool] = None
+
+class MaterialListItem(RowModel):
+    material_id: str
+    material_code: str
+    material_name: str
+    category: Optional[MaterialCategory] = None
+    unit: Optional[str] = None
+    current_stock: Optional[float] = None
+    minimum_stock: Optional[float] = None
+    unit_cost: Optional[float] = None
+    is_active: Optional[bool] = None
+    low_stock_alert: bool
+
+class TimeEntryListItem(RowModel):
+    entry_id: str
+    employee_id: Optional[str] = None
+    project_id: Optional[str] = None
+    entry_date: date
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    normal_hours: Optional[float] = None
+    ot_hour_1: Optional[float] = None
+    ot_hour_2: Optional[float] = None
+    ot_hour_3: Optional[float] = None
+    work_description: Optional[str] = None
+    location: Optional[str] = None
+    is_approved: Optional[bool] = None
+    approved_by: Optional[str] = None
+    approved_at: Optional[datetime] = None
+
+class LeaveRequestListItem(RowModel):
+    request_id: str
+    employee_id: Optional[str] = None
+    leave_type: LeaveType
+    start_date: date
+    end_date: date
+    total_days: int
+    reason: Optional[str] = None
+    status: Optional[LeaveStatus] = None
+    approved_by: Optional[str] = None
+    approved_at: Optional[datetime] = None
+    rejection_reason: Optional[str] = None
+    coverage_employee_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class ToolListItem(RowModel):
+    tool_id: str
+    tool_code: str
+    tool_name: str
+    category: Optional[str] = None
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    serial_number: Optional[str] = None
+    purchase_cost: Optional[float] = None
+    current_value: Optional[float] = None
+    condition: Optional[str] = None
+    is_available: Optional[bool] = None
+    location: Optional[str] = None
+    last_maintenance_date: Optional[date] = None
+    next_maintenance_date: Optional[date] = None
+
+# Bulk time entry writes
+Hours = Annotated[Decimal, Field(ge=0, le=24, max_digits=4, decimal_places=2)]
+
+class TimeEntryWrite(BaseModel):
+    """One row of POST /time-entries/bulk; an existing entry_id has its fields replaced"""
+    model_config = ConfigDict(extra="forbid")
+
+    entry_id: str = Field(..., min_length=1, max_length=20)
+    employee_id: str = Field(..., min_length=1, max_length=20)
+    project_id: Optional[str] = Field(None, max_length=20)
+    entry_date: date
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    normal_hours: Hours = Decimal(0)
+    ot_hour_1: Hours = Decimal(0)
+    ot_hour_2: Hours = Decimal(0)
+    ot_hour_3: Hours = Decimal(0)
+    work_description: Optional[str] = None
+    location: Optional[str] = Field(None, max_length=100)
+
+    @model_validator(mode="after")
+    def check_hours(self):
+        if self.start_time and self.end_time and self.end_time <= self.start_time:
+            raise ValueError("end_time must be after start_time")
+        if self.normal_hours + self.ot_hour_1 + self.ot_hour_2 + self.ot_hour_3 > 24:
+            raise ValueError("normal and overtime hours add up to more than 24")
+        return self
+
+class TimeEntryBulkRequest(BaseModel):
+    # Rows are validated one by one after parsing, so a bad row is reported instead of failing the request
+    entries: List[Any] = Field(..., min_length=1)
+    all_or_nothing: bool = Field(False, description="Write nothing when any row is rejected")
+
+class BulkRowError(BaseModel):
+    index: int
+    entry_id: Optional[str] = None
+    errors: List[str]
+
+class TimeEntryBulkResult(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    errors: List[BulkRowError]
@@ -0,0 +1,131 @@
+"""
+Pool of persistent, authenticated SMTP sessions shared by email senders
+"""
+import os
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.logging_config import get_logger
+
+logger = get_logger("smtp_pool")
+
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", 2))
+# Idle sessions older than this are closed instead of reused (relays drop them anyway)
+SMTP_POOL_IDLE_TIMEOUT = float(os.getenv("SMTP_POOL_IDLE_TIMEOUT", 60))
+# Sessions idle longer than this get a NOOP before reuse
+SMTP_POOL_NOOP_AFTER_SECONDS = float(os.getenv("SMTP_POOL_NOOP_AFTER_SECONDS", 5))
+SMTP_POOL_CHECKOUT_TIMEOUT = float(os.getenv("SMTP_POOL_CHECKOUT_TIMEOUT", 30))
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 30))
+SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+
+# Errors after which a session cannot be trusted for another message
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError)
+
+def is_connection_error(error: BaseException) -> bool:
+    """
+    True when the session itself failed. smtplib.SMTPException subclasses OSError, but a
+    reply such as a refused recipient leaves the session usable for the next message.
+    """
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+class SMTPConnectionPool:
+    """Thread-safe LIFO pool of logged-in smtplib.SMTP sessions"""
+
+    def __init__(self, host: str, port: int, username: str, password: str, size: int = SMTP_POOL_SIZE):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self.connects = 0
+        self.reuses = 0
+        self.noop_failures = 0
+        self.discarded = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        try:
+            if SMTP_USE_TLS:
+                server.starttls()
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            self._close(server)
+            raise
+        self.connects += 1
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _checkout_idle(self) -> Optional[smtplib.SMTP]:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                server, last_used = self._idle.pop()
+            idle_for = time.monotonic() - last_used
+            if idle_for > SMTP_POOL_IDLE_TIMEOUT:
+                self._close(server)
+                continue
+            if idle_for > SMTP_POOL_NOOP_AFTER_SECONDS:
+                try:
+                    code, _ = server.noop()
+                except CONNECTION_ERRORS + (smtplib.SMTPException,):
+                    code = None
+                if code != 250:
+                    self.noop_failures += 1
+                    server.close()
+                    continue
+            self.reuses += 1
+            return server
+
+    @contextmanager
+    def connection(self):
+        """Borrow a session; it is returned on success and discarded on a connection error"""
+        if not self._slots.acquire(timeout=SMTP_POOL_CHECKOUT_TIMEOUT):
+            raise smtplib.SMTPException("Timed out waiting for an SMTP connection")
+        server = None
+        try:
+            server = self._checkout_idle() or self._connect()
+            yield server
+        except CONNECTION_ERRORS as e:
+            if server is not None and is_connection_error(e):
+                self.discarded += 1
+                server.close()
+                server = None
+            raise
+        finally:
+            if server is not None:
+                with self._lock:
+                    self._idle.append((server, time.monotonic()))
+            self._slots.release()
+
+    def close(self):
+        """Close every idle session"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._close(server)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "connects": self.connects,
+            "reuses": self.reuses,
+            "noop_failures": self.noop_failures,
+            "discarded": self.discarded,
+        }
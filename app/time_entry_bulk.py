@@ -0,0 +1,137 @@
+"""
+Bulk create/update of time entries: one validation pass, chunked executemany writes, one transaction
+"""
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.logging_config import get_logger
+from app.sme_schemas import BulkRowError, TimeEntryBulkResult, TimeEntryWrite
+from models.sme_models import Employee, Project, TimeEntry
+
+logger = get_logger("time_entry_bulk")
+
+TIME_ENTRY_BULK_MAX_ENTRIES = int(os.getenv("TIME_ENTRY_BULK_MAX_ENTRIES", 5000))
+# Rows per INSERT/UPDATE executemany and ids per IN (...) lookup
+TIME_ENTRY_BULK_CHUNK_SIZE = int(os.getenv("TIME_ENTRY_BULK_CHUNK_SIZE", 500))
+
+_rows_adapter = TypeAdapter(List[TimeEntryWrite])
+
+def _chunks(items: Sequence, size: Optional[int] = None) -> Iterable[Sequence]:
+    size = size or TIME_ENTRY_BULK_CHUNK_SIZE
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def validate_rows(raw_rows: List[Any]) -> Tuple[Dict[int, TimeEntryWrite], Dict[int, List[str]]]:
+    """
+    Validate the whole batch in one pydantic-core call. When some rows fail, their errors are
+    grouped by index from the error locations and the remaining rows are validated again.
+    """
+    try:
+        return dict(enumerate(_rows_adapter.validate_python(raw_rows))), {}
+    except ValidationError as exc:
+        errors: Dict[int, List[str]] = defaultdict(list)
+        for error in exc.errors(include_url=False):
+            index, *field = error["loc"]
+            errors[index].append(f"{'.'.join(map(str, field))}: {error['msg']}" if field else error["msg"])
+    valid_indexes = [index for index in range(len(raw_rows)) if index not in errors]
+    rows = _rows_adapter.validate_python([raw_rows[index] for index in valid_indexes])
+    return dict(zip(valid_indexes, rows)), dict(errors)
+
+def _raw_entry_id(raw_row: Any) -> Optional[str]:
+    entry_id = raw_row.get("entry_id") if isinstance(raw_row, dict) else None
+    return str(entry_id) if entry_id is not None else None
+
+async def _existing(db: AsyncSession, key_column, ids: Set[str], *columns) -> Dict[str, Tuple]:
+    found: Dict[str, Tuple] = {}
+    for chunk in _chunks(sorted(ids)):
+        result = await db.execute(select(key_column, *columns).where(key_column.in_(chunk)))
+        for key, *values in result:
+            found[key] = tuple(values)
+    return found
+
+async def apply_time_entry_batch(db: AsyncSession, raw_rows: List[Any], all_or_nothing: bool = False) -> TimeEntryBulkResult:
+    """
+    Insert new and replace existing (unapproved) time entries in one transaction.
+    Rows failing validation or reference checks are reported by index and skipped,
+    or abort the whole batch when all_or_nothing is set.
+    """
+    if len(raw_rows) > TIME_ENTRY_BULK_MAX_ENTRIES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {TIME_ENTRY_BULK_MAX_ENTRIES} time entries per request"
+        )
+    started = time.perf_counter()
+    rows, errors = validate_rows(raw_rows)
+    errors = defaultdict(list, errors)
+
+    # Reference checks: one IN (...) query per chunk of distinct ids instead of one per row
+    employees = await _existing(db, Employee.employee_id, {row.employee_id for row in rows.values()})
+    projects = await _existing(db, Project.project_id, {row.project_id for row in rows.values() if row.project_id})
+    entries = await _existing(db, TimeEntry.entry_id, {row.entry_id for row in rows.values()}, TimeEntry.is_approved)
+
+    first_index: Dict[str, int] = {}
+    for index, row in rows.items():
+        if row.entry_id in first_index:
+            errors[index].append(f"entry_id: duplicates row {first_index[row.entry_id]}")
+        else:
+            first_index[row.entry_id] = index
+        if row.employee_id not in employees:
+            errors[index].append("employee_id: employee not found")
+        if row.project_id and row.project_id not in projects:
+            errors[index].append("project_id: project not found")
+        if row.entry_id in entries and entries[row.entry_id][0]:
+            errors[index].append("entry_id: entry is approved and can no longer be changed")
+
+    inserts: List[Dict[str, Any]] = []
+    updates: List[Dict[str, Any]] = []
+    if not (errors and all_or_nothing):
+        for index, row in rows.items():
+            if index not in errors:
+                (updates if row.entry_id in entries else inserts).append(row.model_dump())
+
+    try:
+        for chunk in _chunks(inserts):
+            await db.execute(insert(TimeEntry), chunk)
+        # Bulk UPDATE by primary key: one executemany per chunk
+        for chunk in _chunks(updates):
+            await db.execute(update(TimeEntry), chunk)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        logger.warning("Time entry batch conflicted with a concurrent write", rows=len(raw_rows))
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Time entries were changed concurrently; retry the batch"
+        )
+
+    elapsed = time.perf_counter() - started
+    written = len(inserts) + len(updates)
+    logger.info(
+        "Time entry batch applied",
+        created=len(inserts),
+        updated=len(updates),
+        failed=len(errors),
+        duration_seconds=round(elapsed, 6),
+        rows_per_second=round(written / elapsed) if elapsed > 0 else None
+    )
+    return TimeEntryBulkResult(
+        created=len(inserts),
+        updated=len(updates),
+        failed=len(errors),
+        errors=[
+            BulkRowError(
+                index=index,
+                entry_id=_raw_entry_id(raw_rows[index]),
+                errors=messages
+            )
+            for index, messages in sorted(errors.items())
+        ]
+    )
@@ -0,0 +1,41 @@
+"""
+Background removal of expired password reset tokens
+"""
+import os
+from datetime import datetime
+
+from sqlalchemy import delete, select
+
+from app.database import AsyncSessionLocal
+from app.logging_config import get_logger
+from app.models import PasswordResetToken
+
+logger = get_logger("token_sweeper")
+
+RESET_TOKEN_SWEEP_INTERVAL_SECONDS = float(os.getenv("RESET_TOKEN_SWEEP_INTERVAL_SECONDS", 300))
+# Rows deleted per statement, so a large backlog never holds locks for long
+RESET_TOKEN_SWEEP_BATCH_SIZE = int(os.getenv("RESET_TOKEN_SWEEP_BATCH_SIZE", 1000))
+
+async def sweep_expired_reset_tokens() -> int:
+    """Bulk delete expired reset tokens in batches; returns the number removed"""
+    cutoff = datetime.utcnow()
+    expired_ids = (
+        select(PasswordResetToken.id)
+        .where(PasswordResetToken.expires_at < cutoff)
+        .limit(RESET_TOKEN_SWEEP_BATCH_SIZE)
+        .scalar_subquery()
+    )
+    statement = delete(PasswordResetToken).where(PasswordResetToken.id.in_(expired_ids))
+
+    removed = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            result = await db.execute(statement, execution_options={"synchronize_session": False})
+            await db.commit()
+            removed += result.rowcount
+            if result.rowcount < RESET_TOKEN_SWEEP_BATCH_SIZE:
+                break
+
+    if removed:
+        logger.info("Expired reset tokens removed", count=removed)
+    return removed
@@ -0,0 +1,62 @@
+"""
+Cache of authenticated user principals used by get_current_user
+"""
+import os
+import threading
+from typing import Optional
+
+from app.cache import TTLCache
+from app.logging_config import get_logger
+
+logger = get_logger("user_cache")
+
+USER_CACHE_MAXSIZE = int(os.getenv("USER_CACHE_MAXSIZE", 10000))
+# Other workers only see a change once their entry expires, so keep this short
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", 60))
+
+class UserPrincipal:
+    """Read-only snapshot of a user row, safe to share between requests"""
+
+    __slots__ = ("id", "username", "email", "role", "is_active", "created_at", "last_login")
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.role = user.role
+        self.is_active = user.is_active
+        self.created_at = user.created_at
+        self.last_login = user.last_login
+
+    def __repr__(self) -> str:
+        return f"UserPrincipal(id={self.id!r}, username={self.username!r}, role={self.role!r})"
+
+user_cache = TTLCache(maxsize=USER_CACHE_MAXSIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+# Bumped on every invalidation so a lookup that raced with a write does not re-cache stale data
+_version = 0
+_version_lock = threading.Lock()
+
+def cache_version() -> int:
+    return _version
+
+def get_cached_user(username: str) -> Optional[UserPrincipal]:
+    return user_cache.get(username)
+
+def cache_user(user, version: int) -> UserPrincipal:
+    """Snapshot user and cache it unless an invalidation happened since version was read"""
+    principal = UserPrincipal(user)
+    with _version_lock:
+        if version == _version:
+            user_cache.set(principal.username, principal)
+    return principal
+
+def invalidate_user(*usernames: Optional[str]):
+    """Drop cached principals after a user is updated, deactivated, deleted or changes password"""
+    global _version
+    with _version_lock:
+        _version += 1
+        for username in usernames:
+            if username:
+                user_cache.pop(username)
+    logger.debug("User cache invalidated", usernames=[u for u in usernames if u])
@@ -1,9 +1,11 @@
-from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .models import User
 from .auth import verify_password, get_password_hash
 from .schemas import UserCreate
 
-def get_user_by_username(db: Session, username: str):
+async def get_user_by_username(db: AsyncSession, username: str):
     import logging
     logger = logging.getLogger(__name__)
     
@@ -12,10 +14,10 @@ def get_user_by_username(db: Session, username: str):
         from sqlalchemy import text
         
         logger.info(f"🔍 DEBUG: Querying user with raw SQL")
-        result = db.execute(
+        result = (await db.execute(
             text("SELECT id, username, email, hashed_password, role, is_active, created_at, last_login FROM users WHERE username = :username"),
             {"username": username}
-        ).fetchone()
+        )).fetchone()
         
         if result:
             logger.info(f"🔍 DEBUG: Raw SQL found user: {result.username}")
@@ -40,13 +42,15 @@ def get_user_by_username(db: Session, username: str):
         logger.error(f"🚨 DEBUG: Raw SQL query failed: {str(e)}")
         # Fallback to ORM
         logger.info(f"🔍 DEBUG: Falling back to ORM query")
-        return db.query(User).filter(User.username == username).first()
+        result = await db.execute(select(User).where(User.username == username))
+        return result.scalars().first()
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
-def create_user(db: Session, user: UserCreate):
-    hashed_password = get_password_hash(user.password)
+async def create_user(db: AsyncSession, user: UserCreate):
+    hashed_password = await get_password_hash(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -54,11 +58,11 @@ def create_user(db: Session, user: UserCreate):
         role=user.role
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
-def authenticate_user(db: Session, username: str, password: str):
+async def authenticate_user(db: AsyncSession, username: str, password: str):
     import logging
     logger = logging.getLogger(__name__)
     
@@ -66,7 +70,7 @@ def authenticate_user(db: Session, username: str, password: str):
         logger.info(f"🔍 DEBUG: Starting authentication for user: {username}")
         
         # Step 1: Query user from database
-        user = get_user_by_username(db, username)
+        user = await get_user_by_username(db, username)
         logger.info(f"🔍 DEBUG: Database query result - User found: {user is not None}")
         
         if not user:
@@ -95,7 +99,7 @@ def authenticate_user(db: Session, username: str, password: str):
         
         # Step 5: Verify password
         logger.info(f"🔍 DEBUG: Starting password verification")
-        password_valid = verify_password(password, password_field)
+        password_valid = await verify_password(password, password_field)
         logger.info(f"🔍 DEBUG: Password verification result: {password_valid}")
         
         if not password_valid:
@@ -105,6 +109,8 @@ def authenticate_user(db: Session, username: str, password: str):
         logger.info(f"✅ DEBUG: Authentication successful for user {username}")
         return user
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"🚨 DEBUG: Authentication error for user {username}: {str(e)}")
         logger.error(f"🚨 DEBUG: Exception type: {type(e).__name__}")
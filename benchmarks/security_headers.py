@@ -0,0 +1,77 @@
+"""
+Per-response cost of the security headers middleware around a bare ASGI endpoint: the previous
+dict-rebuilding version against the precomputed header block, with and without app headers.
+
+    python -m benchmarks.security_headers [responses]
+"""
+import asyncio
+import sys
+
+from benchmarks.common import best_of, report
+
+from app.security import SecurityHeadersMiddleware
+
+APP_HEADERS = [
+    (b"content-type", b"application/json"),
+    (b"content-length", b"2"),
+    (b"set-cookie", b"a=1"),
+    (b"set-cookie", b"b=2"),
+]
+
+class DictRebuildingMiddleware:
+    """The middleware as it was before the header block: a dict per response, duplicates collapsed"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", []))
+                security_headers = {
+                    b"x-content-type-options": b"nosniff",
+                    b"x-frame-options": b"DENY",
+                    b"x-xss-protection": b"1; mode=block",
+                    b"strict-transport-security": b"max-age=31536000; includeSubDomains",
+                    b"content-security-policy": b"default-src 'self'",
+                    b"referrer-policy": b"strict-origin-when-cross-origin",
+                    b"permissions-policy": b"geolocation=(), microphone=(), camera=()"
+                }
+                for key, value in security_headers.items():
+                    headers[key] = value
+                message["headers"] = list(headers.items())
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": list(APP_HEADERS)})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+async def send(message):
+    pass
+
+def per_response(app, count: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/employees/", "headers": [], "client": ("127.0.0.1", 1)}
+
+    async def run():
+        for _ in range(count):
+            await app(dict(scope), receive, send)
+
+    return best_of(lambda: asyncio.run(run())) / count
+
+def main(count: int):
+    print(f"ASGI response overhead over {count:,} responses (best of 5)")
+    bare = per_response(endpoint, count)
+    report("bare endpoint", bare * 1e6, "us")
+    for label, app in [
+        ("dict-rebuilding middleware", DictRebuildingMiddleware(endpoint)),
+        ("SecurityHeadersMiddleware", SecurityHeadersMiddleware(endpoint)),
+    ]:
+        report(f"{label}: added", (per_response(app, count) - bare) * 1e6, "us")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
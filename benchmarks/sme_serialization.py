@@ -0,0 +1,51 @@
+"""
+Serialization cost of one SME list page: FastAPI validating Rows against the response_model
+versus rows_response(). Both outputs are compared, so this also checks the two stay identical.
+
+    python -m benchmarks.sme_serialization [rows]
+"""
+import asyncio
+import sys
+from typing import List
+
+from benchmarks.common import best_of, report, reset_database, seed_sme_rows
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy.orm import Session
+
+from app.sme_schemas import EmployeeListItem, MaterialListItem, TimeEntryListItem, rows_response
+from models.sme_models import Employee, Material, TimeEntry
+from routers.sme_routers import _employees_query, _materials_query, _time_entries_query
+
+PAGES = [
+    ("employees", EmployeeListItem, _employees_query(None, None).order_by(Employee.employee_code)),
+    ("time entries", TimeEntryListItem, _time_entries_query(None, None, None, None).order_by(TimeEntry.entry_date)),
+    ("materials", MaterialListItem, _materials_query(None, None).order_by(Material.material_code)),
+]
+
+def via_response_model(model, rows) -> bytes:
+    field = create_response_field(name="Response", type_=List[model])
+    content = asyncio.run(serialize_response(field=field, response_content=rows, is_coroutine=True))
+    return ORJSONResponse(content).body
+
+def via_rows_response(model, rows) -> bytes:
+    return rows_response(model, rows, Response()).body
+
+def main(count: int):
+    engine = reset_database()
+    seed_sme_rows(engine, count)
+    print(f"Serializing a {count}-row page (best of 5)")
+    with Session(engine) as db:
+        for name, model, query in PAGES:
+            rows = db.execute(query.limit(count)).all()
+            expected = orjson.loads(via_response_model(model, rows))
+            assert orjson.loads(via_rows_response(model, rows)) == expected, f"{name}: outputs differ"
+            report(f"{name}: response_model", best_of(lambda: via_response_model(model, rows)) * 1000, "ms")
+            report(f"{name}: rows_response", best_of(lambda: via_rows_response(model, rows)) * 1000, "ms")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,107 @@
+"""
+Outgoing email throughput against a local stand-in relay: a new logged-in SMTP session per
+message (the previous deliver()) versus pooled sessions, one message per call and in batches.
+Each relay reply is delayed by a simulated round trip; the stand-in speaks no TLS, so the
+per-connection cost of a real relay (STARTTLS handshake) is understated here.
+
+    python -m benchmarks.smtp_throughput [messages] [round_trip_ms]
+"""
+import os
+import smtplib
+import socketserver
+import sys
+import threading
+import time
+
+from benchmarks.common import report
+
+os.environ["SMTP_USE_TLS"] = "false"
+
+from app.email_service import EmailService
+
+class StandInRelay(socketserver.StreamRequestHandler):
+    """Accepts every message; answers just enough SMTP for smtplib's login and send_message"""
+
+    round_trip = 0.0
+    accepted = 0
+
+    def reply(self, line: str):
+        time.sleep(self.round_trip)
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.reply("220 bench ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line[:4].upper()
+            if command == b"EHLO":
+                self.reply("250-bench\r\n250-AUTH PLAIN\r\n250 8BITMIME")
+            elif command == b"AUTH":
+                self.reply("235 2.7.0 Authentication successful")
+            elif command == b"DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                StandInRelay.accepted += 1
+                self.reply("250 2.0.0 Ok: queued")
+            elif command == b"QUIT":
+                self.reply("221 2.0.0 Bye")
+                return
+            else:
+                self.reply("250 2.0.0 Ok")
+
+class Relay(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def connect_per_message(service: EmailService, messages):
+    """What deliver() did before the pool: connect and log in for every message"""
+    for message in messages:
+        with smtplib.SMTP(service.smtp_host, service.smtp_port) as server:
+            server.login(service.smtp_username, service.smtp_password)
+            server.send_message(service.build_message(*message))
+
+def pooled_one_by_one(service: EmailService, messages):
+    for message in messages:
+        service.deliver(*message)
+
+def pooled_batch(service: EmailService, messages):
+    errors = service.deliver_many(messages)
+    assert not any(errors), errors
+
+def main(count: int, round_trip_ms: float):
+    StandInRelay.round_trip = round_trip_ms / 1000
+    relay = Relay(("127.0.0.1", 0), StandInRelay)
+    threading.Thread(target=relay.serve_forever, daemon=True).start()
+    os.environ.update({
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(relay.server_address[1]),
+        "SMTP_USERNAME": "mailer",
+        "SMTP_PASSWORD": "secret",
+    })
+    service = EmailService()
+    messages = [(f"user{i}@example.com", "Password reset", "Reset link", "<a>Reset link</a>") for i in range(count)]
+
+    print(f"Sending {count} messages, {round_trip_ms:g} ms per relay reply")
+    for label, send in [
+        ("new session per message", connect_per_message),
+        ("pooled, one per call", pooled_one_by_one),
+        ("pooled, deliver_many", pooled_batch),
+    ]:
+        before = StandInRelay.accepted
+        started = time.perf_counter()
+        send(service, messages)
+        elapsed = time.perf_counter() - started
+        assert StandInRelay.accepted - before == count
+        report(label, count / elapsed, "msg/s")
+    print(f"  pool: {service.pool.stats()}")
+    service.pool.close()
+    relay.shutdown()
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    )
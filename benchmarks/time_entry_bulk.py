@@ -0,0 +1,92 @@
+"""
+Time entry writes: validating and adding rows one at a time (an ORM get + add per row) versus
+apply_time_entry_batch creating a batch of new entries and then replacing them.
+
+    python -m benchmarks.time_entry_bulk [rows]
+"""
+import asyncio
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from benchmarks.common import report, reset_database
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.database import AsyncSessionLocal, async_engine
+from app.sme_schemas import TimeEntryWrite
+from app.time_entry_bulk import apply_time_entry_batch
+from models.sme_models import Employee, Project, TimeEntry
+
+EMPLOYEES = 50
+
+def seed(engine):
+    with Session(engine) as db:
+        db.add(Project(
+            project_id="P0001", project_code="PRJ0001", project_name="Project", start_date=date(2024, 1, 1),
+            contract_value=Decimal("1000")
+        ))
+        for i in range(EMPLOYEES):
+            db.add(Employee(
+                employee_id=f"E{i:05}", employee_code=f"EMP{i:05}", first_name="First", last_name=f"Last {i}",
+                email=f"e{i}@example.com", hire_date=date(2024, 1, 1), base_salary=Decimal("30000")
+            ))
+        db.commit()
+
+def payload(count: int, hours: str):
+    start = date(2024, 1, 1)
+    return [
+        {
+            "entry_id": f"T{i:05}", "employee_id": f"E{i % EMPLOYEES:05}", "project_id": "P0001",
+            "entry_date": (start + timedelta(days=i % 365)).isoformat(), "normal_hours": hours,
+            "work_description": "Site work", "location": "Bangkok"
+        }
+        for i in range(count)
+    ]
+
+async def per_row(raw_rows):
+    """One validation, two primary key lookups and an ORM add per row, one commit"""
+    async with AsyncSessionLocal() as db:
+        for raw in raw_rows:
+            row = TimeEntryWrite.model_validate(raw)
+            assert await db.get(Employee, row.employee_id) is not None
+            assert await db.get(Project, row.project_id) is not None
+            if await db.get(TimeEntry, row.entry_id) is None:
+                db.add(TimeEntry(**row.model_dump()))
+        await db.commit()
+
+async def bulk(raw_rows):
+    async with AsyncSessionLocal() as db:
+        result = await apply_time_entry_batch(db, raw_rows)
+    assert result.failed == 0, result.errors
+
+def timed(label: str, write, raw_rows):
+    async def run():
+        started = time.perf_counter()
+        await write(raw_rows)
+        elapsed = time.perf_counter() - started
+        await async_engine.dispose()
+        return elapsed
+
+    report(label, len(raw_rows) / asyncio.run(run()), "rows/s")
+
+def main(count: int):
+    engine = reset_database()
+    seed(engine)
+    print(f"Writing {count} time entries")
+
+    timed("per-row validate + get + add", per_row, payload(count, "8"))
+    with Session(engine) as db:
+        assert db.scalar(select(func.count()).select_from(TimeEntry)) == count
+        db.execute(delete(TimeEntry))
+        db.commit()
+
+    timed("bulk create", bulk, payload(count, "8"))
+    timed("bulk update", bulk, payload(count, "7.5"))
+    with Session(engine) as db:
+        assert db.scalar(select(func.count()).where(TimeEntry.normal_hours == Decimal("7.5"))) == count
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
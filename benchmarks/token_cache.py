@@ -0,0 +1,27 @@
+"""
+Per-call cost of verify_token for one bearer token: full JWT decode every time versus the
+verified-claims cache.
+
+    python -m benchmarks.token_cache [calls]
+"""
+import sys
+
+from benchmarks.common import best_of, report
+
+from app.auth import create_access_token, token_cache, verify_token
+
+def main(calls: int):
+    token = create_access_token({"sub": "bench"})
+
+    def uncached():
+        token_cache.clear()
+        return verify_token(token)
+
+    assert uncached() == verify_token(token) == "bench"
+    print(f"verify_token, {calls:,} calls (best of 5)")
+    report("uncached (jwt.decode)", best_of(uncached, number=calls) * 1e6, "us/call")
+    verify_token(token)
+    report("cached", best_of(lambda: verify_token(token), number=calls) * 1e6, "us/call")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
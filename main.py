@@ -3,24 +3,38 @@ SME Management System - Enhanced FastAPI application with production-grade secur
 """
 from fastapi import FastAPI, HTTPException, Depends, status, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
-from sqlalchemy.orm import Session
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from typing import List
+from typing import List, Optional
+import hmac
 import os
 import uuid
 import json
 from contextlib import asynccontextmanager
 
 # Import our modules
-from app.database import get_db
+from app.database import get_async_db, engine, async_engine
+from app.pagination import NEXT_CURSOR_HEADER
+from app.db_pool import get_pool_status, DB_POOL_STATS_LOG_INTERVAL
+from app.background import start_periodic_task, stop_background_tasks
+from app.dashboard_summary import refresh_dashboard_summary, DASHBOARD_SUMMARY_REFRESH_SECONDS
+from app.token_sweeper import sweep_expired_reset_tokens, RESET_TOKEN_SWEEP_INTERVAL_SECONDS
+from app.email_outbox import deliver_pending_emails, outbox_wakeup, EMAIL_OUTBOX_POLL_SECONDS
+from app.email_service import email_service
+from app.log_shipping import stop_log_shipping, log_shipping_stats
 from app.models import User
 from app.schemas import UserLogin, Token, User as UserSchema, HealthCheck, ErrorResponse
-from app.auth import create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.auth import create_access_token, get_current_user, token_cache, ACCESS_TOKEN_EXPIRE_MINUTES
 from app.users import authenticate_user
+from dependencies.auth import require_admin_or_superadmin
+from app.password_hasher import password_hasher
+from app.user_cache import user_cache
+from app.middleware import RequestContextMiddleware, request_stats, REQUEST_LOG_MODE, REQUEST_STATS_INTERVAL_SECONDS
 from app.security import (
-    SecurityHeadersMiddleware, 
     limiter, 
     rate_limit_auth, 
     rate_limit_api, 
@@ -28,7 +42,17 @@ from app.security import (
     InputValidator,
     validate_request_size,
     log_security_event,
-    get_cors_origins
+    get_cors_origins,
+    rate_limit_exceeded_handler
+)
+from slowapi.errors import RateLimitExceeded
+from app.metrics import (
+    metrics_registry,
+    auth_failures,
+    METRICS_ENABLED,
+    METRICS_BEARER_TOKEN,
+    METRICS_MULTIPROC_DIR,
+    METRICS_SNAPSHOT_SECONDS
 )
 
 # Import new routers
@@ -36,7 +60,6 @@ from routers import users, auth
 from app.logging_config import (
     setup_logging, 
     get_logger, 
-    RequestLoggingMiddleware,
     log_auth_event,
     log_error
 )
@@ -45,14 +68,40 @@ from app.logging_config import (
 setup_logging()
 logger = get_logger("main")
 
+def log_pool_stats():
+    """Log connection pool occupancy and checkout wait stats"""
+    logger.info("Database pool stats", sync=get_pool_status(engine), async_=get_pool_status(async_engine.sync_engine))
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     logger.info("Application starting up")
+    if DB_POOL_STATS_LOG_INTERVAL > 0:
+        start_periodic_task("db_pool_stats", DB_POOL_STATS_LOG_INTERVAL, log_pool_stats)
+    if DASHBOARD_SUMMARY_REFRESH_SECONDS > 0:
+        start_periodic_task("dashboard_summary", DASHBOARD_SUMMARY_REFRESH_SECONDS, refresh_dashboard_summary)
+    if RESET_TOKEN_SWEEP_INTERVAL_SECONDS > 0:
+        start_periodic_task("reset_token_sweeper", RESET_TOKEN_SWEEP_INTERVAL_SECONDS, sweep_expired_reset_tokens)
+    start_periodic_task("email_outbox", EMAIL_OUTBOX_POLL_SECONDS, deliver_pending_emails, wakeup=outbox_wakeup)
+    if REQUEST_LOG_MODE == "sampled":
+        start_periodic_task("request_stats", REQUEST_STATS_INTERVAL_SECONDS, request_stats.report)
+    if METRICS_ENABLED and METRICS_MULTIPROC_DIR:
+        start_periodic_task("metrics_snapshot", METRICS_SNAPSHOT_SECONDS, metrics_registry.write_snapshot)
     yield
     # Shutdown
     logger.info("Application shutting down")
+    await stop_background_tasks()
+    log_pool_stats()
+    if REQUEST_LOG_MODE == "sampled":
+        request_stats.report()
+    await async_engine.dispose()
+    password_hasher.shutdown()
+    email_service.pool.close()
+    if METRICS_ENABLED:
+        metrics_registry.remove_snapshot()
+    logger.info("Application shutdown complete")
+    stop_log_shipping()
 
 # Create FastAPI app with enhanced configuration
 app = FastAPI(
@@ -62,15 +111,11 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    # Response models are dumped by pydantic and the result encoded by orjson
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# Add security headers middleware
-app.add_middleware(SecurityHeadersMiddleware)
-
-# Add request logging middleware
-app.add_middleware(RequestLoggingMiddleware)
-
 # Enhanced CORS middleware with localhost support for development
 app.add_middleware(
     CORSMiddleware,
@@ -91,17 +136,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
-    expose_headers=["X-Request-ID"]
+    expose_headers=["X-Request-ID", NEXT_CURSOR_HEADER]
 )
 
+# Request ID, timing, security headers and access logging in one pass; added last so it is the
+# outermost middleware and CORS preflight responses get them too
+app.add_middleware(RequestContextMiddleware)
+
 # Add rate limiting
 app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+
+def request_id_for(request: Request) -> str:
+    """ID assigned by RequestContextMiddleware, so error bodies match X-Request-ID and the access log"""
+    return getattr(request.state, "request_id", None) or str(uuid.uuid4())
 
 # Global exception handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors"""
-    request_id = str(uuid.uuid4())
+    request_id = request_id_for(request)
     
     # Convert errors to JSON-serializable format
     try:
@@ -141,7 +195,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Handle HTTP exceptions"""
-    request_id = str(uuid.uuid4())
+    request_id = request_id_for(request)
     
     # Log security events for certain status codes
     if exc.status_code in [401, 403, 429]:
@@ -158,13 +212,14 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             "message": exc.detail,
             "status_code": exc.status_code,
             "request_id": request_id
-        }
+        },
+        headers=exc.headers
     )
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle unexpected exceptions with safe serialization"""
-    request_id = str(uuid.uuid4())
+    request_id = request_id_for(request)
     
     # Safely log error without causing JSON serialization issues
     try:
@@ -195,25 +250,17 @@ async def general_exception_handler(request: Request, exc: Exception):
             # Ultimate fallback
             detail = "Internal server error - unable to serialize error details"
     
+    # Starlette runs this handler outside RequestContextMiddleware, so the header is set here
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": "Internal Server Error",
             "message": detail,
             "request_id": request_id
-        }
+        },
+        headers={"X-Request-ID": request_id}
     )
 
-# Middleware to add request ID to all responses
-@app.middleware("http")
-async def add_request_id(request: Request, call_next):
-    request_id = str(uuid.uuid4())
-    request.state.request_id = request_id
-    
-    response = await call_next(request)
-    response.headers["X-Request-ID"] = request_id
-    return response
-
 # Routes
 @app.get("/", response_model=dict)
 @limiter.limit("200/minute")
@@ -289,15 +336,16 @@ async def test_login(request: Request):
 
 @app.post("/auth/login", response_class=JSONResponse)  # Disable automatic response validation
 @limiter.limit("5/minute")  # Strict rate limiting for auth
-async def login(request: Request, user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(request: Request, user_credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """HARD-CODED LOGIN ENDPOINT - Temporary fix to bypass validation issues"""
     
     print(f"🔧 HARD-CODED LOGIN: Request for user: {user_credentials.username}")
     
     # Basic authentication check
-    user = authenticate_user(db, user_credentials.username, user_credentials.password)
+    user = await authenticate_user(db, user_credentials.username, user_credentials.password)
     if not user:
         print(f"🔧 HARD-CODED LOGIN: Authentication failed for {user_credentials.username}")
+        auth_failures.inc("invalid_credentials")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -414,9 +462,8 @@ async def health_check(request: Request):
     
     # Add database health check
     try:
-        from app.database import engine
-        with engine.connect() as conn:
-            conn.execute("SELECT 1")
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
         health_status["database"] = "connected"
     except Exception as e:
         logger.error("Database health check failed", error=str(e))
@@ -425,6 +472,32 @@ async def health_check(request: Request):
     
     return health_status
 
+@app.get("/health/db-pool")
+@limiter.limit("100/minute")
+async def db_pool_status(request: Request, current_user: User = Depends(require_admin_or_superadmin)):
+    """Connection pool occupancy and checkout wait-time histogram for this worker (Admin and SuperAdmin only)"""
+    return {
+        "sync": get_pool_status(engine),
+        "async": get_pool_status(async_engine.sync_engine)
+    }
+
+metrics_auth = HTTPBearer(auto_error=False)
+
+def require_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(metrics_auth)):
+    """Scrapers authenticate with the shared METRICS_BEARER_TOKEN rather than a user JWT"""
+    if credentials is None or not hmac.compare_digest(credentials.credentials.encode(), METRICS_BEARER_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+if METRICS_ENABLED:
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+    async def metrics():
+        """Prometheus scrape endpoint (bearer METRICS_BEARER_TOKEN)"""
+        return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
 # Additional security endpoints
 @app.get("/auth/validate-token")
 @limiter.limit("100/minute")
@@ -465,7 +538,12 @@ if os.getenv('ENVIRONMENT', 'development') == 'development':
                 "auth": "5/minute",
                 "api": "100/minute",
                 "public": "200/minute"
-            }
+            },
+            "password_hasher": password_hasher.stats(),
+            "user_cache": user_cache.stats(),
+            "token_cache": token_cache.stats(),
+            "smtp_pool": email_service.pool.stats(),
+            "log_queue": log_shipping_stats()
         }
 
 # Include routers
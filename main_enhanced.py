@@ -5,14 +5,14 @@ from fastapi import FastAPI, HTTPException, Depends, status, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 import os
 import uuid
 from contextlib import asynccontextmanager
 
 # Import our modules
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User
 from app.schemas import UserLogin, Token, User as UserSchema, HealthCheck, ErrorResponse
 from app.auth import create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
@@ -176,7 +176,7 @@ async def root(request: Request):
 
 @app.post("/auth/login", response_model=Token)
 @limiter.limit("5/minute")  # Strict rate limiting for auth
-async def login(request: Request, user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(request: Request, user_credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Enhanced login endpoint with security features"""
     
     # Validate request size
@@ -206,7 +206,7 @@ async def login(request: Request, user_credentials: UserLogin, db: Session = Dep
         )
     
     # Authenticate user
-    user = authenticate_user(db, user_credentials.username, user_credentials.password)
+    user = await authenticate_user(db, user_credentials.username, user_credentials.password)
     if not user:
         log_auth_event(
             "login_failed",
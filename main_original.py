@@ -2,11 +2,11 @@ from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
 # from fastapi.staticfiles import StaticFiles  # Not needed for pure backend
 # from fastapi.responses import FileResponse  # Not needed for pure backend
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 import os
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User
 from app.schemas import UserLogin, Token, User as UserSchema
 from app.auth import create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
@@ -35,8 +35,8 @@ async def root():
 #     return FileResponse("frontend/login.html")
 
 @app.post("/auth/login", response_model=Token)
-async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
-    user = authenticate_user(db, user_credentials.username, user_credentials.password)
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate_user(db, user_credentials.username, user_credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
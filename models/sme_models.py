@@ -1,7 +1,7 @@
 """
 SME Management System Database Models
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Numeric, ForeignKey, Date, Time, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Numeric, ForeignKey, Date, Time, Enum, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -55,6 +55,9 @@ class PurchaseOrderStatus(enum.Enum):
 # Core Tables
 class Department(Base):
     __tablename__ = "departments"
+    __table_args__ = (
+        Index("ix_departments_name", "department_name", "department_id"),
+    )
     
     department_id = Column(String(20), primary_key=True)
     department_name = Column(String(100), nullable=False)
@@ -66,7 +69,7 @@ class Department(Base):
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
     # Relationships
-    employees = relationship("Employee", back_populates="department")
+    employees = relationship("Employee", back_populates="department", foreign_keys="Employee.department_id")
     manager = relationship("Employee", foreign_keys=[manager_id])
 
 class Position(Base):
@@ -88,6 +91,10 @@ class Position(Base):
 
 class Employee(Base):
     __tablename__ = "employees"
+    __table_args__ = (
+        Index("ix_employees_department_code", "department_id", "employee_code", "employee_id"),
+        Index("ix_employees_active_code", "is_active", "employee_code", "employee_id"),
+    )
     
     employee_id = Column(String(20), primary_key=True)
     employee_code = Column(String(20), unique=True, nullable=False)
@@ -120,14 +127,17 @@ class Employee(Base):
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
     # Relationships
-    department = relationship("Department", back_populates="employees")
+    department = relationship("Department", back_populates="employees", foreign_keys=[department_id])
     position = relationship("Position", back_populates="employees")
-    time_entries = relationship("TimeEntry", back_populates="employee")
-    leave_requests = relationship("LeaveRequest", back_populates="employee")
+    time_entries = relationship("TimeEntry", back_populates="employee", foreign_keys="TimeEntry.employee_id")
+    leave_requests = relationship("LeaveRequest", back_populates="employee", foreign_keys="LeaveRequest.employee_id")
     project_assignments = relationship("ProjectAssignment", back_populates="employee")
 
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (
+        Index("ix_customers_active_code", "is_active", "customer_code", "customer_id"),
+    )
     
     customer_id = Column(String(20), primary_key=True)
     customer_code = Column(String(20), unique=True, nullable=False)
@@ -153,6 +163,10 @@ class Customer(Base):
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("ix_projects_status_code", "status", "project_code", "project_id"),
+        Index("ix_projects_customer_code", "customer_id", "project_code", "project_id"),
+    )
     
     project_id = Column(String(20), primary_key=True)
     project_code = Column(String(20), unique=True, nullable=False)
@@ -209,6 +223,9 @@ class ProjectAssignment(Base):
 
 class Material(Base):
     __tablename__ = "materials"
+    __table_args__ = (
+        Index("ix_materials_category_code", "category", "material_code", "material_id"),
+    )
     
     material_id = Column(String(20), primary_key=True)
     material_code = Column(String(20), unique=True, nullable=False)
@@ -354,6 +371,11 @@ class MaterialAllocation(Base):
 
 class TimeEntry(Base):
     __tablename__ = "time_entries"
+    __table_args__ = (
+        Index("ix_time_entries_date", "entry_date", "entry_id"),
+        Index("ix_time_entries_employee_date", "employee_id", "entry_date", "entry_id"),
+        Index("ix_time_entries_project_date", "project_id", "entry_date", "entry_id"),
+    )
     
     entry_id = Column(String(20), primary_key=True)
     employee_id = Column(String(20), ForeignKey("employees.employee_id"))
@@ -388,6 +410,12 @@ class TimeEntry(Base):
 
 class LeaveRequest(Base):
     __tablename__ = "leave_requests"
+    __table_args__ = (
+        Index("ix_leave_requests_start", "start_date", "request_id"),
+        Index("ix_leave_requests_employee_start", "employee_id", "start_date", "request_id"),
+        Index("ix_leave_requests_status_start", "status", "start_date", "request_id"),
+        Index("ix_leave_requests_type_start", "leave_type", "start_date", "request_id"),
+    )
     
     request_id = Column(String(20), primary_key=True)
     employee_id = Column(String(20), ForeignKey("employees.employee_id"))
@@ -420,6 +448,11 @@ class LeaveRequest(Base):
 
 class Tool(Base):
     __tablename__ = "tools"
+    __table_args__ = (
+        Index("ix_tools_category_code", "category", "tool_code", "tool_id"),
+        Index("ix_tools_available_code", "is_available", "tool_code", "tool_id"),
+        Index("ix_tools_condition_code", "condition", "tool_code", "tool_id"),
+    )
     
     tool_id = Column(String(20), primary_key=True)
     tool_code = Column(String(20), unique=True, nullable=False)
@@ -549,3 +582,19 @@ class AuditLog(Base):
     user_agent = Column(Text)
     timestamp = Column(DateTime, default=func.now())
 
+
+class DashboardSummary(Base):
+    __tablename__ = "dashboard_summary"
+    
+    # Single row (summary_id = 1) rewritten by the periodic dashboard refresh
+    summary_id = Column(Integer, primary_key=True)
+    total_employees = Column(Integer, nullable=False, default=0)
+    total_departments = Column(Integer, nullable=False, default=0)
+    active_projects = Column(Integer, nullable=False, default=0)
+    total_projects = Column(Integer, nullable=False, default=0)
+    total_materials = Column(Integer, nullable=False, default=0)
+    low_stock_materials = Column(Integer, nullable=False, default=0)
+    pending_leave_requests = Column(Integer, nullable=False, default=0)
+    available_tools = Column(Integer, nullable=False, default=0)
+    total_tools = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime, nullable=False)
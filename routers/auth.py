@@ -2,14 +2,16 @@
 Authentication router for forgot password functionality
 """
 from fastapi import APIRouter, HTTPException, Depends, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from typing import Optional
+import math
 import uuid
 import secrets
 import hashlib
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User, PasswordResetToken
 from app.schemas import (
     ForgotPasswordRequest, 
@@ -19,9 +21,10 @@ from app.schemas import (
     ResetPasswordResponse
 )
 from app.auth import get_password_hash
-from app.security import rate_limit_auth, log_security_event
+from app.user_cache import invalidate_user
+from app.security import rate_limit_auth, log_security_event, TokenBucketLimiter
 from app.logging_config import get_logger
-from app.email_service import send_password_reset_email
+from app.email_outbox import queue_password_reset_email, notify_outbox
 
 logger = get_logger("auth_router")
 
@@ -30,8 +33,17 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 # Configuration
 RESET_TOKEN_EXPIRY_MINUTES = 30
 MAX_RESET_REQUESTS_PER_IP = 3
+MAX_RESET_REQUESTS_PER_EMAIL = 3
 RESET_REQUEST_WINDOW_MINUTES = 15
 
+# Bursts of up to MAX_* requests, refilling at that many per window
+reset_ip_limiter = TokenBucketLimiter(
+    "password_reset_ip", MAX_RESET_REQUESTS_PER_IP, MAX_RESET_REQUESTS_PER_IP / (RESET_REQUEST_WINDOW_MINUTES * 60)
+)
+reset_email_limiter = TokenBucketLimiter(
+    "password_reset_email", MAX_RESET_REQUESTS_PER_EMAIL, MAX_RESET_REQUESTS_PER_EMAIL / (RESET_REQUEST_WINDOW_MINUTES * 60)
+)
+
 def generate_reset_token() -> str:
     """Generate a secure reset token"""
     return str(uuid.uuid4())
@@ -43,63 +55,43 @@ def get_client_ip(request: Request) -> str:
         return forwarded.split(",")[0].strip()
     return request.client.host
 
-def cleanup_expired_tokens(db: Session):
-    """Clean up expired reset tokens"""
-    try:
-        expired_tokens = db.query(PasswordResetToken).filter(
-            PasswordResetToken.expires_at < datetime.utcnow()
-        ).all()
-        
-        for token in expired_tokens:
-            db.delete(token)
-        
-        db.commit()
-        logger.info(f"Cleaned up {len(expired_tokens)} expired reset tokens")
-    except Exception as e:
-        logger.error(f"Error cleaning up expired tokens: {e}")
-        db.rollback()
-
-def check_rate_limit(db: Session, ip_address: str) -> bool:
-    """Check if IP has exceeded rate limit for reset requests"""
-    window_start = datetime.utcnow() - timedelta(minutes=RESET_REQUEST_WINDOW_MINUTES)
-    
-    recent_requests = db.query(PasswordResetToken).filter(
-        PasswordResetToken.ip_address == ip_address,
-        PasswordResetToken.created_at >= window_start
-    ).count()
-    
-    return recent_requests < MAX_RESET_REQUESTS_PER_IP
-
 @router.post("/forgot-password", response_model=ForgotPasswordResponse)
 async def forgot_password(
     request_data: ForgotPasswordRequest,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Request password reset - sends email with reset link
     """
     try:
-        # Clean up expired tokens first
-        cleanup_expired_tokens(db)
-        
         # Get client IP
         client_ip = get_client_ip(request)
         
-        # Check rate limiting
-        if not check_rate_limit(db, client_ip):
+        # Check rate limiting (in memory, per IP and per target email)
+        email_key = request_data.email.lower()
+        limited_by = None
+        if not reset_ip_limiter.hit(client_ip):
+            limited_by, retry_after = "ip", reset_ip_limiter.retry_after(client_ip)
+        elif not reset_email_limiter.hit(email_key):
+            # Rejected requests must not use up the caller's IP allowance
+            reset_ip_limiter.refund(client_ip)
+            limited_by, retry_after = "email", reset_email_limiter.retry_after(email_key)
+        if limited_by:
             log_security_event(
                 "password_reset_rate_limit_exceeded",
-                {"ip": client_ip, "email": request_data.email},
+                {"ip": client_ip, "email": request_data.email, "limited_by": limited_by},
                 request
             )
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Too many password reset requests. Please try again later."
+                detail="Too many password reset requests. Please try again later.",
+                headers={"Retry-After": str(math.ceil(retry_after))}
             )
         
         # Find user by email
-        user = db.query(User).filter(User.email == request_data.email.lower()).first()
+        result = await db.execute(select(User).where(User.email == request_data.email.lower()))
+        user = result.scalars().first()
         
         if not user:
             # For security, always return success even if email doesn't exist
@@ -130,7 +122,11 @@ async def forgot_password(
         )
         
         db.add(token_record)
-        db.commit()
+        # Queued in the same transaction as the token; the outbox sender delivers it
+        email_queued = queue_password_reset_email(db, user.email, user.username, reset_token, RESET_TOKEN_EXPIRY_MINUTES)
+        await db.commit()
+        if email_queued:
+            notify_outbox()
         
         # Log security event
         log_security_event(
@@ -146,11 +142,8 @@ async def forgot_password(
         
         logger.info(f"Password reset token generated for user {user.email}")
         
-        # Send email with reset link
-        email_sent = await send_password_reset_email(user.email, user.username, reset_token)
-        
-        if not email_sent:
-            logger.warning(f"Failed to send reset email to {user.email}, but token was created")
+        if not email_queued:
+            logger.warning(f"Failed to queue reset email to {user.email}, but token was created")
         
         return ForgotPasswordResponse(
             message="Password reset link sent to your email",
@@ -161,7 +154,7 @@ async def forgot_password(
         raise
     except Exception as e:
         logger.error(f"Error in forgot_password: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -170,15 +163,12 @@ async def forgot_password(
 @router.get("/verify-reset-token", response_model=VerifyResetTokenResponse)
 async def verify_reset_token(
     token: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Verify if reset token is valid and not expired
     """
     try:
-        # Clean up expired tokens first
-        cleanup_expired_tokens(db)
-        
         if not token:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -186,9 +176,10 @@ async def verify_reset_token(
             )
         
         # Find token record
-        token_record = db.query(PasswordResetToken).filter(
+        result = await db.execute(select(PasswordResetToken).where(
             PasswordResetToken.token == token
-        ).first()
+        ))
+        token_record = result.scalars().first()
         
         if not token_record:
             return VerifyResetTokenResponse(
@@ -211,7 +202,8 @@ async def verify_reset_token(
             )
         
         # Check if user still exists and is active
-        user = db.query(User).filter(User.id == token_record.user_id).first()
+        result = await db.execute(select(User).where(User.id == token_record.user_id))
+        user = result.scalars().first()
         if not user or not user.is_active:
             return VerifyResetTokenResponse(
                 valid=False,
@@ -238,19 +230,17 @@ async def verify_reset_token(
 async def reset_password(
     request_data: ResetPasswordRequest,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Reset password using valid token
     """
     try:
-        # Clean up expired tokens first
-        cleanup_expired_tokens(db)
-        
         # Find token record
-        token_record = db.query(PasswordResetToken).filter(
+        result = await db.execute(select(PasswordResetToken).where(
             PasswordResetToken.token == request_data.token
-        ).first()
+        ))
+        token_record = result.scalars().first()
         
         if not token_record:
             raise HTTPException(
@@ -273,7 +263,8 @@ async def reset_password(
             )
         
         # Find user
-        user = db.query(User).filter(User.id == token_record.user_id).first()
+        result = await db.execute(select(User).where(User.id == token_record.user_id))
+        user = result.scalars().first()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -287,7 +278,7 @@ async def reset_password(
             )
         
         # Hash new password
-        hashed_password = get_password_hash(request_data.new_password)
+        hashed_password = await get_password_hash(request_data.new_password)
         
         # Update user password
         user.hashed_password = hashed_password
@@ -295,7 +286,8 @@ async def reset_password(
         # Mark token as used
         token_record.used_at = datetime.utcnow()
         
-        db.commit()
+        await db.commit()
+        invalidate_user(user.username)
         
         # Get client IP
         client_ip = get_client_ip(request)
@@ -322,7 +314,7 @@ async def reset_password(
         raise
     except Exception as e:
         logger.error(f"Error in reset_password: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -1,14 +1,25 @@
 """
 SME Management System API Routers
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import date, datetime
 
-from app.database import get_db
+from app.database import get_async_db
 from app.auth import get_current_user
+from dependencies.auth import require_admin_or_superadmin
+from app.pagination import paginate, finish_page
+from app.exports import EXPORT_FORMAT_PATTERN, export_response
+from app.time_entry_bulk import apply_time_entry_batch
+from app.dashboard_summary import get_dashboard_counts
 from app.models import User
+from app.sme_schemas import (
+    EmployeeListItem, EmployeeDetail, DepartmentListItem, ProjectListItem, ProjectDetail,
+    CustomerListItem, MaterialListItem, TimeEntryListItem, LeaveRequestListItem, ToolListItem,
+    TimeEntryBulkRequest, TimeEntryBulkResult, rows_response
+)
 from models.sme_models import (
     Employee, Department, Position, Customer, Project, 
     Material, Supplier, TimeEntry, LeaveRequest, Tool
@@ -17,420 +28,397 @@ from models.sme_models import (
 # Employee Management Router
 employee_router = APIRouter(prefix="/employees", tags=["Employee Management"])
 
-@employee_router.get("/", response_model=List[dict])
+def _employees_query(department_id: Optional[str], is_active: Optional[bool]):
+    # Only the listed columns - address, national_id and salary stay in the database
+    query = select(
+        Employee.employee_id, Employee.employee_code, Employee.first_name, Employee.last_name,
+        Employee.email, Employee.department_id, Employee.position_id, Employee.employment_type,
+        Employee.hire_date, Employee.is_active
+    )
+    
+    if department_id:
+        query = query.where(Employee.department_id == department_id)
+    if is_active is not None:
+        query = query.where(Employee.is_active == is_active)
+    return query
+
+@employee_router.get("/", response_model=List[EmployeeListItem])
 async def get_employees(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from the X-Next-Cursor header; use instead of skip"),
     department_id: Optional[str] = None,
     is_active: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of employees with filtering and pagination"""
-    query = db.query(Employee)
-    
-    if department_id:
-        query = query.filter(Employee.department_id == department_id)
-    if is_active is not None:
-        query = query.filter(Employee.is_active == is_active)
-    
-    employees = query.offset(skip).limit(limit).all()
+    query = paginate(_employees_query(department_id, is_active), Employee.employee_code, Employee.employee_id, skip, limit, cursor)
+    employees = (await db.execute(query)).all()
+    employees = finish_page(employees, limit, response, Employee.employee_code, Employee.employee_id)
     
-    return [
-        {
-            "employee_id": emp.employee_id,
-            "employee_code": emp.employee_code,
-            "first_name": emp.first_name,
-            "last_name": emp.last_name,
-            "email": emp.email,
-            "department_id": emp.department_id,
-            "position_id": emp.position_id,
-            "employment_type": emp.employment_type.value if emp.employment_type else None,
-            "hire_date": emp.hire_date.isoformat() if emp.hire_date else None,
-            "is_active": emp.is_active
-        }
-        for emp in employees
-    ]
+    return rows_response(EmployeeListItem, employees, response)
+
+@employee_router.get("/export")
+async def export_employees(
+    export_format: str = Query("ndjson", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    department_id: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream all employees matching the list filters as NDJSON or CSV"""
+    query = _employees_query(department_id, is_active).order_by(Employee.employee_code, Employee.employee_id)
+    return export_response(query, EmployeeListItem, export_format, "employees")
 
-@employee_router.get("/{employee_id}")
+@employee_router.get("/{employee_id}", response_model=EmployeeDetail)
 async def get_employee(
     employee_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get employee details by ID"""
-    employee = db.query(Employee).filter(Employee.employee_id == employee_id).first()
+    employee = (await db.execute(
+        select(
+            Employee.employee_id, Employee.employee_code, Employee.first_name, Employee.last_name,
+            Employee.email, Employee.phone, Employee.address, Employee.national_id,
+            Employee.department_id, Employee.position_id, Employee.employment_type, Employee.hire_date,
+            Employee.base_salary, Employee.annual_leave_balance, Employee.sick_leave_balance,
+            Employee.personal_leave_balance, Employee.is_active, Employee.created_at
+        ).where(Employee.employee_id == employee_id)
+    )).first()
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    return {
-        "employee_id": employee.employee_id,
-        "employee_code": employee.employee_code,
-        "first_name": employee.first_name,
-        "last_name": employee.last_name,
-        "email": employee.email,
-        "phone": employee.phone,
-        "address": employee.address,
-        "national_id": employee.national_id,
-        "department_id": employee.department_id,
-        "position_id": employee.position_id,
-        "employment_type": employee.employment_type.value if employee.employment_type else None,
-        "hire_date": employee.hire_date.isoformat() if employee.hire_date else None,
-        "base_salary": float(employee.base_salary) if employee.base_salary else None,
-        "annual_leave_balance": employee.annual_leave_balance,
-        "sick_leave_balance": employee.sick_leave_balance,
-        "personal_leave_balance": employee.personal_leave_balance,
-        "is_active": employee.is_active,
-        "created_at": employee.created_at.isoformat() if employee.created_at else None
-    }
+    return employee
 
 # Department Management Router
 department_router = APIRouter(prefix="/departments", tags=["Department Management"])
 
-@department_router.get("/", response_model=List[dict])
+@department_router.get("/", response_model=List[DepartmentListItem])
 async def get_departments(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from the X-Next-Cursor header; use instead of skip"),
     is_active: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of departments"""
-    query = db.query(Department)
+    # Counted in the database instead of loading every employee of every department
+    employee_count = (
+        select(func.count())
+        .where(Employee.department_id == Department.department_id)
+        .correlate(Department)
+        .scalar_subquery()
+        .label("employee_count")
+    )
+    query = select(
+        Department.department_id, Department.department_name, Department.description,
+        Department.manager_id, Department.budget_allocation, Department.is_active, employee_count
+    )
     
     if is_active is not None:
-        query = query.filter(Department.is_active == is_active)
+        query = query.where(Department.is_active == is_active)
     
-    departments = query.offset(skip).limit(limit).all()
+    query = paginate(query, Department.department_name, Department.department_id, skip, limit, cursor)
+    departments = (await db.execute(query)).all()
+    departments = finish_page(departments, limit, response, Department.department_name, Department.department_id)
     
-    return [
-        {
-            "department_id": dept.department_id,
-            "department_name": dept.department_name,
-            "description": dept.description,
-            "manager_id": dept.manager_id,
-            "budget_allocation": float(dept.budget_allocation) if dept.budget_allocation else None,
-            "is_active": dept.is_active,
-            "employee_count": len(dept.employees) if dept.employees else 0
-        }
-        for dept in departments
-    ]
+    return rows_response(DepartmentListItem, departments, response)
 
 # Project Management Router
 project_router = APIRouter(prefix="/projects", tags=["Project Management"])
 
-@project_router.get("/", response_model=List[dict])
+@project_router.get("/", response_model=List[ProjectListItem])
 async def get_projects(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from the X-Next-Cursor header; use instead of skip"),
     status: Optional[str] = None,
     customer_id: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of projects with filtering"""
-    query = db.query(Project)
+    query = select(
+        Project.project_id, Project.project_code, Project.project_name, Project.description,
+        Project.customer_id, Project.start_date, Project.end_date, Project.contract_value,
+        Project.estimated_cost, Project.actual_cost, Project.status, Project.progress_percentage,
+        Project.project_manager_id
+    )
     
     if status:
-        query = query.filter(Project.status == status)
+        query = query.where(Project.status == status)
     if customer_id:
-        query = query.filter(Project.customer_id == customer_id)
+        query = query.where(Project.customer_id == customer_id)
     
-    projects = query.offset(skip).limit(limit).all()
+    query = paginate(query, Project.project_code, Project.project_id, skip, limit, cursor)
+    projects = (await db.execute(query)).all()
+    projects = finish_page(projects, limit, response, Project.project_code, Project.project_id)
     
-    return [
-        {
-            "project_id": proj.project_id,
-            "project_code": proj.project_code,
-            "project_name": proj.project_name,
-            "description": proj.description,
-            "customer_id": proj.customer_id,
-            "start_date": proj.start_date.isoformat() if proj.start_date else None,
-            "end_date": proj.end_date.isoformat() if proj.end_date else None,
-            "contract_value": float(proj.contract_value) if proj.contract_value else None,
-            "estimated_cost": float(proj.estimated_cost) if proj.estimated_cost else None,
-            "actual_cost": float(proj.actual_cost) if proj.actual_cost else None,
-            "status": proj.status.value if proj.status else None,
-            "progress_percentage": float(proj.progress_percentage) if proj.progress_percentage else None,
-            "project_manager_id": proj.project_manager_id
-        }
-        for proj in projects
-    ]
+    return rows_response(ProjectListItem, projects, response)
 
-@project_router.get("/{project_id}")
+@project_router.get("/{project_id}", response_model=ProjectDetail)
 async def get_project(
     project_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get project details by ID"""
-    project = db.query(Project).filter(Project.project_id == project_id).first()
+    project = (await db.execute(
+        select(
+            Project.project_id, Project.project_code, Project.project_name, Project.description,
+            Project.customer_id, Project.start_date, Project.end_date, Project.estimated_duration,
+            Project.contract_value, Project.estimated_cost, Project.actual_cost, Project.status,
+            Project.progress_percentage, Project.project_manager_id, Project.created_at, Project.updated_at
+        ).where(Project.project_id == project_id)
+    )).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    return {
-        "project_id": project.project_id,
-        "project_code": project.project_code,
-        "project_name": project.project_name,
-        "description": project.description,
-        "customer_id": project.customer_id,
-        "start_date": project.start_date.isoformat() if project.start_date else None,
-        "end_date": project.end_date.isoformat() if project.end_date else None,
-        "estimated_duration": project.estimated_duration,
-        "contract_value": float(project.contract_value) if project.contract_value else None,
-        "estimated_cost": float(project.estimated_cost) if project.estimated_cost else None,
-        "actual_cost": float(project.actual_cost) if project.actual_cost else None,
-        "status": project.status.value if project.status else None,
-        "progress_percentage": float(project.progress_percentage) if project.progress_percentage else None,
-        "project_manager_id": project.project_manager_id,
-        "created_at": project.created_at.isoformat() if project.created_at else None,
-        "updated_at": project.updated_at.isoformat() if project.updated_at else None
-    }
+    return project
 
 # Customer Management Router
 customer_router = APIRouter(prefix="/customers", tags=["Customer Management"])
 
-@customer_router.get("/", response_model=List[dict])
+@customer_router.get("/", response_model=List[CustomerListItem])
 async def get_customers(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from the X-Next-Cursor header; use instead of skip"),
     is_active: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of customers"""
-    query = db.query(Customer)
+    query = select(
+        Customer.customer_id, Customer.customer_code, Customer.customer_name, Customer.contact_person,
+        Customer.email, Customer.phone, Customer.business_type, Customer.credit_limit,
+        Customer.payment_terms, Customer.is_active
+    )
     
     if is_active is not None:
-        query = query.filter(Customer.is_active == is_active)
+        query = query.where(Customer.is_active == is_active)
     
-    customers = query.offset(skip).limit(limit).all()
+    query = paginate(query, Customer.customer_code, Customer.customer_id, skip, limit, cursor)
+    customers = (await db.execute(query)).all()
+    customers = finish_page(customers, limit, response, Customer.customer_code, Customer.customer_id)
     
-    return [
-        {
-            "customer_id": cust.customer_id,
-            "customer_code": cust.customer_code,
-            "customer_name": cust.customer_name,
-            "contact_person": cust.contact_person,
-            "email": cust.email,
-            "phone": cust.phone,
-            "business_type": cust.business_type,
-            "credit_limit": float(cust.credit_limit) if cust.credit_limit else None,
-            "payment_terms": cust.payment_terms,
-            "is_active": cust.is_active
-        }
-        for cust in customers
-    ]
+    return rows_response(CustomerListItem, customers, response)
 
 # Material Management Router
 material_router = APIRouter(prefix="/materials", tags=["Material Management"])
 
-@material_router.get("/", response_model=List[dict])
+def _materials_query(category: Optional[str], low_stock: Optional[bool]):
+    query = select(
+        Material.material_id, Material.material_code, Material.material_name, Material.category,
+        Material.unit, Material.current_stock, Material.minimum_stock, Material.unit_cost,
+        Material.is_active,
+        (func.coalesce(Material.current_stock, 0) <= func.coalesce(Material.minimum_stock, 0)).label("low_stock_alert")
+    )
+    
+    if category:
+        query = query.where(Material.category == category)
+    if low_stock:
+        query = query.where(Material.current_stock <= Material.minimum_stock)
+    return query
+
+@material_router.get("/", response_model=List[MaterialListItem])
 async def get_materials(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from the X-Next-Cursor header; use instead of skip"),
     category: Optional[str] = None,
     low_stock: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of materials with filtering"""
-    query = db.query(Material)
-    
-    if category:
-        query = query.filter(Material.category == category)
-    if low_stock:
-        query = query.filter(Material.current_stock <= Material.minimum_stock)
+    query = paginate(_materials_query(category, low_stock), Material.material_code, Material.material_id, skip, limit, cursor)
+    materials = (await db.execute(query)).all()
+    materials = finish_page(materials, limit, response, Material.material_code, Material.material_id)
     
-    materials = query.offset(skip).limit(limit).all()
-    
-    return [
-        {
-            "material_id": mat.material_id,
-            "material_code": mat.material_code,
-            "material_name": mat.material_name,
-            "category": mat.category.value if mat.category else None,
-            "unit": mat.unit,
-            "current_stock": float(mat.current_stock) if mat.current_stock else None,
-            "minimum_stock": float(mat.minimum_stock) if mat.minimum_stock else None,
-            "unit_cost": float(mat.unit_cost) if mat.unit_cost else None,
-            "is_active": mat.is_active,
-            "low_stock_alert": (mat.current_stock or 0) <= (mat.minimum_stock or 0)
-        }
-        for mat in materials
-    ]
+    return rows_response(MaterialListItem, materials, response)
+
+@material_router.get("/export")
+async def export_materials(
+    export_format: str = Query("ndjson", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    category: Optional[str] = None,
+    low_stock: Optional[bool] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream all materials matching the list filters as NDJSON or CSV"""
+    query = _materials_query(category, low_stock).order_by(Material.material_code, Material.material_id)
+    return export_response(query, MaterialListItem, export_format, "materials")
 
 # Time Entry Router
 timeentry_router = APIRouter(prefix="/time-entries", tags=["Time Management"])
 
-@timeentry_router.get("/", response_model=List[dict])
+def _time_entries_query(
+    employee_id: Optional[str],
+    project_id: Optional[str],
+    start_date: Optional[date],
+    end_date: Optional[date]
+):
+    query = select(
+        TimeEntry.entry_id, TimeEntry.employee_id, TimeEntry.project_id, TimeEntry.entry_date,
+        TimeEntry.start_time, TimeEntry.end_time, TimeEntry.normal_hours, TimeEntry.ot_hour_1,
+        TimeEntry.ot_hour_2, TimeEntry.ot_hour_3, TimeEntry.work_description, TimeEntry.location,
+        TimeEntry.is_approved, TimeEntry.approved_by, TimeEntry.approved_at
+    )
+    
+    if employee_id:
+        query = query.where(TimeEntry.employee_id == employee_id)
+    if project_id:
+        query = query.where(TimeEntry.project_id == project_id)
+    if start_date:
+        query = query.where(TimeEntry.entry_date >= start_date)
+    if end_date:
+        query = query.where(TimeEntry.entry_date <= end_date)
+    return query
+
+@timeentry_router.get("/", response_model=List[TimeEntryListItem])
 async def get_time_entries(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from the X-Next-Cursor header; use instead of skip"),
     employee_id: Optional[str] = None,
     project_id: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get time entries with filtering"""
-    query = db.query(TimeEntry)
-    
-    if employee_id:
-        query = query.filter(TimeEntry.employee_id == employee_id)
-    if project_id:
-        query = query.filter(TimeEntry.project_id == project_id)
-    if start_date:
-        query = query.filter(TimeEntry.entry_date >= start_date)
-    if end_date:
-        query = query.filter(TimeEntry.entry_date <= end_date)
-    
-    entries = query.offset(skip).limit(limit).all()
+    query = paginate(_time_entries_query(employee_id, project_id, start_date, end_date), TimeEntry.entry_date, TimeEntry.entry_id, skip, limit, cursor)
+    entries = (await db.execute(query)).all()
+    entries = finish_page(entries, limit, response, TimeEntry.entry_date, TimeEntry.entry_id)
     
-    return [
-        {
-            "entry_id": entry.entry_id,
-            "employee_id": entry.employee_id,
-            "project_id": entry.project_id,
-            "entry_date": entry.entry_date.isoformat() if entry.entry_date else None,
-            "start_time": entry.start_time.isoformat() if entry.start_time else None,
-            "end_time": entry.end_time.isoformat() if entry.end_time else None,
-            "normal_hours": float(entry.normal_hours) if entry.normal_hours else None,
-            "ot_hour_1": float(entry.ot_hour_1) if entry.ot_hour_1 else None,
-            "ot_hour_2": float(entry.ot_hour_2) if entry.ot_hour_2 else None,
-            "ot_hour_3": float(entry.ot_hour_3) if entry.ot_hour_3 else None,
-            "work_description": entry.work_description,
-            "location": entry.location,
-            "is_approved": entry.is_approved,
-            "approved_by": entry.approved_by,
-            "approved_at": entry.approved_at.isoformat() if entry.approved_at else None
-        }
-        for entry in entries
-    ]
+    return rows_response(TimeEntryListItem, entries, response)
+
+@timeentry_router.get("/export")
+async def export_time_entries(
+    export_format: str = Query("ndjson", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    employee_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream all time entries matching the list filters as NDJSON or CSV"""
+    query = _time_entries_query(employee_id, project_id, start_date, end_date).order_by(
+        TimeEntry.entry_date, TimeEntry.entry_id
+    )
+    return export_response(query, TimeEntryListItem, export_format, "time-entries")
+
+@timeentry_router.post("/bulk", response_model=TimeEntryBulkResult)
+async def bulk_upsert_time_entries(
+    payload: TimeEntryBulkRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_admin_or_superadmin)
+):
+    """Create or replace time entries in one transaction; rejected rows are reported by index (Admin and SuperAdmin only)"""
+    return await apply_time_entry_batch(db, payload.entries, payload.all_or_nothing)
 
 # Leave Request Router
 leave_router = APIRouter(prefix="/leave-requests", tags=["Leave Management"])
 
-@leave_router.get("/", response_model=List[dict])
+@leave_router.get("/", response_model=List[LeaveRequestListItem])
 async def get_leave_requests(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from the X-Next-Cursor header; use instead of skip"),
     employee_id: Optional[str] = None,
     status: Optional[str] = None,
     leave_type: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get leave requests with filtering"""
-    query = db.query(LeaveRequest)
+    query = select(
+        LeaveRequest.request_id, LeaveRequest.employee_id, LeaveRequest.leave_type,
+        LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.total_days, LeaveRequest.reason,
+        LeaveRequest.status, LeaveRequest.approved_by, LeaveRequest.approved_at,
+        LeaveRequest.rejection_reason, LeaveRequest.coverage_employee_id, LeaveRequest.created_at
+    )
     
     if employee_id:
-        query = query.filter(LeaveRequest.employee_id == employee_id)
+        query = query.where(LeaveRequest.employee_id == employee_id)
     if status:
-        query = query.filter(LeaveRequest.status == status)
+        query = query.where(LeaveRequest.status == status)
     if leave_type:
-        query = query.filter(LeaveRequest.leave_type == leave_type)
+        query = query.where(LeaveRequest.leave_type == leave_type)
     
-    requests = query.offset(skip).limit(limit).all()
+    query = paginate(query, LeaveRequest.start_date, LeaveRequest.request_id, skip, limit, cursor)
+    requests = (await db.execute(query)).all()
+    requests = finish_page(requests, limit, response, LeaveRequest.start_date, LeaveRequest.request_id)
     
-    return [
-        {
-            "request_id": req.request_id,
-            "employee_id": req.employee_id,
-            "leave_type": req.leave_type.value if req.leave_type else None,
-            "start_date": req.start_date.isoformat() if req.start_date else None,
-            "end_date": req.end_date.isoformat() if req.end_date else None,
-            "total_days": req.total_days,
-            "reason": req.reason,
-            "status": req.status.value if req.status else None,
-            "approved_by": req.approved_by,
-            "approved_at": req.approved_at.isoformat() if req.approved_at else None,
-            "rejection_reason": req.rejection_reason,
-            "coverage_employee_id": req.coverage_employee_id,
-            "created_at": req.created_at.isoformat() if req.created_at else None
-        }
-        for req in requests
-    ]
+    return rows_response(LeaveRequestListItem, requests, response)
 
 # Tool Management Router
 tool_router = APIRouter(prefix="/tools", tags=["Tool Management"])
 
-@tool_router.get("/", response_model=List[dict])
+@tool_router.get("/", response_model=List[ToolListItem])
 async def get_tools(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from the X-Next-Cursor header; use instead of skip"),
     category: Optional[str] = None,
     is_available: Optional[bool] = None,
     condition: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of tools with filtering"""
-    query = db.query(Tool)
+    query = select(
+        Tool.tool_id, Tool.tool_code, Tool.tool_name, Tool.category, Tool.brand, Tool.model,
+        Tool.serial_number, Tool.purchase_cost, Tool.current_value, Tool.condition, Tool.is_available,
+        Tool.location, Tool.last_maintenance_date, Tool.next_maintenance_date
+    )
     
     if category:
-        query = query.filter(Tool.category == category)
+        query = query.where(Tool.category == category)
     if is_available is not None:
-        query = query.filter(Tool.is_available == is_available)
+        query = query.where(Tool.is_available == is_available)
     if condition:
-        query = query.filter(Tool.condition == condition)
+        query = query.where(Tool.condition == condition)
     
-    tools = query.offset(skip).limit(limit).all()
+    query = paginate(query, Tool.tool_code, Tool.tool_id, skip, limit, cursor)
+    tools = (await db.execute(query)).all()
+    tools = finish_page(tools, limit, response, Tool.tool_code, Tool.tool_id)
     
-    return [
-        {
-            "tool_id": tool.tool_id,
-            "tool_code": tool.tool_code,
-            "tool_name": tool.tool_name,
-            "category": tool.category,
-            "brand": tool.brand,
-            "model": tool.model,
-            "serial_number": tool.serial_number,
-            "purchase_cost": float(tool.purchase_cost) if tool.purchase_cost else None,
-            "current_value": float(tool.current_value) if tool.current_value else None,
-            "condition": tool.condition,
-            "is_available": tool.is_available,
-            "location": tool.location,
-            "last_maintenance_date": tool.last_maintenance_date.isoformat() if tool.last_maintenance_date else None,
-            "next_maintenance_date": tool.next_maintenance_date.isoformat() if tool.next_maintenance_date else None
-        }
-        for tool in tools
-    ]
+    return rows_response(ToolListItem, tools, response)
 
 # Dashboard Analytics Router
 analytics_router = APIRouter(prefix="/analytics", tags=["Analytics & Reports"])
 
 @analytics_router.get("/dashboard")
 async def get_dashboard_analytics(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get dashboard analytics data"""
     
-    # Employee statistics
-    total_employees = db.query(Employee).filter(Employee.is_active == True).count()
-    total_departments = db.query(Department).filter(Department.is_active == True).count()
-    
-    # Project statistics
-    active_projects = db.query(Project).filter(Project.status == "active").count()
-    total_projects = db.query(Project).count()
-    
-    # Material statistics
-    total_materials = db.query(Material).filter(Material.is_active == True).count()
-    low_stock_materials = db.query(Material).filter(
-        Material.current_stock <= Material.minimum_stock,
-        Material.is_active == True
-    ).count()
-    
-    # Leave requests statistics
-    pending_leave_requests = db.query(LeaveRequest).filter(
-        LeaveRequest.status == "pending"
-    ).count()
+    # Served from the dashboard_summary row unless it is too stale
+    counts, as_of = await get_dashboard_counts(db)
     
-    # Tool statistics
-    available_tools = db.query(Tool).filter(Tool.is_available == True).count()
-    total_tools = db.query(Tool).count()
+    total_employees = counts["total_employees"]
+    total_departments = counts["total_departments"]
+    active_projects = counts["active_projects"]
+    total_projects = counts["total_projects"]
+    total_materials = counts["total_materials"]
+    low_stock_materials = counts["low_stock_materials"]
+    pending_leave_requests = counts["pending_leave_requests"]
+    available_tools = counts["available_tools"]
+    total_tools = counts["total_tools"]
     
     return {
         "employees": {
@@ -455,6 +443,8 @@ async def get_dashboard_analytics(
             "total": total_tools,
             "utilization_rate": round((total_tools - available_tools) / total_tools * 100, 2) if total_tools > 0 else 0
         },
+        "as_of": as_of.isoformat(),
+        "staleness_seconds": round((datetime.utcnow() - as_of).total_seconds(), 3),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -1,26 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User
 from models.user import UserCreate, UserUpdate, UserResponse, PasswordChange, UserStatusUpdate
-from app.auth import get_current_user
+from app.auth import get_current_user, verify_password, get_password_hash
+from app.user_cache import invalidate_user
 from dependencies.auth import require_admin_or_superadmin, require_superadmin
-from passlib.context import CryptContext
 from datetime import datetime
 
 router = APIRouter(prefix="/users", tags=["users"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 @router.get("/", response_model=List[UserResponse])
 async def get_users(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(require_admin_or_superadmin)
 ):
     """Get all users (Admin/SuperAdmin only)"""
     try:
-        users = db.query(User).all()
-        return users
+        result = await db.execute(select(User))
+        return result.scalars().all()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -30,7 +30,7 @@ async def get_users(
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
     user_data: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(require_admin_or_superadmin)
 ):
     """Create new user (Admin and SuperAdmin only)"""
@@ -42,9 +42,10 @@ async def create_user(
             detail="Admin can only create users with 'user' role"
         )
     # Check if username or email already exists
-    existing_user = db.query(User).filter(
+    result = await db.execute(select(User).where(
         (User.username == user_data.username) | (User.email == user_data.email)
-    ).first()
+    ))
+    existing_user = result.scalars().first()
     
     if existing_user:
         if existing_user.username == user_data.username:
@@ -59,7 +60,7 @@ async def create_user(
             )
     
     # Hash password
-    hashed_password = pwd_context.hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     
     # Create new user
     db_user = User(
@@ -72,8 +73,8 @@ async def create_user(
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
@@ -87,25 +88,28 @@ async def get_current_user_profile(
 @router.put("/me", response_model=UserResponse)
 async def update_current_user_profile(
     user_data: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Update current user profile"""
     # Check if username/email is already taken by another user
     if user_data.username or user_data.email:
-        query = db.query(User).filter(User.id != current_user.id)
+        query = select(User).where(User.id != current_user.id)
         if user_data.username:
-            query = query.filter(User.username == user_data.username)
+            query = query.where(User.username == user_data.username)
         if user_data.email:
-            query = query.filter(User.email == user_data.email)
+            query = query.where(User.email == user_data.email)
         
-        existing_user = query.first()
+        existing_user = (await db.execute(query)).scalars().first()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Username or email already taken"
             )
     
+    # current_user is a cached snapshot - load the row to modify it
+    user = await db.get(User, current_user.id)
+    
     # Update user data
     update_data = user_data.dict(exclude_unset=True)
     
@@ -114,28 +118,29 @@ async def update_current_user_profile(
         del update_data['role']
     
     for field, value in update_data.items():
-        setattr(current_user, field, value)
+        setattr(user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_user(current_user.username, user.username)
     
-    return current_user
+    return user
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
-    user_id: str,
-    db: Session = Depends(get_db),
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Get user by ID (Admin can see all, User can see own)"""
     # Users can only see their own profile, admins can see all
-    if current_user.role not in ['admin', 'superadmin'] and str(current_user.id) != user_id:
+    if current_user.role not in ['admin', 'superadmin'] and current_user.id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this user"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -146,13 +151,13 @@ async def get_user_by_id(
 
 @router.put("/{user_id}", response_model=UserResponse)
 async def update_user(
-    user_id: str,
+    user_id: int,
     user_data: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(require_admin_or_superadmin)
 ):
     """Update user (Admin/SuperAdmin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -182,13 +187,13 @@ async def update_user(
     
     # Check for duplicates
     if user_data.username or user_data.email:
-        query = db.query(User).filter(User.id != user_id)
+        query = select(User).where(User.id != user_id)
         if user_data.username:
-            query = query.filter(User.username == user_data.username)
+            query = query.where(User.username == user_data.username)
         if user_data.email:
-            query = query.filter(User.email == user_data.email)
+            query = query.where(User.email == user_data.email)
         
-        existing_user = query.first()
+        existing_user = (await db.execute(query)).scalars().first()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -196,19 +201,21 @@ async def update_user(
             )
     
     # Update user
+    previous_username = user.username
     update_data = user_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(user, field, value)
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_user(previous_username, user.username)
     
     return user
 
 @router.delete("/{user_id}")
 async def delete_user(
-    user_id: str,
-    db: Session = Depends(get_db),
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(require_admin_or_superadmin)
 ):
     """Delete user (Admin/SuperAdmin only)"""
@@ -218,7 +225,7 @@ async def delete_user(
             detail="Cannot delete your own account"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -232,16 +239,17 @@ async def delete_user(
             detail="Admin cannot delete superadmin users"
         )
     
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    invalidate_user(user.username)
     
     return {"message": "User deleted successfully"}
 
 @router.patch("/{user_id}/status", response_model=UserResponse)
 async def toggle_user_status(
-    user_id: str,
+    user_id: int,
     status_data: UserStatusUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(require_admin_or_superadmin)
 ):
     """Toggle user active status (Admin/SuperAdmin only)"""
@@ -251,7 +259,7 @@ async def toggle_user_status(
             detail="Cannot change your own status"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -266,30 +274,35 @@ async def toggle_user_status(
         )
     
     user.is_active = status_data.is_active
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_user(user.username)
     
     return user
 
 @router.post("/me/change-password")
 async def change_password(
     password_data: PasswordChange,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Change current user password"""
+    # current_user is a cached snapshot without the password hash - load the row
+    user = await db.get(User, current_user.id)
+    
     # Verify current password
-    if not pwd_context.verify(password_data.current_password, current_user.hashed_password):
+    if not await verify_password(password_data.current_password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
     # Hash new password
-    new_hashed_password = pwd_context.hash(password_data.new_password)
-    current_user.hashed_password = new_hashed_password
+    new_hashed_password = await get_password_hash(password_data.new_password)
+    user.hashed_password = new_hashed_password
     
-    db.commit()
+    await db.commit()
+    invalidate_user(user.username)
     
     return {"message": "Password changed successfully"}
 
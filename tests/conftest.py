@@ -0,0 +1,61 @@
+"""
+Shared test fixtures: the app runs against a throwaway SQLite database
+"""
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="sme-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'test.db')}")
+os.environ.setdefault("ENVIRONMENT", "test")
+os.environ.setdefault("LOG_QUEUE_ENABLED", "false")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("METRICS_ENABLED", "true")
+os.environ.setdefault("METRICS_BEARER_TOKEN", "test-metrics-token")
+
+import httpx
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.auth import create_access_token, token_cache
+from app.database import async_engine, engine
+from app.models import Base as AppBase, User
+from app.user_cache import user_cache
+from models.sme_models import Base as SmeBase
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    token_cache.clear()
+    user_cache.clear()
+    yield
+    token_cache.clear()
+    user_cache.clear()
+
+@pytest.fixture
+def database():
+    """Empty application and SME tables in the test database"""
+    # departments <-> employees reference each other, so drop_all cannot order them; SQLite does not enforce FKs here
+    with engine.begin() as conn:
+        for table in inspect(conn).get_table_names():
+            conn.exec_driver_sql(f'DROP TABLE "{table}"')
+    for base in (AppBase, SmeBase):
+        base.metadata.create_all(engine)
+    return engine
+
+@pytest.fixture
+async def client(database):
+    from main import app
+    async with httpx.AsyncClient(app=app, base_url="http://testserver") as test_client:
+        yield test_client
+    # Pooled aiosqlite connections belong to this test's event loop
+    await async_engine.dispose()
+
+@pytest.fixture
+def auth_headers(database):
+    """Create a user with the given role and return bearer headers for it"""
+    def make(username: str = "tester", role: str = "user"):
+        with Session(engine) as db:
+            db.add(User(username=username, email=f"{username}@example.com", hashed_password="-", role=role))
+            db.commit()
+        return {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+    return make
@@ -0,0 +1,68 @@
+"""
+Outbox delivery: rows are leased before the SMTP send and settled afterwards
+"""
+import smtplib
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import email_outbox
+from app.database import async_engine
+from app.email_service import email_service
+from app.models import EmailOutbox
+
+@pytest.fixture
+async def outbox(database, monkeypatch):
+    monkeypatch.setattr(email_service, "is_configured", True)
+    yield database
+    await async_engine.dispose()
+
+def _queue(engine, count: int = 1):
+    with Session(engine) as db:
+        for index in range(count):
+            email_outbox.enqueue_email(db, f"user{index}@example.com", "Reset", "link", "<a>link</a>")
+        db.commit()
+
+def _rows(engine):
+    with Session(engine) as db:
+        return db.scalars(select(EmailOutbox).order_by(EmailOutbox.id)).all()
+
+async def test_batch_is_sent_outside_a_transaction_and_bodies_are_cleared(outbox, monkeypatch):
+    _queue(outbox, 2)
+    seen = []
+
+    def deliver_many(messages):
+        # Runs with the claim already committed: the rows are visible as leased to other connections
+        seen.extend(row.status for row in _rows(outbox))
+        return [None] * len(messages)
+
+    monkeypatch.setattr(email_service, "deliver_many", deliver_many)
+    assert await email_outbox.deliver_pending_emails() == 2
+
+    assert seen == ["sending", "sending"]
+    for row in _rows(outbox):
+        assert (row.status, row.attempts, row.text_body, row.html_body) == ("sent", 1, "", None)
+        assert row.sent_at is not None
+
+async def test_claimed_rows_are_not_claimed_again_until_the_lease_expires(outbox):
+    _queue(outbox)
+    assert len(await email_outbox.claim_due_emails()) == 1
+    assert await email_outbox.claim_due_emails() == []
+
+    with Session(outbox) as db:
+        db.get(EmailOutbox, 1).next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+    reclaimed = await email_outbox.claim_due_emails()
+    assert [(row.id, row.attempts) for row in reclaimed] == [(1, 2)]
+
+async def test_failed_send_is_rescheduled(outbox, monkeypatch):
+    _queue(outbox)
+    monkeypatch.setattr(email_service, "deliver_many", lambda messages: [smtplib.SMTPRecipientsRefused({})])
+
+    assert await email_outbox.deliver_pending_emails() == 0
+    [row] = _rows(outbox)
+    assert (row.status, row.attempts, row.text_body) == ("pending", 1, "link")
+    assert row.next_attempt_at > datetime.utcnow()
+    assert row.last_error
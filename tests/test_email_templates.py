@@ -0,0 +1,23 @@
+"""
+Email templates: slot values are escaped in HTML only, static text is left as written
+"""
+from app.email_templates import CompiledTemplate, render_email
+
+def test_html_slots_are_escaped_and_text_slots_are_not():
+    rendered = render_email("password_reset", "en", username="<b>bob</b>", reset_link="https://x/?a=1&b=2", expiry_minutes=15)
+
+    assert "Hi &lt;b&gt;bob&lt;/b&gt;," in rendered.html
+    assert 'href="https://x/?a=1&amp;b=2"' in rendered.html
+    assert "Hi <b>bob</b>," in rendered.text
+    assert "font-family: Arial" in rendered.html and "{{" not in rendered.html
+
+def test_bind_inlines_nested_templates_and_keeps_open_slots():
+    template = CompiledTemplate("<p>{greeting}</p>{body}", escape=True).bind(
+        greeting="<i>Hi</i>", body=CompiledTemplate("{name} & {name}")
+    )
+
+    assert template.slots == ("name", "name")
+    assert template.render({"name": "<x>"}) == "<p><i>Hi</i></p>&lt;x&gt; & &lt;x&gt;"
+
+def test_unknown_locale_falls_back_to_english():
+    assert render_email("welcome", "fr", username="bob", login_link="l").subject == "Welcome to Auth System"
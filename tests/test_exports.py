@@ -0,0 +1,124 @@
+"""
+Streaming NDJSON/CSV exports: same rows and filters as the list endpoints, read in batches
+"""
+import csv
+import io
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app import exports
+from app.database import async_engine
+from app.sme_schemas import TimeEntryListItem
+from models.sme_models import Material, MaterialCategory, TimeEntry
+from routers.sme_routers import _time_entries_query
+
+ENTRY_COUNT = 10
+
+@pytest.fixture
+def entries(database):
+    start = date(2024, 1, 1)
+    with Session(database) as db:
+        for i in range(ENTRY_COUNT):
+            db.add(TimeEntry(
+                entry_id=f"T{i:03}",
+                # One entry belongs to nobody; the column is nullable
+                employee_id=None if i == 0 else f"E{i % 2}",
+                project_id="P1",
+                entry_date=start + timedelta(days=i),
+                normal_hours=Decimal(8),
+                is_approved=i % 3 == 0
+            ))
+        db.add(Material(
+            material_id="M1", material_code="MAT1", material_name="Cement", category=MaterialCategory.RAW_MATERIAL,
+            unit="kg", current_stock=Decimal(1), minimum_stock=Decimal(5), is_active=True
+        ))
+        db.commit()
+    return database
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def _csv(response):
+    return list(csv.reader(io.StringIO(response.text)))
+
+async def test_ndjson_lines_match_the_list_endpoint(client, auth_headers, entries):
+    headers = auth_headers()
+    listed = (await client.get("/time-entries/", headers=headers)).json()
+
+    response = await client.get("/time-entries/export", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="time-entries-' in response.headers["content-disposition"]
+    assert _ndjson(response) == listed
+    assert listed[0]["employee_id"] is None
+
+async def test_csv_has_a_header_and_the_ndjson_values(client, auth_headers, entries):
+    headers = auth_headers()
+    listed = (await client.get("/time-entries/", headers=headers)).json()
+
+    response = await client.get("/time-entries/export?format=csv", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    header, *rows = _csv(response)
+    assert header == list(TimeEntryListItem.model_fields)
+    assert len(rows) == ENTRY_COUNT
+    first = dict(zip(header, rows[0]))
+    assert first["entry_id"] == listed[0]["entry_id"]
+    # NULL is an empty field; booleans are spelled as in JSON
+    assert first["employee_id"] == ""
+    assert {row[header.index("is_approved")] for row in rows} == {"true", "false"}
+
+async def test_material_csv_booleans_match_ndjson(client, auth_headers, entries):
+    headers = auth_headers()
+    [item] = _ndjson(await client.get("/materials/export", headers=headers))
+    header, row = _csv(await client.get("/materials/export?format=csv", headers=headers))
+
+    assert (item["is_active"], item["low_stock_alert"]) == (True, True)
+    assert (row[header.index("is_active")], row[header.index("low_stock_alert")]) == ("true", "true")
+
+async def test_empty_csv_export_is_only_the_header(client, auth_headers, database):
+    response = await client.get("/employees/export?format=csv", headers=auth_headers())
+
+    assert response.status_code == 200
+    assert _csv(response) == [["employee_id", "employee_code", "first_name", "last_name", "email", "department_id",
+                               "position_id", "employment_type", "hire_date", "is_active"]]
+
+@pytest.mark.parametrize("query", [
+    "employee_id=E1",
+    "project_id=P1",
+    "start_date=2024-01-03&end_date=2024-01-06",
+    "employee_id=E0&start_date=2024-01-05",
+])
+async def test_export_filters_match_the_list_endpoint(client, auth_headers, entries, query):
+    headers = auth_headers()
+    listed = (await client.get(f"/time-entries/?{query}", headers=headers)).json()
+
+    exported = _ndjson(await client.get(f"/time-entries/export?{query}", headers=headers))
+
+    assert exported
+    assert exported == listed
+
+async def test_export_rejects_unknown_format(client, auth_headers, database):
+    response = await client.get("/time-entries/export?format=xml", headers=auth_headers())
+
+    assert response.status_code == 422
+
+@pytest.mark.parametrize("export_format", ["ndjson", "csv"])
+async def test_export_is_read_in_batches(entries, monkeypatch, export_format):
+    monkeypatch.setattr(exports, "EXPORT_BATCH_SIZE", 3)
+    query = _time_entries_query(None, None, None, None).order_by(TimeEntry.entry_date, TimeEntry.entry_id)
+
+    chunks = [chunk async for chunk in exports._export_chunks(query, TimeEntryListItem, export_format)]
+
+    # 10 rows in batches of 3 -> 4 chunks, plus the CSV header
+    assert len(chunks) == (5 if export_format == "csv" else 4)
+    lines = b"".join(chunks).decode().splitlines()
+    assert len(lines) == ENTRY_COUNT + (1 if export_format == "csv" else 0)
+    assert lines[-1].startswith('{"entry_id":"T009"' if export_format == "ndjson" else "T009,")
+    await async_engine.dispose()
@@ -0,0 +1,176 @@
+"""
+Queued log shipping: drop-on-full policy, drop reporting, batched flushes and the drain on shutdown
+"""
+import logging
+import threading
+
+import pytest
+
+from app import log_shipping
+from app.log_shipping import BatchFlushMixin, LogShipper, ShippingHandler
+
+class CollectingHandler(BatchFlushMixin, logging.Handler):
+    """Keeps each record's message and counts the flushes that reach it"""
+
+    def __init__(self, level: int = logging.NOTSET):
+        super().__init__(level)
+        self.messages = []
+        self.flushes = 0
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+        # Like StreamHandler, which flushes after every record
+        self.flush()
+
+    def flush(self):
+        if not self.deferring:
+            self.flushes += 1
+
+class BlockingHandler(CollectingHandler):
+    """Holds the writer thread inside its first record until released"""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.unblocked = threading.Event()
+
+    def emit(self, record):
+        self.entered.set()
+        assert self.unblocked.wait(5)
+        super().emit(record)
+
+def record(msg: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.makeLogRecord({"msg": msg, "levelno": level, "levelname": logging.getLevelName(level)})
+
+@pytest.fixture
+def blocked():
+    """A started shipper with a two-record queue whose writer is stuck on record r0"""
+    handler = BlockingHandler()
+    shipper = LogShipper(maxsize=2, batch_size=10, block_seconds=0)
+    shipper._handlers = [handler]
+    shipper.start()
+    shipper.enqueue(record("r0"), (handler,))
+    assert handler.entered.wait(5)
+    yield shipper, handler
+    handler.unblocked.set()
+    shipper.stop()
+
+def test_records_beyond_capacity_are_dropped_and_counted(blocked):
+    shipper, handler = blocked
+
+    for i in range(1, 6):
+        shipper.enqueue(record(f"r{i}"), (handler,))
+
+    assert shipper.stats()["queued"] == 2
+    assert (shipper.enqueued, shipper.dropped, shipper.max_depth) == (3, 3, 2)
+
+def test_drops_are_reported_ahead_of_the_next_batch(blocked):
+    shipper, handler = blocked
+    for i in range(1, 6):
+        shipper.enqueue(record(f"r{i}"), (handler,))
+
+    handler.unblocked.set()
+    shipper.stop()
+
+    assert handler.messages == ["r0", "Log queue full, dropped 3 records", "r1", "r2"]
+    # Reported once; the counter itself keeps the total
+    assert shipper.dropped == 3 and shipper._reported_dropped == 3
+
+def test_errors_wait_for_queue_space(blocked):
+    shipper, handler = blocked
+    shipper.block_seconds = 5
+    shipper.enqueue(record("r1"), (handler,))
+    shipper.enqueue(record("r2"), (handler,))
+
+    threading.Timer(0.05, handler.unblocked.set).start()
+    shipper.enqueue(record("boom", logging.ERROR), (handler,))
+    shipper.stop()
+
+    assert shipper.dropped == 0
+    assert handler.messages == ["r0", "r1", "r2", "boom"]
+
+def test_errors_are_dropped_without_a_block_timeout(blocked):
+    shipper, handler = blocked
+    shipper.enqueue(record("r1"), (handler,))
+    shipper.enqueue(record("r2"), (handler,))
+
+    shipper.enqueue(record("boom", logging.ERROR), (handler,))
+
+    assert shipper.dropped == 1
+
+@pytest.mark.parametrize("batch_size, batches", [(10, 1), (2, 3)])
+def test_handlers_are_flushed_once_per_batch(batch_size, batches):
+    handler = CollectingHandler()
+    shipper = LogShipper(maxsize=100, batch_size=batch_size)
+    shipper._handlers = [handler]
+    for i in range(5):
+        shipper.enqueue(record(f"r{i}"), (handler,))
+
+    # Everything is queued before the writer starts, so the batches are full ones
+    shipper.start()
+    shipper.stop()
+
+    assert handler.messages == [f"r{i}" for i in range(5)]
+    assert (shipper.written, shipper.batches) == (5, batches)
+    assert handler.flushes == batches
+
+def test_records_below_a_target_level_are_skipped():
+    info, errors = CollectingHandler(), CollectingHandler(logging.ERROR)
+    shipper = LogShipper(maxsize=10)
+    shipper.enqueue(record("note"), (info, errors))
+    shipper.enqueue(record("boom", logging.ERROR), (info, errors))
+
+    shipper.start()
+    shipper.stop()
+
+    assert info.messages == ["note", "boom"]
+    assert errors.messages == ["boom"]
+
+def test_shipping_handler_renders_arguments_when_queued():
+    handler = CollectingHandler()
+    shipper = LogShipper(maxsize=10)
+    payload = {"state": "before"}
+    logged = logging.LogRecord("tests", logging.INFO, __file__, 1, "state=%(state)s", (payload,), None)
+
+    ShippingHandler(shipper, (handler,)).emit(logged)
+    payload["state"] = "after"
+    shipper.start()
+    shipper.stop()
+
+    assert handler.messages == ["state=before"]
+
+@pytest.fixture
+def shipped_logger(monkeypatch):
+    monkeypatch.setattr(log_shipping, "LOG_QUEUE_ENABLED", True)
+    monkeypatch.setattr(log_shipping, "log_shipper", None)
+    logger = logging.getLogger("tests.log_shipping")
+    handler = CollectingHandler()
+    monkeypatch.setattr(logger, "handlers", [handler])
+    monkeypatch.setattr(logger, "propagate", False)
+    logger.setLevel(logging.INFO)
+    yield logger, handler
+    log_shipping.stop_log_shipping()
+
+def test_stop_log_shipping_drains_the_queue_and_restores_handlers(shipped_logger):
+    logger, handler = shipped_logger
+    shipper = log_shipping.start_log_shipping(["tests.log_shipping"])
+    assert isinstance(logger.handlers[0], ShippingHandler)
+
+    for i in range(50):
+        logger.info("record %d", i)
+    log_shipping.stop_log_shipping()
+
+    assert handler.messages == [f"record {i}" for i in range(50)]
+    assert shipper.stats()["written"] == 50 and shipper.stats()["queued"] == 0
+    assert logger.handlers == [handler]
+
+    logger.info("after shutdown")
+    assert handler.messages[-1] == "after shutdown"
+
+def test_shipping_disabled_leaves_handlers_alone(shipped_logger, monkeypatch):
+    logger, handler = shipped_logger
+    monkeypatch.setattr(log_shipping, "LOG_QUEUE_ENABLED", False)
+
+    assert log_shipping.start_log_shipping(["tests.log_shipping"]) is None
+    assert logger.handlers == [handler]
+    assert log_shipping.log_shipping_stats() is None
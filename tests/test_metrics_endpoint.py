@@ -0,0 +1,28 @@
+"""
+/metrics is served only to scrapers presenting METRICS_BEARER_TOKEN
+"""
+import os
+
+import pytest
+
+@pytest.mark.parametrize("headers", [
+    {},
+    {"Authorization": "Bearer wrong-token"},
+    {"Authorization": "Basic dGVzdDp0ZXN0"},
+])
+async def test_metrics_rejects_missing_or_wrong_token(client, headers):
+    response = await client.get("/metrics", headers=headers)
+
+    assert response.status_code == 401
+
+async def test_metrics_rejects_user_jwt(client, auth_headers):
+    response = await client.get("/metrics", headers=auth_headers("admin", role="admin"))
+
+    assert response.status_code == 401
+
+async def test_metrics_accepts_the_configured_token(client):
+    token = os.environ["METRICS_BEARER_TOKEN"]
+    response = await client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
@@ -0,0 +1,95 @@
+"""
+Keyset pagination: cursors walk every row exactly once, ties on the sort key included
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from models.sme_models import Department, Material, TimeEntry
+
+@pytest.fixture
+def entries(database):
+    with Session(database) as db:
+        # Three rows per day, so most page boundaries fall inside a run of equal entry_dates
+        for i in range(11):
+            db.add(TimeEntry(entry_id=f"T{i:03}", employee_id="E1", entry_date=date(2024, 1, 1 + i // 3)))
+        db.commit()
+    return database
+
+async def _walk(client, headers, url: str):
+    """Every page of url by following X-Next-Cursor; returns the pages' ids and their cursor headers"""
+    pages, cursors = [], []
+    cursor = None
+    while True:
+        params = {"cursor": cursor} if cursor else {}
+        response = await client.get(url, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        pages.append([item["entry_id"] for item in response.json()])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        cursors.append(cursor)
+        if cursor is None:
+            return pages, cursors
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 10])
+async def test_cursor_pages_cover_every_row_once(client, auth_headers, entries, limit):
+    headers = auth_headers()
+    everything = [item["entry_id"] for item in (await client.get("/time-entries/?limit=1000", headers=headers)).json()]
+
+    pages, cursors = await _walk(client, headers, f"/time-entries/?limit={limit}")
+
+    assert [entry_id for page in pages for entry_id in page] == everything
+    assert len(everything) == 11
+    assert all(len(page) == limit for page in pages[:-1])
+    assert all(cursors[:-1]) and cursors[-1] is None
+
+async def test_last_page_has_no_next_cursor(client, auth_headers, entries):
+    headers = auth_headers()
+
+    exact = await client.get("/time-entries/?limit=11", headers=headers)
+    short = await client.get("/time-entries/?skip=10&limit=5", headers=headers)
+
+    assert len(exact.json()) == 11 and NEXT_CURSOR_HEADER not in exact.headers
+    assert len(short.json()) == 1 and NEXT_CURSOR_HEADER not in short.headers
+
+async def test_skip_still_pages_by_offset(client, auth_headers, entries):
+    headers = auth_headers()
+
+    response = await client.get("/time-entries/?skip=3&limit=3", headers=headers)
+
+    assert [item["entry_id"] for item in response.json()] == ["T003", "T004", "T005"]
+    assert NEXT_CURSOR_HEADER in response.headers
+
+async def test_cursor_with_skip_is_rejected(client, auth_headers, entries):
+    headers = auth_headers()
+    cursor = (await client.get("/time-entries/?limit=2", headers=headers)).headers[NEXT_CURSOR_HEADER]
+
+    response = await client.get("/time-entries/", params={"cursor": cursor, "skip": 2}, headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["message"] == "Use either cursor or skip, not both"
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", encode_cursor("x", "y")[:-3], "W10"])
+async def test_malformed_cursor_is_rejected(client, auth_headers, entries, cursor):
+    response = await client.get("/time-entries/", params={"cursor": cursor}, headers=auth_headers())
+
+    assert response.status_code == 400
+    assert response.json()["message"] == "Invalid pagination cursor"
+
+@pytest.mark.parametrize("column, pk, sort_value", [
+    (TimeEntry.entry_date, TimeEntry.entry_id, date(2024, 2, 29)),
+    (TimeEntry.approved_at, TimeEntry.entry_id, datetime(2024, 2, 29, 13, 45, 1)),
+    (Material.current_stock, Material.material_id, Decimal("12.500")),
+    (Department.department_name, Department.department_id, "Sales"),
+])
+def test_cursor_round_trips_typed_values(column, pk, sort_value):
+    assert decode_cursor(encode_cursor(sort_value, "ID-1"), column, pk) == (sort_value, "ID-1")
+
+def test_decode_cursor_raises_http_400():
+    with pytest.raises(HTTPException) as error:
+        decode_cursor("%%%", TimeEntry.entry_date, TimeEntry.entry_id)
+
+    assert error.value.status_code == 400
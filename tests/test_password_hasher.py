@@ -0,0 +1,118 @@
+"""
+Bounded bcrypt pool: 503 backpressure once max_workers + queue_size calls are in flight, and shutdown
+"""
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import PasswordResetToken, User
+from app.password_hasher import PasswordHasher, password_hasher
+
+class SlowStub:
+    """Stands in for bcrypt; every call blocks its worker thread until released"""
+
+    def __init__(self):
+        self.unblocked = threading.Event()
+        self.calls = 0
+
+    def __call__(self, value):
+        self.calls += 1
+        assert self.unblocked.wait(5)
+        return f"hashed:{value}"
+
+@pytest.fixture
+async def saturated():
+    """A one-worker pool with room for one queued call, and both slots taken"""
+    hasher = PasswordHasher(max_workers=1, queue_size=1)
+    stub = SlowStub()
+    running = [asyncio.create_task(hasher._run("hash", stub, str(i))) for i in range(2)]
+    # _run counts a call as in flight before its first await
+    await asyncio.sleep(0)
+    yield hasher, stub, running
+    stub.unblocked.set()
+    await asyncio.gather(*running, return_exceptions=True)
+    hasher.shutdown()
+
+async def test_call_beyond_capacity_gets_503(saturated):
+    hasher, stub, running = saturated
+    assert hasher.capacity == 2
+    assert hasher.stats()["in_flight"] == 2
+
+    with pytest.raises(HTTPException) as error:
+        await hasher.hash("one too many")
+
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "1"}
+    assert hasher.stats()["operations"]["hash"]["rejected"] == 1
+
+async def test_pool_accepts_calls_again_once_drained(saturated):
+    hasher, stub, running = saturated
+
+    stub.unblocked.set()
+
+    assert await asyncio.gather(*running) == ["hashed:0", "hashed:1"]
+    assert hasher.stats()["in_flight"] == 0
+    assert await hasher._run("hash", stub, "2") == "hashed:2"
+    assert hasher.stats()["operations"]["hash"]["calls"] == 3
+
+async def test_shutdown_cancels_queued_calls(saturated):
+    hasher, stub, running = saturated
+    # The first call is on the worker, the second still waiting in the executor queue
+    while stub.calls == 0:
+        await asyncio.sleep(0.001)
+
+    hasher.shutdown()
+    stub.unblocked.set()
+
+    assert await running[0] == "hashed:0"
+    with pytest.raises(asyncio.CancelledError):
+        await running[1]
+    assert stub.calls == 1
+    assert hasher.stats()["in_flight"] == 0
+
+async def test_pool_is_recreated_after_shutdown():
+    hasher = PasswordHasher(max_workers=1, queue_size=0)
+    hashed = await hasher.hash("secret123")
+
+    hasher.shutdown()
+
+    assert hasher._executor is None
+    assert await hasher.verify("secret123", hashed)
+    assert not await hasher.verify("wrong", hashed)
+    hasher.shutdown()
+
+async def test_verify_rejects_bad_hashes_without_raising():
+    hasher = PasswordHasher(max_workers=1)
+
+    assert not await hasher.verify("secret123", "")
+    assert not await hasher.verify("secret123", "not-a-bcrypt-hash")
+    # Empty hashes never reach the pool
+    assert hasher.stats()["operations"]["verify"]["calls"] == 1
+    hasher.shutdown()
+
+def test_unknown_executor_type_is_rejected():
+    with pytest.raises(ValueError):
+        PasswordHasher(executor_type="fiber")
+
+async def test_saturated_pool_surfaces_as_503_over_http(client, database, monkeypatch):
+    with Session(database) as db:
+        user = User(username="bob", email="bob@example.com", hashed_password="-", role="user")
+        db.add(user)
+        db.flush()
+        db.add(PasswordResetToken(user_id=user.id, token="reset-token", expires_at=datetime.utcnow() + timedelta(minutes=5)))
+        db.commit()
+    monkeypatch.setattr(password_hasher, "_in_flight", password_hasher.capacity)
+
+    response = await client.post("/auth/reset-password", json={"token": "reset-token", "new_password": "newpass123"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.json()["message"] == "Server is busy, please try again shortly"
+    with Session(database) as db:
+        # Nothing was changed by the rejected request
+        assert db.scalars(select(User.hashed_password).where(User.username == "bob")).one() == "-"
@@ -0,0 +1,129 @@
+"""
+Per-request statement accounting: N+1 warnings, the slow-query log and redacted parameters
+"""
+import pytest
+from sqlalchemy import create_engine, text
+
+from app import query_stats
+from app.query_stats import begin_request, end_request, instrument_queries, redact_parameters
+
+SECRET = "hunter2-secret"
+
+class SpyLogger:
+    def __init__(self):
+        self.warnings = []
+
+    def warning(self, event, **fields):
+        self.warnings.append((event, fields))
+
+@pytest.fixture
+def logged(monkeypatch):
+    spy = SpyLogger()
+    monkeypatch.setattr(query_stats, "logger", spy)
+    return spy.warnings
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(query_stats, "DB_QUERY_STATS_ENABLED", True)
+    engine = create_engine("sqlite://")
+    instrument_queries(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE accounts (id INTEGER PRIMARY KEY, password TEXT)"))
+    yield engine
+    engine.dispose()
+
+def test_repeated_statement_is_reported_as_possible_n_plus_one(engine, logged, monkeypatch):
+    monkeypatch.setattr(query_stats, "DB_REPEATED_STATEMENT_THRESHOLD", 5)
+    token = begin_request("req-1")
+    with engine.connect() as conn:
+        for account_id in range(5):
+            conn.execute(text("SELECT password FROM accounts WHERE id = :id"), {"id": account_id})
+        conn.execute(text("SELECT count(*) FROM accounts"))
+
+    stats = end_request(token, "GET", "/accounts")
+
+    assert stats.statements == 6 and stats.db_seconds > 0
+    [(event, fields)] = logged
+    assert event == "Repeated SQL statement in one request (possible N+1)"
+    assert fields == {
+        "request_id": "req-1", "method": "GET", "path": "/accounts", "executions": 5,
+        "statement": "SELECT password FROM accounts WHERE id = ?"
+    }
+
+def test_statements_below_the_threshold_are_not_reported(engine, logged, monkeypatch):
+    monkeypatch.setattr(query_stats, "DB_REPEATED_STATEMENT_THRESHOLD", 5)
+    token = begin_request("req-1")
+    with engine.connect() as conn:
+        for account_id in range(4):
+            conn.execute(text("SELECT password FROM accounts WHERE id = :id"), {"id": account_id})
+
+    assert end_request(token, "GET", "/accounts").statements == 4
+    assert logged == []
+
+def test_statements_outside_a_request_are_not_counted(engine, logged):
+    token = begin_request("req-1")
+    end_request(token, "GET", "/")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert query_stats._current.get() is None
+    assert logged == []
+
+def test_slow_statement_is_logged_without_its_values(engine, logged, monkeypatch):
+    monkeypatch.setattr(query_stats, "DB_SLOW_QUERY_SECONDS", 0)
+    token = begin_request("req-2")
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE accounts SET password = :password WHERE id = :id"), {"password": SECRET, "id": 7})
+    end_request(token, "PUT", "/accounts/7")
+
+    [(event, fields)] = logged
+    assert event == "Slow SQL statement"
+    assert fields["request_id"] == "req-2"
+    assert fields["statement"] == "UPDATE accounts SET password = ? WHERE id = ?"
+    assert fields["parameters"] == ["?", "?"]
+    assert SECRET not in repr(logged)
+
+def test_slow_executemany_logs_only_the_number_of_parameter_sets(engine, logged, monkeypatch):
+    monkeypatch.setattr(query_stats, "DB_SLOW_QUERY_SECONDS", 0)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO accounts (password) VALUES (:password)"), [{"password": SECRET}] * 3)
+
+    [(event, fields)] = logged
+    assert fields["request_id"] is None
+    assert fields["parameters"] == "<3 parameter sets>"
+    assert SECRET not in repr(logged)
+
+def test_logged_statements_are_truncated(engine, logged, monkeypatch):
+    monkeypatch.setattr(query_stats, "DB_SLOW_QUERY_SECONDS", 0)
+    monkeypatch.setattr(query_stats, "DB_LOG_STATEMENT_CHARS", 10)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT   id,\n   password FROM accounts"))
+
+    assert logged[0][1]["statement"] == "SELECT id,..."
+
+def test_disabled_stats_leave_the_engine_untouched(logged, monkeypatch):
+    monkeypatch.setattr(query_stats, "DB_QUERY_STATS_ENABLED", False)
+    monkeypatch.setattr(query_stats, "DB_SLOW_QUERY_SECONDS", 0)
+    engine = create_engine("sqlite://")
+    instrument_queries(engine)
+    token = begin_request("req-3")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert end_request(token, "GET", "/").statements == 0
+    assert logged == []
+    engine.dispose()
+
+@pytest.mark.parametrize("parameters, executemany, redacted", [
+    ({"username": SECRET, "id": 1}, False, {"username": "?", "id": "?"}),
+    ((SECRET, 1), False, ["?", "?"]),
+    ([SECRET, 1], False, ["?", "?"]),
+    ([{"password": SECRET}, {"password": SECRET}], True, "<2 parameter sets>"),
+    ([(SECRET,)], True, "<1 parameter sets>"),
+    (SECRET, False, "?"),
+    (None, False, "?"),
+])
+def test_redact_parameters_keeps_only_the_shape(parameters, executemany, redacted):
+    assert redact_parameters(parameters, executemany) == redacted
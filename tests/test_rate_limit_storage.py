@@ -0,0 +1,85 @@
+"""
+limits strategies running against the SQLite rate limit storage
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+from limits import parse
+from limits.strategies import FixedWindowRateLimiter, SlidingWindowCounterRateLimiter
+
+from app import rate_limit_storage
+from app.rate_limit_storage import SQLiteStorage
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Start on a window boundary so the expected counts are exact
+    fake = FakeClock(60 * 1000)
+    monkeypatch.setattr(rate_limit_storage, "time", fake)
+    return fake
+
+@pytest.fixture
+def storage(tmp_path, clock):
+    return SQLiteStorage(f"sqlite:///{tmp_path / 'limits.db'}")
+
+def _allowed(limiter, limit, key: str, attempts: int) -> int:
+    return sum(limiter.hit(limit, key) for _ in range(attempts))
+
+def test_fixed_window_limit(storage, clock):
+    limiter = FixedWindowRateLimiter(storage)
+    limit = parse("3/minute")
+
+    assert _allowed(limiter, limit, "10.0.0.1", 5) == 3
+    assert _allowed(limiter, limit, "10.0.0.2", 5) == 3
+
+    clock.now += 60
+    assert _allowed(limiter, limit, "10.0.0.1", 5) == 3
+
+def test_fixed_window_is_shared_between_storage_instances(storage, tmp_path):
+    # Each worker process opens its own storage on the same file
+    other = SQLiteStorage(f"sqlite:///{tmp_path / 'limits.db'}")
+    limit = parse("4/minute")
+
+    assert _allowed(FixedWindowRateLimiter(storage), limit, "10.0.0.1", 2) == 2
+    assert _allowed(FixedWindowRateLimiter(other), limit, "10.0.0.1", 5) == 2
+
+def test_sliding_window_weights_the_previous_window(storage, clock):
+    limiter = SlidingWindowCounterRateLimiter(storage)
+    limit = parse("10/minute")
+
+    assert _allowed(limiter, limit, "10.0.0.1", 12) == 10
+
+    # Halfway through the next window the previous one still counts for half: 10 * 0.5 = 5
+    clock.now += 90
+    assert _allowed(limiter, limit, "10.0.0.1", 10) == 5
+
+    # Once neither window holds hits the full limit is available again
+    clock.now += 120
+    assert _allowed(limiter, limit, "10.0.0.1", 12) == 10
+
+def test_sliding_window_reset_clears_the_key(storage):
+    limiter = SlidingWindowCounterRateLimiter(storage)
+    limit = parse("2/minute")
+
+    assert _allowed(limiter, limit, "10.0.0.1", 3) == 2
+    limiter.clear(limit, "10.0.0.1")
+    assert _allowed(limiter, limit, "10.0.0.1", 3) == 2
+
+def test_moving_window_with_sqlite_storage_is_rejected_at_startup(tmp_path):
+    env = dict(
+        os.environ,
+        RATE_LIMIT_STORAGE_URI=f"sqlite:///{tmp_path / 'limits.db'}",
+        RATE_LIMIT_STRATEGY="moving-window",
+    )
+    result = subprocess.run([sys.executable, "-c", "import app.security"], env=env, capture_output=True, text=True)
+
+    assert result.returncode != 0
+    assert "moving-window is not supported" in result.stderr
@@ -0,0 +1,155 @@
+"""
+RequestContextMiddleware: request IDs in responses and error bodies, and what the access log records
+"""
+import asyncio
+import uuid
+from typing import Optional
+
+import httpx
+import pytest
+
+from app import middleware
+from app.middleware import RequestContextMiddleware, RequestStats
+
+async def test_each_response_gets_its_own_request_id(client):
+    first = await client.get("/health")
+    second = await client.get("/health")
+
+    assert uuid.UUID(first.headers["X-Request-ID"])
+    assert first.headers["X-Request-ID"] != second.headers["X-Request-ID"]
+
+async def test_http_error_body_quotes_the_request_id(client):
+    response = await client.get("/users/me")
+
+    assert response.status_code == 403
+    assert response.json()["request_id"] == response.headers["X-Request-ID"]
+
+async def test_validation_error_body_quotes_the_request_id(client):
+    response = await client.post("/auth/forgot-password", json={})
+
+    assert response.status_code == 422
+    assert response.json()["request_id"] == response.headers["X-Request-ID"]
+
+@pytest.fixture
+async def failing_route(database):
+    from main import app
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    app.add_api_route("/__fail", fail)
+    route = app.router.routes[-1]
+    # The server error handler re-raises after responding; only the response matters here
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as test_client:
+        yield test_client
+    app.router.routes.remove(route)
+
+async def test_unhandled_error_response_carries_the_request_id(failing_route):
+    response = await failing_route.get("/__fail")
+
+    assert response.status_code == 500
+    assert response.json()["request_id"] == response.headers["X-Request-ID"]
+
+async def test_request_id_set_by_the_app_is_replaced():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"x-request-id", b"from-the-app"), (b"content-type", b"text/plain")
+        ]})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [], "client": ("127.0.0.1", 1)}
+    await RequestContextMiddleware(app)(scope, None, send)
+
+    headers = messages[0]["headers"]
+    assert [value for name, value in headers if name == b"x-request-id"] == [scope["state"]["request_id"].encode()]
+    assert (b"content-type", b"text/plain") in headers
+    assert (b"x-frame-options", b"DENY") in headers
+
+class SpyLogger:
+    def __init__(self):
+        self.lines = []
+
+    def _log(self, level):
+        return lambda event, **fields: self.lines.append((level, event, fields))
+
+    def __getattr__(self, level):
+        return self._log(level)
+
+def endpoint(status: int = 200, delay: float = 0.0, error: Optional[Exception] = None):
+    async def app(scope, receive, send):
+        if delay:
+            await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+    return app
+
+@pytest.fixture
+def sampled(monkeypatch):
+    """Runs one request through a fresh middleware and returns (level, event, status_code) per log line"""
+    stats = RequestStats()
+    monkeypatch.setattr(middleware, "request_stats", stats)
+    monkeypatch.setattr(middleware, "REQUEST_LOG_SAMPLE_RATE", 0.1)
+    monkeypatch.setattr(middleware, "REQUEST_LOG_SLOW_SECONDS", 0.05)
+
+    async def run(app, log_mode: str = "sampled", draw: float = 0.5):
+        monkeypatch.setattr(middleware.random, "random", lambda: draw)
+        wrapped = RequestContextMiddleware(app, log_mode=log_mode)
+        wrapped.logger = SpyLogger()
+
+        async def send(message):
+            pass
+
+        scope = {"type": "http", "method": "GET", "path": "/employees/", "headers": [], "client": ("127.0.0.1", 1)}
+        try:
+            await wrapped(scope, None, send)
+        except RuntimeError:
+            pass
+        return [(level, event, fields.get("status_code")) for level, event, fields in wrapped.logger.lines]
+
+    run.stats = stats
+    return run
+
+async def test_fast_successes_outside_the_sample_are_not_logged(sampled):
+    assert await sampled(endpoint(200), draw=0.5) == []
+    assert await sampled(endpoint(204), draw=0.1) == []
+
+async def test_fast_successes_inside_the_sample_are_logged(sampled):
+    assert await sampled(endpoint(200), draw=0.09) == [("info", "Request completed", 200)]
+
+@pytest.mark.parametrize("status, level", [(500, "error"), (503, "error"), (404, "warning"), (429, "warning")])
+async def test_errors_are_always_logged(sampled, status, level):
+    assert await sampled(endpoint(status), draw=0.99) == [(level, "Request completed", status)]
+
+async def test_unhandled_exception_is_always_logged_as_500(sampled):
+    lines = await sampled(endpoint(error=RuntimeError("boom")), draw=0.99)
+
+    assert lines == [("error", "Request failed with exception", None), ("error", "Request completed", 500)]
+
+async def test_slow_success_is_always_logged(sampled):
+    assert await sampled(endpoint(200, delay=0.06), draw=0.99) == [("warning", "Request completed", 200)]
+
+async def test_full_mode_logs_every_request(sampled):
+    lines = await sampled(endpoint(200), log_mode="full", draw=0.99)
+
+    assert lines == [("info", "Request started", None), ("info", "Request completed", 200)]
+    # Aggregates are only kept in sampled mode
+    assert sampled.stats.report() == []
+
+async def test_every_sampled_request_is_counted_in_the_route_aggregates(sampled):
+    for status in (200, 200, 200, 500):
+        await sampled(endpoint(status), draw=0.99)
+
+    [line] = sampled.stats.report()
+
+    assert (line["method"], line["route"], line["count"], line["errors"]) == ("GET", "<unmatched>", 4, 1)
+    assert 0 <= line["p50_seconds"] <= line["p99_seconds"] <= line["max_seconds"]
+    # Reported intervals start over
+    assert sampled.stats.report() == []
@@ -0,0 +1,106 @@
+"""
+SecurityHeadersMiddleware at the ASGI level: appended blocks, kept app headers and per-route CSP
+"""
+import pytest
+
+from app.security import DOCS_CSP_POLICY, SECURITY_HEADERS, SecurityHeadersMiddleware
+
+def endpoint(headers):
+    async def app(scope, receive, send):
+        start = {"type": "http.response.start", "status": 200}
+        if headers is not None:
+            start["headers"] = headers
+        await send(start)
+        await send({"type": "http.response.body", "body": b"ok"})
+    return app
+
+async def call(middleware, path: str = "/api"):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware({"type": "http", "method": "GET", "path": path, "headers": []}, receive, send)
+    return messages[0]["headers"]
+
+def values(headers, name: bytes):
+    return [value for key, value in headers if key == name]
+
+async def test_duplicate_set_cookie_headers_survive():
+    app_headers = [(b"set-cookie", b"a=1"), (b"content-type", b"text/plain"), (b"set-cookie", b"b=2")]
+
+    headers = await call(SecurityHeadersMiddleware(endpoint(app_headers)))
+
+    assert values(headers, b"set-cookie") == [b"a=1", b"b=2"]
+
+async def test_app_headers_are_kept_in_order_before_the_block():
+    app_headers = [(b"content-type", b"application/json"), (b"x-next-cursor", b"abc"), (b"cache-control", b"no-store")]
+
+    headers = await call(SecurityHeadersMiddleware(endpoint(list(app_headers))))
+
+    assert headers[:3] == app_headers
+    assert dict(headers[3:]) == {name.encode(): value.encode() for name, value in SECURITY_HEADERS.items()}
+
+async def test_block_header_set_by_the_app_is_replaced_not_duplicated():
+    app_headers = [(b"x-frame-options", b"SAMEORIGIN"), (b"content-type", b"text/plain")]
+
+    headers = await call(SecurityHeadersMiddleware(endpoint(app_headers)))
+
+    assert values(headers, b"x-frame-options") == [SECURITY_HEADERS["x-frame-options"].encode()]
+    assert values(headers, b"content-type") == [b"text/plain"]
+
+async def test_response_without_headers_gets_the_block():
+    headers = await call(SecurityHeadersMiddleware(endpoint(None)))
+
+    assert len(headers) == len(SECURITY_HEADERS)
+
+async def test_app_headers_given_as_a_tuple_are_accepted():
+    headers = await call(SecurityHeadersMiddleware(endpoint(((b"content-type", b"text/plain"),))))
+
+    assert headers[0] == (b"content-type", b"text/plain")
+    assert len(headers) == len(SECURITY_HEADERS) + 1
+
+@pytest.mark.parametrize("path, policy", [
+    ("/docs", DOCS_CSP_POLICY),
+    ("/docs/oauth2-redirect", DOCS_CSP_POLICY),
+    ("/redoc", DOCS_CSP_POLICY),
+    ("/openapi.json", SECURITY_HEADERS["content-security-policy"]),
+    ("/employees/", SECURITY_HEADERS["content-security-policy"]),
+])
+async def test_docs_routes_get_the_relaxed_csp(path, policy):
+    headers = await call(SecurityHeadersMiddleware(endpoint([])), path)
+
+    assert values(headers, b"content-security-policy") == [policy.encode()]
+    assert values(headers, b"x-frame-options") == [SECURITY_HEADERS["x-frame-options"].encode()]
+
+async def test_longest_route_prefix_wins():
+    middleware = SecurityHeadersMiddleware(
+        endpoint([]),
+        headers={"content-security-policy": "strict"},
+        route_headers={"/docs": {"content-security-policy": "docs"}, "/docs/oauth2-redirect": {"content-security-policy": "oauth"}}
+    )
+
+    assert values(await call(middleware, "/docs/oauth2-redirect"), b"content-security-policy") == [b"oauth"]
+    assert values(await call(middleware, "/docs"), b"content-security-policy") == [b"docs"]
+    assert values(await call(middleware, "/other"), b"content-security-policy") == [b"strict"]
+
+async def test_non_http_scopes_pass_through():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(scope["type"])
+
+    await SecurityHeadersMiddleware(app)({"type": "lifespan"}, None, None)
+
+    assert seen == ["lifespan"]
+
+async def test_served_docs_page_allows_the_swagger_bundle(client):
+    docs = await client.get("/docs")
+    health = await client.get("/health")
+
+    assert docs.headers["content-security-policy"] == DOCS_CSP_POLICY
+    assert "cdn.jsdelivr.net" in docs.headers["content-security-policy"]
+    assert health.headers["content-security-policy"] == SECURITY_HEADERS["content-security-policy"]
@@ -0,0 +1,98 @@
+"""
+SME filter/sort indexes: the alembic migration and the query plans of the list endpoints
+"""
+import importlib.util
+import os
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, inspect, text
+
+from app.database import async_engine, engine
+from models.sme_models import Base as SmeBase
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _load_index_migration():
+    path = os.path.join(ROOT, "alembic", "versions", "8d41e6b0c7a3_add_sme_filter_and_sort_indexes.py")
+    spec = importlib.util.spec_from_file_location("sme_index_migration", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+SME_INDEXES = _load_index_migration().SME_INDEXES
+
+def _alembic_config(url: str) -> Config:
+    config = Config()
+    config.set_main_option("script_location", os.path.join(ROOT, "alembic"))
+    config.set_main_option("sqlalchemy.url", url)
+    return config
+
+def test_upgrade_head_on_fresh_database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'fresh.db'}"
+    command.upgrade(_alembic_config(url), "head")
+
+    tables = inspect(create_engine(url)).get_table_names()
+    assert {"users", "password_reset_tokens", "email_outbox"} <= set(tables)
+
+def test_upgrade_creates_missing_sme_indexes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'sme.db'}"
+    sme_engine = create_engine(url)
+    tables = {table for _, table, _ in SME_INDEXES}
+    SmeBase.metadata.create_all(sme_engine, tables=[SmeBase.metadata.tables[name] for name in tables])
+    with sme_engine.begin() as conn:
+        for name, _, _ in SME_INDEXES:
+            conn.execute(text(f"DROP INDEX {name}"))
+
+    command.upgrade(_alembic_config(url), "head")
+
+    inspector = inspect(sme_engine)
+    for name, table, columns in SME_INDEXES:
+        indexes = {index["name"]: index["column_names"] for index in inspector.get_indexes(table)}
+        assert indexes.get(name) == columns
+
+# (list URL, index expected to serve both its filter and its ORDER BY)
+LIST_QUERIES = [
+    ("/departments/", "ix_departments_name"),
+    ("/employees/?department_id=D1", "ix_employees_department_code"),
+    ("/employees/?is_active=true", "ix_employees_active_code"),
+    ("/customers/?is_active=true", "ix_customers_active_code"),
+    ("/projects/?status=ACTIVE", "ix_projects_status_code"),
+    ("/projects/?customer_id=C1", "ix_projects_customer_code"),
+    ("/materials/?category=CONSUMABLE", "ix_materials_category_code"),
+    ("/time-entries/", "ix_time_entries_date"),
+    ("/time-entries/?employee_id=E1", "ix_time_entries_employee_date"),
+    ("/time-entries/?project_id=P1", "ix_time_entries_project_date"),
+    ("/leave-requests/", "ix_leave_requests_start"),
+    ("/leave-requests/?employee_id=E1", "ix_leave_requests_employee_start"),
+    ("/leave-requests/?status=PENDING", "ix_leave_requests_status_start"),
+    ("/leave-requests/?leave_type=SICK", "ix_leave_requests_type_start"),
+    ("/tools/?category=drill", "ix_tools_category_code"),
+    ("/tools/?is_available=true", "ix_tools_available_code"),
+    ("/tools/?condition=good", "ix_tools_condition_code"),
+]
+
+@pytest.fixture
+def captured_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+@pytest.mark.parametrize("url, index_name", LIST_QUERIES)
+async def test_list_query_uses_index(client, auth_headers, captured_statements, url, index_name):
+    response = await client.get(url, headers=auth_headers())
+    assert response.status_code == 200, response.text
+
+    # The page query is the one with the LIMIT
+    statement, parameters = next((s, p) for s, p in captured_statements if " LIMIT " in s)
+    with engine.connect() as conn:
+        plan = "\n".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)))
+
+    assert index_name in plan, plan
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
@@ -0,0 +1,58 @@
+"""
+SME response models accept every value their columns can hold, NULLs included
+"""
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import Boolean, Date, DateTime, Enum, Integer, Numeric, insert
+
+from models.sme_models import Customer, Department, Employee, LeaveRequest, Material, Project, TimeEntry, Tool
+
+TABLES = [Department, Employee, Customer, Project, Material, TimeEntry, LeaveRequest, Tool]
+
+def _sparse_row(model) -> dict:
+    """NULL in every nullable column, a placeholder in the others"""
+    values = {}
+    for column in model.__table__.columns:
+        if column.nullable:
+            values[column.name] = None
+        elif isinstance(column.type, Enum):
+            values[column.name] = next(iter(column.type.enum_class))
+        elif isinstance(column.type, DateTime):
+            values[column.name] = datetime(2024, 1, 1)
+        elif isinstance(column.type, Date):
+            values[column.name] = date(2024, 1, 1)
+        elif isinstance(column.type, (Integer, Numeric)):
+            values[column.name] = 1
+        elif isinstance(column.type, Boolean):
+            values[column.name] = False
+        else:
+            values[column.name] = "X1"
+    return values
+
+@pytest.fixture
+def sparse_rows(database):
+    with database.begin() as conn:
+        for model in TABLES:
+            conn.execute(insert(model.__table__).values(_sparse_row(model)))
+    return database
+
+@pytest.mark.parametrize("url", [
+    "/employees/", "/employees/X1", "/departments/", "/projects/", "/projects/X1", "/customers/",
+    "/materials/", "/time-entries/", "/leave-requests/", "/tools/",
+])
+async def test_null_columns_serialize_as_null(client, auth_headers, sparse_rows, url):
+    response = await client.get(url, headers=auth_headers())
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    item = body[0] if isinstance(body, list) else body
+    assert any(value is None for value in item.values())
+
+@pytest.mark.parametrize("url", ["/time-entries/", "/leave-requests/"])
+async def test_rows_without_an_employee_are_listed(client, auth_headers, sparse_rows, url):
+    response = await client.get(url, headers=auth_headers())
+
+    assert response.status_code == 200, response.text
+    [item] = response.json()
+    assert item["employee_id"] is None
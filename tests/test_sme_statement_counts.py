@@ -0,0 +1,101 @@
+"""
+SME list and detail endpoints run a fixed number of SQL statements, however many rows they return
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app import middleware
+from models.sme_models import (
+    Customer, Department, Employee, LeaveRequest, LeaveType, Material, MaterialCategory,
+    Project, TimeEntry, Tool
+)
+
+SMALL, LARGE = 2, 150
+
+ENDPOINTS = [
+    "/employees/",
+    "/employees/?department_id=D0000&is_active=true",
+    "/employees/E0000",
+    "/departments/",
+    "/projects/",
+    "/projects/?customer_id=C0000",
+    "/projects/P0000",
+    "/customers/",
+    "/materials/",
+    "/materials/?low_stock=true",
+    "/time-entries/",
+    "/time-entries/?employee_id=E0000",
+    "/leave-requests/",
+    "/tools/",
+]
+
+def _seed(engine, first: int, stop: int):
+    start = date(2024, 1, 1)
+    with Session(engine) as db:
+        for i in range(first, stop):
+            # Everything hangs off the first department / employee / customer so filtered pages grow too
+            db.add_all([
+                Department(department_id=f"D{i:04}", department_name=f"Department {i:04}", is_active=True),
+                Employee(
+                    employee_id=f"E{i:04}", employee_code=f"EMP{i:04}", first_name="First", last_name=f"Last {i}",
+                    email=f"e{i}@example.com", department_id="D0000", hire_date=start,
+                    base_salary=Decimal("30000"), is_active=True
+                ),
+                Customer(customer_id=f"C{i:04}", customer_code=f"CUS{i:04}", customer_name=f"Customer {i}", is_active=True),
+                Project(
+                    project_id=f"P{i:04}", project_code=f"PRJ{i:04}", project_name=f"Project {i}",
+                    customer_id="C0000", start_date=start, contract_value=Decimal("1000")
+                ),
+                Material(
+                    material_id=f"M{i:04}", material_code=f"MAT{i:04}", material_name=f"Material {i}",
+                    category=MaterialCategory.CONSUMABLE, unit="pcs", current_stock=Decimal(0), minimum_stock=Decimal(5)
+                ),
+                TimeEntry(entry_id=f"T{i:04}", employee_id="E0000", project_id="P0000", entry_date=start + timedelta(days=i)),
+                LeaveRequest(
+                    request_id=f"L{i:04}", employee_id="E0000", leave_type=LeaveType.ANNUAL,
+                    start_date=start + timedelta(days=i), end_date=start + timedelta(days=i), total_days=1
+                ),
+                Tool(tool_id=f"X{i:04}", tool_code=f"TL{i:04}", tool_name=f"Tool {i}"),
+            ])
+        db.commit()
+
+@pytest.fixture
+def request_stats(monkeypatch):
+    """Statement stats of every request, as the request middleware sees them"""
+    collected = []
+    end_request = middleware.end_request
+
+    def spy(token, method, path):
+        stats = end_request(token, method, path)
+        collected.append(stats)
+        return stats
+
+    monkeypatch.setattr(middleware, "end_request", spy)
+    return collected
+
+async def _fetch(client, headers, url: str, request_stats):
+    """Response body and the number of statements the request ran"""
+    request_stats.clear()
+    response = await client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    [stats] = request_stats
+    return response.json(), stats.statements
+
+@pytest.mark.parametrize("url", ENDPOINTS)
+async def test_statement_count_does_not_grow_with_rows(client, database, auth_headers, request_stats, url):
+    headers = auth_headers()
+    # The first request also loads the caller into the user cache
+    await client.get("/employees/?limit=1", headers=headers)
+
+    _seed(database, 0, SMALL)
+    small_body, small = await _fetch(client, headers, url, request_stats)
+
+    _seed(database, SMALL, LARGE)
+    large_body, large = await _fetch(client, headers, url, request_stats)
+
+    if isinstance(small_body, list):
+        assert len(small_body) < len(large_body)
+    assert small == large == 1
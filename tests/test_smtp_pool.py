@@ -0,0 +1,205 @@
+"""
+Pooled SMTP sessions against a fake smtplib.SMTP: reuse, stale-session checks and the one reconnect
+"""
+import smtplib
+
+import pytest
+
+from app import smtp_pool
+from app.email_service import EmailService
+from app.smtp_pool import SMTPConnectionPool
+
+class FakeSMTP:
+    """Records what a session was asked to do; failures are switched on per test"""
+
+    instances = []
+    noop_code = 250
+    # Session number -> number of messages it accepts before the relay drops it
+    drop_after = {}
+    refused = set()
+
+    def __init__(self, host, port, timeout=None):
+        self.number = len(FakeSMTP.instances)
+        FakeSMTP.instances.append(self)
+        self.sent = []
+        self.noops = 0
+        self.logged_in = False
+        self.closed = False
+
+    def starttls(self):
+        pass
+
+    def login(self, username, password):
+        self.logged_in = True
+
+    def noop(self):
+        self.noops += 1
+        if self.closed:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        return FakeSMTP.noop_code, b"OK"
+
+    def send_message(self, message):
+        if len(self.sent) == FakeSMTP.drop_after.get(self.number):
+            self.closed = True
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        if message["To"] in FakeSMTP.refused:
+            raise smtplib.SMTPRecipientsRefused({message["To"]: (550, b"No such user")})
+        self.sent.append(message["To"])
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture(autouse=True)
+def fake_smtp(monkeypatch):
+    monkeypatch.setattr(FakeSMTP, "instances", [])
+    monkeypatch.setattr(FakeSMTP, "drop_after", {})
+    monkeypatch.setattr(FakeSMTP, "refused", set())
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+    return FakeSMTP
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(smtp_pool, "time", fake)
+    return fake
+
+@pytest.fixture
+def pool(clock):
+    return SMTPConnectionPool("smtp.example.com", 587, "mailer", "secret", size=2)
+
+@pytest.fixture
+def service(monkeypatch, clock):
+    monkeypatch.setenv("SMTP_USERNAME", "mailer")
+    monkeypatch.setenv("SMTP_PASSWORD", "secret")
+    return EmailService()
+
+def _checkout(pool) -> FakeSMTP:
+    with pool.connection() as server:
+        return server
+
+def test_session_is_logged_in_and_reused(pool):
+    first = _checkout(pool)
+    second = _checkout(pool)
+
+    assert first is second
+    assert first.logged_in and not first.closed
+    assert pool.stats() == {"size": 2, "idle": 1, "connects": 1, "reuses": 1, "noop_failures": 0, "discarded": 0}
+
+def test_recently_used_session_is_reused_without_a_noop(pool, clock):
+    server = _checkout(pool)
+    clock.now += smtp_pool.SMTP_POOL_NOOP_AFTER_SECONDS
+
+    assert _checkout(pool) is server
+    assert server.noops == 0
+
+def test_quiet_session_is_checked_with_noop(pool, clock):
+    server = _checkout(pool)
+    clock.now += smtp_pool.SMTP_POOL_NOOP_AFTER_SECONDS + 1
+
+    assert _checkout(pool) is server
+    assert server.noops == 1
+
+def test_session_failing_noop_is_replaced(pool, clock, fake_smtp, monkeypatch):
+    stale = _checkout(pool)
+    clock.now += smtp_pool.SMTP_POOL_NOOP_AFTER_SECONDS + 1
+    monkeypatch.setattr(FakeSMTP, "noop_code", 421)
+
+    fresh = _checkout(pool)
+
+    assert fresh is not stale and stale.closed
+    assert pool.stats()["noop_failures"] == 1 and pool.stats()["connects"] == 2
+
+def test_session_dropped_by_the_relay_is_replaced(pool, clock):
+    stale = _checkout(pool)
+    stale.closed = True
+    clock.now += smtp_pool.SMTP_POOL_NOOP_AFTER_SECONDS + 1
+
+    assert _checkout(pool) is not stale
+    assert pool.stats()["noop_failures"] == 1
+
+def test_session_idle_past_the_timeout_is_closed_without_a_noop(pool, clock):
+    old = _checkout(pool)
+    clock.now += smtp_pool.SMTP_POOL_IDLE_TIMEOUT + 1
+
+    assert _checkout(pool) is not old
+    assert old.closed and old.noops == 0
+    assert pool.stats()["noop_failures"] == 0
+
+def test_connection_error_discards_the_session(pool):
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        with pool.connection() as server:
+            raise smtplib.SMTPServerDisconnected("gone")
+
+    assert server.closed
+    assert pool.stats()["idle"] == 0 and pool.stats()["discarded"] == 1
+
+def test_relay_reply_keeps_the_session(pool):
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        with pool.connection() as server:
+            raise smtplib.SMTPRecipientsRefused({})
+
+    assert not server.closed
+    assert _checkout(pool) is server
+    assert pool.stats()["discarded"] == 0
+
+def test_concurrent_checkouts_get_separate_sessions(pool):
+    with pool.connection() as first, pool.connection() as second:
+        assert first is not second
+    assert pool.stats()["idle"] == 2
+
+    pool.close()
+    assert first.closed and second.closed and pool.stats()["idle"] == 0
+
+def _emails(count: int):
+    return [(f"user{i}@example.com", "Subject", "Body", None) for i in range(count)]
+
+def test_deliver_many_sends_a_batch_over_one_session(service, fake_smtp):
+    assert service.deliver_many(_emails(5)) == [None] * 5
+    assert service.deliver_many(_emails(2)) == [None] * 2
+
+    [session] = fake_smtp.instances
+    assert len(session.sent) == 7
+
+def test_refused_recipient_does_not_end_the_batch(service, fake_smtp):
+    fake_smtp.refused.add("user1@example.com")
+
+    errors = service.deliver_many(_emails(3))
+
+    assert errors[0] is None and errors[2] is None
+    assert isinstance(errors[1], smtplib.SMTPRecipientsRefused)
+    assert len(fake_smtp.instances) == 1
+
+def test_dropped_session_is_replaced_once_and_the_message_retried(service, fake_smtp):
+    fake_smtp.drop_after[0] = 2
+
+    assert service.deliver_many(_emails(5)) == [None] * 5
+
+    first, second = fake_smtp.instances
+    assert first.sent == ["user0@example.com", "user1@example.com"]
+    assert second.sent == ["user2@example.com", "user3@example.com", "user4@example.com"]
+    assert service.pool.stats()["discarded"] == 1
+
+def test_second_drop_fails_the_rest_of_the_batch(service, fake_smtp):
+    fake_smtp.drop_after.update({0: 1, 1: 1})
+
+    errors = service.deliver_many(_emails(4))
+
+    assert errors[:2] == [None, None]
+    assert all(isinstance(error, smtplib.SMTPServerDisconnected) for error in errors[2:])
+    assert len(fake_smtp.instances) == 2
+
+def test_deliver_raises_the_send_error(service, fake_smtp):
+    fake_smtp.refused.add("user0@example.com")
+
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        service.deliver(*_emails(1)[0])
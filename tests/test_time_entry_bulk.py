@@ -0,0 +1,169 @@
+"""
+POST /time-entries/bulk: admins only, per-row error reporting, chunked writes in one transaction
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app import time_entry_bulk
+from app.database import async_engine
+from models.sme_models import Employee, TimeEntry
+
+@pytest.fixture
+def employees(database):
+    with Session(database) as db:
+        for employee_id in ("E001", "E002"):
+            db.add(Employee(
+                employee_id=employee_id, employee_code=f"C{employee_id}", first_name="First", last_name="Last",
+                email=f"{employee_id}@example.com", hire_date=date(2024, 1, 1), base_salary=Decimal("30000")
+            ))
+        db.add(TimeEntry(entry_id="T0", employee_id="E001", entry_date=date(2024, 1, 2)))
+        db.commit()
+    return database
+
+def _payload(employee_id: str = "E002"):
+    return {"entries": [{"entry_id": "T0", "employee_id": employee_id, "entry_date": "2024-01-02", "normal_hours": "8"}]}
+
+def _entry_owner(engine) -> str:
+    with Session(engine) as db:
+        return db.get(TimeEntry, "T0").employee_id
+
+async def test_plain_user_cannot_write_time_entries(client, auth_headers, employees):
+    response = await client.post("/time-entries/bulk", json=_payload(), headers=auth_headers("clerk", role="user"))
+
+    assert response.status_code == 403
+    assert _entry_owner(employees) == "E001"
+
+@pytest.mark.parametrize("role", ["admin", "admin1", "superadmin"])
+async def test_admins_can_write_time_entries(client, auth_headers, employees, role):
+    response = await client.post("/time-entries/bulk", json=_payload(), headers=auth_headers(f"{role}-user", role=role))
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {"created": 0, "updated": 1, "failed": 0, "errors": []}
+    assert _entry_owner(employees) == "E002"
+
+def _row(entry_id: str, employee_id: str = "E001", **fields):
+    return {"entry_id": entry_id, "employee_id": employee_id, "entry_date": "2024-01-03", "normal_hours": "8", **fields}
+
+async def _bulk(client, headers, entries, **options):
+    return await client.post("/time-entries/bulk", json={"entries": entries, **options}, headers=headers)
+
+def _entry_ids(engine):
+    with Session(engine) as db:
+        return sorted(db.scalars(select(TimeEntry.entry_id)))
+
+async def test_rejected_rows_are_reported_by_index(client, auth_headers, employees):
+    entries = [
+        _row("T1"),
+        _row("T2", employee_id="E999"),
+        _row("T3", project_id="P999"),
+        {"entry_id": "T4", "employee_id": "E001"},
+        _row("T5", start_time="17:00", end_time="09:00"),
+        "not an object",
+        _row("T7", normal_hours="20", ot_hour_1="5"),
+        _row("T8", employee_id="E002"),
+    ]
+
+    response = await _bulk(client, auth_headers("admin", role="admin"), entries)
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["created"], body["updated"], body["failed"]) == (2, 0, 6)
+    errors = {error["index"]: error for error in body["errors"]}
+    assert sorted(errors) == [1, 2, 3, 4, 5, 6]
+    assert errors[1]["errors"] == ["employee_id: employee not found"]
+    assert errors[2]["errors"] == ["project_id: project not found"]
+    assert errors[3]["entry_id"] == "T4" and errors[3]["errors"] == ["entry_date: Field required"]
+    assert "end_time must be after start_time" in errors[4]["errors"][0]
+    assert errors[5]["entry_id"] is None
+    assert "more than 24" in errors[6]["errors"][0]
+    assert _entry_ids(employees) == ["T0", "T1", "T8"]
+
+async def test_duplicate_entry_id_in_a_batch_keeps_the_first_row(client, auth_headers, employees):
+    entries = [_row("T1"), _row("T2"), _row("T1", employee_id="E002")]
+
+    body = (await _bulk(client, auth_headers("admin", role="admin"), entries)).json()
+
+    assert (body["created"], body["failed"]) == (2, 1)
+    assert body["errors"] == [{"index": 2, "entry_id": "T1", "errors": ["entry_id: duplicates row 0"]}]
+    with Session(employees) as db:
+        assert db.get(TimeEntry, "T1").employee_id == "E001"
+
+async def test_approved_entries_cannot_be_replaced(client, auth_headers, employees):
+    with Session(employees) as db:
+        db.get(TimeEntry, "T0").is_approved = True
+        db.commit()
+
+    body = (await _bulk(client, auth_headers("admin", role="admin"), [_row("T0", employee_id="E002")])).json()
+
+    assert (body["updated"], body["failed"]) == (0, 1)
+    assert body["errors"][0]["errors"] == ["entry_id: entry is approved and can no longer be changed"]
+    assert _entry_owner(employees) == "E001"
+
+async def test_all_or_nothing_writes_nothing_when_a_row_fails(client, auth_headers, employees):
+    entries = [_row("T1"), _row("T0", employee_id="E002"), _row("T2", employee_id="E999")]
+
+    body = (await _bulk(client, auth_headers("admin", role="admin"), entries, all_or_nothing=True)).json()
+
+    assert body == {
+        "created": 0, "updated": 0, "failed": 1,
+        "errors": [{"index": 2, "entry_id": "T2", "errors": ["employee_id: employee not found"]}]
+    }
+    assert _entry_ids(employees) == ["T0"]
+    assert _entry_owner(employees) == "E001"
+
+@pytest.fixture
+def statements():
+    """(verb, parameter sets) of every statement the async engine sends"""
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append((statement.split()[0], len(parameters) if executemany else 1))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+async def test_writes_and_lookups_are_chunked(client, auth_headers, employees, statements, monkeypatch):
+    headers = auth_headers("admin", role="admin")
+    await client.get("/employees/?limit=1", headers=headers)
+    monkeypatch.setattr(time_entry_bulk, "TIME_ENTRY_BULK_CHUNK_SIZE", 2)
+    entries = [_row(f"T{i}") for i in range(5)]
+    statements.clear()
+
+    body = (await _bulk(client, headers, entries)).json()
+
+    assert (body["created"], body["updated"], body["failed"]) == (4, 1, 0)
+    # Employee ids fit one lookup, the five entry ids need three
+    assert [count for verb, count in statements if verb == "SELECT"] == [1, 1, 1, 1]
+    assert [count for verb, count in statements if verb == "INSERT"] == [2, 2]
+    assert [count for verb, count in statements if verb == "UPDATE"] == [1]
+    assert _entry_ids(employees) == ["T0", "T1", "T2", "T3", "T4"]
+
+async def test_oversized_batch_is_rejected_with_413(client, auth_headers, employees, monkeypatch):
+    monkeypatch.setattr(time_entry_bulk, "TIME_ENTRY_BULK_MAX_ENTRIES", 3)
+
+    response = await _bulk(client, auth_headers("admin", role="admin"), [_row(f"T{i}") for i in range(1, 5)])
+
+    assert response.status_code == 413
+    assert response.json()["message"] == "At most 3 time entries per request"
+    assert _entry_ids(employees) == ["T0"]
+
+async def test_concurrent_insert_of_the_same_entry_returns_409(client, auth_headers, employees, monkeypatch):
+    existing = time_entry_bulk._existing
+
+    async def stale_lookup(db, key_column, ids, *columns):
+        # As if T0 was inserted by another request after this batch looked it up
+        found = await existing(db, key_column, ids, *columns)
+        return {} if key_column is TimeEntry.entry_id else found
+
+    monkeypatch.setattr(time_entry_bulk, "_existing", stale_lookup)
+
+    response = await _bulk(client, auth_headers("admin", role="admin"), [_row("T1"), _row("T0", employee_id="E002")])
+
+    assert response.status_code == 409
+    assert response.json()["message"] == "Time entries were changed concurrently; retry the batch"
+    assert _entry_ids(employees) == ["T0"]
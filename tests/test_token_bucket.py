@@ -0,0 +1,123 @@
+"""
+In-process token buckets and the password reset limits built on them
+"""
+import pytest
+
+from app import security
+from app.security import TokenBucketLimiter
+from routers import auth as auth_router
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(security, "time", fake)
+    # The test environment disables rate limiting; these tests are about the limiter itself
+    monkeypatch.setattr(security, "RATE_LIMIT_ENABLED", True)
+    return fake
+
+def test_burst_up_to_capacity_then_reject(clock):
+    limiter = TokenBucketLimiter("test", capacity=3, refill_per_second=0.1)
+
+    assert [limiter.hit("a") for _ in range(4)] == [True, True, True, False]
+    assert limiter.hit("b")
+
+def test_tokens_refill_at_the_configured_rate(clock):
+    limiter = TokenBucketLimiter("test", capacity=3, refill_per_second=0.5)
+    for _ in range(3):
+        limiter.hit("a")
+
+    clock.now += 1.9
+    assert not limiter.hit("a")
+    clock.now += 0.1
+    assert limiter.hit("a")
+    assert not limiter.hit("a")
+
+def test_idle_bucket_refills_only_to_capacity(clock):
+    limiter = TokenBucketLimiter("test", capacity=2, refill_per_second=1)
+    limiter.hit("a")
+
+    clock.now += 3600
+    assert [limiter.hit("a") for _ in range(3)] == [True, True, False]
+
+def test_rejected_hit_takes_nothing(clock):
+    limiter = TokenBucketLimiter("test", capacity=2, refill_per_second=1)
+    limiter.hit("a", cost=1.5)
+
+    assert not limiter.hit("a", cost=1)
+    clock.now += 0.5
+    assert limiter.hit("a", cost=1)
+
+def test_retry_after_is_the_time_to_refill_the_cost(clock):
+    limiter = TokenBucketLimiter("test", capacity=2, refill_per_second=0.25)
+    assert limiter.retry_after("a") == 0
+
+    limiter.hit("a")
+    limiter.hit("a")
+    assert limiter.retry_after("a") == pytest.approx(4)
+    assert limiter.retry_after("a", cost=2) == pytest.approx(8)
+
+    clock.now += 3
+    assert limiter.retry_after("a") == pytest.approx(1)
+
+def test_refund_returns_tokens_up_to_capacity(clock):
+    limiter = TokenBucketLimiter("test", capacity=2, refill_per_second=0.01)
+    limiter.hit("a")
+    limiter.hit("a")
+
+    limiter.refund("a")
+    assert limiter.hit("a")
+    limiter.refund("a", cost=5)
+    assert [limiter.hit("a") for _ in range(3)] == [True, True, False]
+
+def test_least_recently_used_key_is_evicted(clock):
+    limiter = TokenBucketLimiter("test", capacity=1, refill_per_second=0.01, max_keys=2)
+    limiter.hit("a")
+    limiter.hit("b")
+    limiter.hit("a")
+
+    limiter.hit("c")
+
+    assert len(limiter) == 2
+    # a was used more recently than b, so it is still tracked (and empty) ...
+    assert not limiter.hit("a")
+    # ... while b was evicted and starts again from a full bucket
+    assert limiter.hit("b")
+
+@pytest.fixture
+def reset_limits(clock, monkeypatch):
+    ip_limiter = TokenBucketLimiter("password_reset_ip", capacity=3, refill_per_second=3 / 900)
+    email_limiter = TokenBucketLimiter("password_reset_email", capacity=1, refill_per_second=1 / 900)
+    monkeypatch.setattr(auth_router, "reset_ip_limiter", ip_limiter)
+    monkeypatch.setattr(auth_router, "reset_email_limiter", email_limiter)
+    return ip_limiter, email_limiter
+
+async def _forgot(client, email: str):
+    return await client.post("/auth/forgot-password", json={"email": email})
+
+async def test_reset_limit_returns_429_with_retry_after(client, reset_limits):
+    assert (await _forgot(client, "a@example.com")).status_code == 200
+
+    response = await _forgot(client, "a@example.com")
+
+    assert response.status_code == 429
+    # One token per 900 s for the email bucket
+    assert response.headers["Retry-After"] == "900"
+
+async def test_email_rejection_does_not_spend_an_ip_token(client, reset_limits):
+    assert (await _forgot(client, "a@example.com")).status_code == 200
+    for _ in range(3):
+        assert (await _forgot(client, "a@example.com")).status_code == 429
+
+    # Only the one accepted request counted against the IP: two more addresses still get through
+    assert (await _forgot(client, "b@example.com")).status_code == 200
+    assert (await _forgot(client, "c@example.com")).status_code == 200
+    response = await _forgot(client, "d@example.com")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "300"
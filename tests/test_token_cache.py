@@ -0,0 +1,61 @@
+"""
+Verified-JWT cache in app/auth.py
+"""
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from app import auth
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+    real_decode = jwt.decode
+
+    def counting_decode(token, *args, **kwargs):
+        calls.append(token)
+        return real_decode(token, *args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+    return calls
+
+def _token(username: str, exp: int) -> str:
+    return jwt.encode({"sub": username, "exp": exp}, auth.SECRET_KEY, algorithm=auth.ALGORITHM)
+
+def test_repeated_token_is_served_from_cache(decode_calls):
+    token = _token("alice", int(time.time()) + 600)
+
+    assert auth.verify_token(token) == "alice"
+    assert auth.verify_token(token) == "alice"
+    assert decode_calls == [token]
+
+def test_cached_token_is_rejected_once_expired(decode_calls):
+    exp = int(time.time()) + 2
+    token = _token("alice", exp)
+    assert auth.verify_token(token) == "alice"
+    assert auth.verify_token(token) == "alice"
+    assert len(decode_calls) == 1
+
+    time.sleep(max(0.0, exp - time.time()) + 0.1)
+
+    with pytest.raises(HTTPException) as exc_info:
+        auth.verify_token(token)
+    assert exc_info.value.status_code == 401
+    assert len(decode_calls) == 2
+
+def test_token_with_different_digest_is_decoded_again(decode_calls):
+    token = _token("alice", int(time.time()) + 600)
+    assert auth.verify_token(token) == "alice"
+
+    # Same header and claims, different signature: must not be answered from the cache
+    header, claims, signature = token.split(".")
+    forged = f"{header}.{claims}.{'B' if signature[0] == 'A' else 'A'}{signature[1:]}"
+    with pytest.raises(HTTPException) as exc_info:
+        auth.verify_token(forged)
+    assert exc_info.value.status_code == 401
+
+    other = _token("bob", int(time.time()) + 600)
+    assert auth.verify_token(other) == "bob"
+    assert decode_calls == [token, forged, other]
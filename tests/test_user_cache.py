@@ -0,0 +1,134 @@
+"""
+Cached user principals: every write path drops the entry, so the next request sees the change
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_user, get_password_hash
+from app.database import AsyncSessionLocal
+from app.models import PasswordResetToken, User
+from app.user_cache import UserPrincipal, cache_user, cache_version, get_cached_user, invalidate_user
+from models.user import PasswordChange, UserStatusUpdate, UserUpdate
+from routers import users
+
+@pytest.fixture
+def bob(client, auth_headers):
+    return auth_headers("bob", role="user")
+
+@pytest.fixture
+def root(database, auth_headers):
+    auth_headers("root", role="superadmin")
+    with Session(database) as db:
+        return UserPrincipal(db.scalars(select(User).where(User.username == "root")).one())
+
+def _user_id(database, username: str) -> int:
+    with Session(database) as db:
+        return db.scalars(select(User.id).where(User.username == username)).one()
+
+async def _me(client, headers):
+    return await client.get("/users/me", headers=headers)
+
+async def test_principal_is_cached_after_first_request(client, bob):
+    assert get_cached_user("bob") is None
+
+    assert (await _me(client, bob)).status_code == 200
+
+    assert get_cached_user("bob").role == "user"
+
+async def test_deactivation_is_seen_by_the_next_request(client, database, bob, root):
+    assert (await _me(client, bob)).json()["is_active"] is True
+
+    async with AsyncSessionLocal() as db:
+        await users.toggle_user_status(_user_id(database, "bob"), UserStatusUpdate(is_active=False), db, root)
+
+    assert get_cached_user("bob") is None
+    assert (await _me(client, bob)).json()["is_active"] is False
+
+async def test_role_change_is_seen_by_the_next_request(client, database, bob, root):
+    assert (await client.get("/health/db-pool", headers=bob)).status_code == 403
+
+    async with AsyncSessionLocal() as db:
+        await users.update_user(_user_id(database, "bob"), UserUpdate(role="admin"), db, root)
+
+    assert (await client.get("/health/db-pool", headers=bob)).status_code == 200
+
+async def test_deleted_user_is_rejected_by_the_next_request(client, database, bob, root):
+    assert (await _me(client, bob)).status_code == 200
+
+    async with AsyncSessionLocal() as db:
+        await users.delete_user(_user_id(database, "bob"), db, root)
+
+    response = await _me(client, bob)
+    assert response.status_code == 401
+    assert response.json()["message"] == "User not found"
+
+async def test_renaming_yourself_drops_the_old_entry(client, database, bob):
+    await _me(client, bob)
+    principal = get_cached_user("bob")
+
+    async with AsyncSessionLocal() as db:
+        await users.update_current_user_profile(UserUpdate(username="robert"), db, principal)
+
+    assert get_cached_user("bob") is None
+    assert (await _me(client, bob)).status_code == 401
+
+async def test_password_change_drops_the_entry(client, database, bob):
+    with Session(database) as db:
+        db.execute(update(User).where(User.username == "bob").values(hashed_password=await get_password_hash("oldpass123")))
+        db.commit()
+    await _me(client, bob)
+
+    async with AsyncSessionLocal() as db:
+        change = PasswordChange(current_password="oldpass123", new_password="newpass123", confirm_password="newpass123")
+        await users.change_password(change, db, get_cached_user("bob"))
+
+    assert get_cached_user("bob") is None
+
+async def test_password_reset_drops_the_entry(client, database, bob):
+    with Session(database) as db:
+        db.add(PasswordResetToken(
+            user_id=_user_id(database, "bob"), token="reset-token", expires_at=datetime.utcnow() + timedelta(minutes=5)
+        ))
+        db.commit()
+    await _me(client, bob)
+
+    response = await client.post("/auth/reset-password", json={"token": "reset-token", "new_password": "newpass123"})
+
+    assert response.status_code == 200, response.text
+    assert get_cached_user("bob") is None
+
+def _user_row(role: str):
+    return SimpleNamespace(
+        id=1, username="carol", email="carol@example.com", role=role, is_active=True,
+        created_at=datetime(2024, 1, 1), last_login=None
+    )
+
+def test_cache_user_skips_caching_after_a_concurrent_invalidation():
+    version = cache_version()
+    invalidate_user("carol")
+
+    principal = cache_user(_user_row("admin"), version)
+
+    # The caller still gets its (possibly stale) snapshot, but nobody else is served it
+    assert principal.role == "admin"
+    assert get_cached_user("carol") is None
+
+    cache_user(_user_row("user"), cache_version())
+    assert get_cached_user("carol").role == "user"
+
+async def test_lookup_racing_an_invalidation_is_not_cached(monkeypatch):
+    """get_current_user reads the row, an admin demotes the user meanwhile, the stale row is not cached"""
+    class RacingSession:
+        async def execute(self, statement):
+            invalidate_user("carol")
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(first=lambda: _user_row("admin")))
+
+    monkeypatch.setattr("app.auth.verify_token", lambda token: "carol")
+    principal = await get_current_user(SimpleNamespace(credentials="token"), RacingSession())
+
+    assert principal.role == "admin"
+    assert get_cached_user("carol") is None